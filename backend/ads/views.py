@@ -1,9 +1,10 @@
-from django.http import JsonResponse
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import conditional_page, require_GET
+from backend.responses import FastJsonResponse
 from .models import Ad
 from datetime import date
 
 @require_GET
+@conditional_page
 def get_ads(request):
     """
     Fetch all active advertisements.
@@ -21,4 +22,4 @@ def get_ads(request):
         'logo'
     )
     
-    return JsonResponse({'ads': list(ads)})
+    return FastJsonResponse({'ads': list(ads)})
@@ -0,0 +1,133 @@
+"""
+Email digests of pending alert matches.
+
+Each send_alert_digests run is one window: every pending AlertMatch is
+grouped by the alert's email address and rendered into a single message
+per recipient listing the new matches of all their alerts, each alert with
+its own unsubscribe link (keyed on Alert.delete_key).
+"""
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+
+from .models import AlertMatch
+
+# Frontend detail route per listing typeCode
+LISTING_PATHS = {1: 'rentals', 2: 'sublets', 3: 'rooms', 4: 'rentals'}
+
+
+class Digest:
+    """Pending matches of one recipient"""
+
+    def __init__(self, email):
+        self.email = email
+        self.alerts = {}        # alert_id -> {'name', 'delete_key', 'listing_ids'}
+        self.match_ids = []
+
+    @property
+    def listing_ids(self):
+        return sorted({listing_id for alert in self.alerts.values() for listing_id in alert['listing_ids']})
+
+
+def pending_digests(limit=0):
+    """Pending matches grouped per recipient (case-insensitive email), in email order"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT m.id, m.listing_id, a.id, a.name, a.delete_key, a.email
+            FROM alert_matches m
+            JOIN alerts a ON a.id = m.alert_id
+            WHERE m.status = %s
+            ORDER BY a.email, a.id, m.listing_id
+        """, [AlertMatch.Status.PENDING])
+        rows = cursor.fetchall()
+
+    digests = {}
+    for match_id, listing_id, alert_id, name, delete_key, email in rows:
+        digest = digests.setdefault(email.strip().lower(), Digest(email.strip()))
+        alert = digest.alerts.setdefault(alert_id, {'name': name, 'delete_key': delete_key, 'listing_ids': []})
+        alert['listing_ids'].append(listing_id)
+        digest.match_ids.append(match_id)
+
+    digests = list(digests.values())
+    return digests[:limit] if limit > 0 else digests
+
+
+def unsubscribe_url(alert_id, delete_key):
+    """Link that deletes an alert (alerts.views.unsubscribe)"""
+    return f"{settings.API_URL.rstrip('/')}/api/alerts/unsubscribe/{alert_id}/?key={delete_key}"
+
+
+def listing_url(listing):
+    """Frontend detail page of a formatted listing"""
+    path = LISTING_PATHS.get(listing.get('typeCode'), 'rentals')
+    return f"{getattr(settings, 'FRONTEND_URL', '').rstrip('/')}/{path}/{listing['id']}"
+
+
+def render_digest(digest, listings_by_id):
+    """
+    One EmailMultiAlternatives for a recipient, or None when none of their
+    matched listings is still visible.
+    """
+    sections = []
+    for alert_id, alert in digest.alerts.items():
+        listings = [
+            listings_by_id[listing_id] for listing_id in alert['listing_ids']
+            if listing_id in listings_by_id and listings_by_id[listing_id].get('visible')
+        ]
+        if listings:
+            sections.append((alert_id, alert, listings))
+    if not sections:
+        return None
+
+    count = sum(len(listings) for _, _, listings in sections)
+    subject = f"{count} new listing{'s' if count != 1 else ''} on Orange Housing"
+
+    text_parts = []
+    html_parts = []
+    for alert_id, alert, listings in sections:
+        heading = alert['name'] or 'Your alert'
+        link = unsubscribe_url(alert_id, alert['delete_key'])
+        text_parts.append(heading)
+        text_parts.extend(
+            f"- {listing['title']}, {listing['price']}, {listing['address']}\n  {listing_url(listing)}"
+            for listing in listings
+        )
+        text_parts.append(f"Unsubscribe from this alert: {link}\n")
+        html_parts.append(format_html(
+            '<h3>{}</h3><ul>{}</ul><p><a href="{}">Unsubscribe from this alert</a></p>',
+            heading,
+            format_html_join(
+                '', '<li><a href="{}">{}</a> &middot; {} &middot; {}</li>',
+                (
+                    (listing_url(listing), listing['title'], listing['price'], listing['address'])
+                    for listing in listings
+                ),
+            ),
+            link,
+        ))
+
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body='\n'.join(text_parts),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[digest.email],
+        headers={
+            # One-click unsubscribe of the first alert (RFC 8058): mail clients
+            # POST to the link, which a plain GET never does
+            'List-Unsubscribe': f'<{unsubscribe_url(sections[0][0], sections[0][1]["delete_key"])}>',
+            'List-Unsubscribe-Post': 'List-Unsubscribe=One-Click',
+        },
+    )
+    message.attach_alternative(''.join(html_parts), 'text/html')
+    return message
+
+
+def mark_sent(match_ids):
+    """Mark matches as delivered (or no longer deliverable)"""
+    if match_ids:
+        AlertMatch.objects.filter(id__in=match_ids).update(
+            status=AlertMatch.Status.SENT, sent_at=timezone.now()
+        )
@@ -0,0 +1 @@
+# Required for Django management commands
@@ -0,0 +1,116 @@
+"""
+Django management command to benchmark alert matching.
+
+Usage:
+    python manage.py benchmark_alerts
+    python manage.py benchmark_alerts --alerts 100000 --listings 1000
+
+This command will:
+1. Seed synthetic alerts and listings inside a transaction
+2. Match every new listing in one set-based statement, then one listing at
+   a time (as the approve and Stripe activation paths do)
+3. Repeat the batch with index scans disabled, to show what the criteria
+   index saves
+4. Print the query plan for a single listing and roll everything back
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from alerts.match_utils import MATCH_SQL, match_listings
+from listings.benchmark_utils import explain_plan, seed_listings, summarize
+
+SEED_ALERTS_SQL = """
+    INSERT INTO alerts (name, beds, email, search, delete_key, max_rent, location)
+    SELECT
+        'Benchmark ' || g,
+        g %% 6,
+        'alert' || g || '@orangehousing.invalid',
+        g %% 4 + 1,
+        g,
+        CASE WHEN g %% 5 = 0 THEN NULL ELSE 600 + (g * 53) %% 2400 END,
+        CASE WHEN g %% 3 = 0 THEN NULL
+             ELSE (ARRAY['University Hill', 'Westcott', 'Downtown', 'Eastwood', 'Strathmore'])[g %% 5 + 1]
+        END
+    FROM generate_series(1, %s) AS g
+"""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark matching new listings against saved alerts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--alerts',
+            type=int,
+            default=100000,
+            help='Number of synthetic alerts to seed (default: 100000)',
+        )
+        parser.add_argument(
+            '--listings',
+            type=int,
+            default=1000,
+            help='Number of new listings to match (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.stdout.write(f'Seeding {options["alerts"]} alerts and {options["listings"]} listings...')
+            with connection.cursor() as cursor:
+                cursor.execute(SEED_ALERTS_SQL, [options['alerts']])
+            user_id = seed_listings(options['listings'])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE alerts")
+                cursor.execute("SELECT id FROM listings WHERE user_id = %s ORDER BY id", [user_id])
+                listing_ids = [row[0] for row in cursor.fetchall()]
+
+            self.stdout.write(self.style.SUCCESS('\n=== batch (one statement) ==='))
+            matches, elapsed = self.measure(lambda: match_listings(listing_ids))
+            self.stdout.write(f'  {len(listing_ids)} listings, {matches} matches in {elapsed:.1f}ms')
+
+            self.stdout.write(self.style.SUCCESS('\n=== one listing at a time ==='))
+            samples = []
+
+            def one_by_one():
+                total = 0
+                for listing_id in listing_ids:
+                    start = time.perf_counter()
+                    total += match_listings([listing_id])
+                    samples.append((time.perf_counter() - start) * 1000)
+                return total
+
+            matches, elapsed = self.measure(one_by_one)
+            self.stdout.write(f'  {matches} matches in {elapsed:.1f}ms')
+            self.stdout.write(f'  per listing: {summarize(samples)}')
+
+            self.stdout.write(self.style.SUCCESS('\n=== batch without the criteria index ==='))
+
+            def without_index():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_indexscan = off")
+                    cursor.execute("SET LOCAL enable_bitmapscan = off")
+                return match_listings(listing_ids)
+
+            matches, elapsed = self.measure(without_index)
+            self.stdout.write(f'  {matches} matches in {elapsed:.1f}ms')
+
+            self.stdout.write(self.style.SUCCESS('\n=== plan for one listing ==='))
+            with transaction.atomic():
+                for line in explain_plan(MATCH_SQL, [listing_ids[:1]]):
+                    self.stdout.write(f'  {line}')
+                transaction.set_rollback(True)
+
+            # Never keep the synthetic rows
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\nBenchmark complete (seed data rolled back)'))
+
+    def measure(self, fn):
+        """Run fn() in a savepoint that is rolled back; returns (result, elapsed ms)"""
+        with transaction.atomic():
+            start = time.perf_counter()
+            result = fn()
+            elapsed = (time.perf_counter() - start) * 1000
+            transaction.set_rollback(True)
+        return result, elapsed
@@ -0,0 +1,133 @@
+"""
+Django management command to email pending alert matches as digests.
+
+Usage:
+    python manage.py send_alert_digests
+    python manage.py send_alert_digests --dry-run
+    python manage.py send_alert_digests --concurrency 4 --limit 1000
+
+Run it on a schedule (e.g. hourly from cron); each run is one digest window.
+To try it locally, start an SMTP stub and point EMAIL_HOST/EMAIL_PORT at it:
+    python -m aiosmtpd -n -l localhost:1025
+    EMAIL_PORT=1025 python manage.py send_alert_digests
+
+This command will:
+1. Group every pending alert match by the alert's email address
+2. Render one message per recipient with the new listings of all their
+   alerts, each alert with its own unsubscribe link
+3. Send the messages over SMTP, one connection per worker reused for all the
+   messages that worker sends (--concurrency workers, default 1)
+4. Mark the delivered matches as sent; matches whose listings are no longer
+   visible are marked sent without an email. Failed recipients stay pending
+   and are retried on the next run
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from alerts.digest_utils import mark_sent, pending_digests, render_digest
+from listings.views import _get_listings_by_ids
+
+
+class Command(BaseCommand):
+    help = 'Email pending alert matches, one digest per recipient'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Render the digests without sending them or marking matches sent',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Limit the number of recipients (0 = no limit)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Parallel SMTP connections (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        concurrency = max(options['concurrency'], 1)
+
+        digests = pending_digests(options['limit'])
+        listings = _get_listings_by_ids({listing_id for digest in digests for listing_id in digest.listing_ids})
+        listings_by_id = {listing['id']: listing for listing in listings}
+
+        messages = []
+        done_match_ids = []
+        skipped = 0
+        for digest in digests:
+            message = render_digest(digest, listings_by_id)
+            if message is None:
+                # Nothing left to announce; don't keep these matches pending
+                done_match_ids.extend(digest.match_ids)
+                skipped += 1
+            else:
+                messages.append((digest, message))
+
+        if dry_run:
+            for digest, message in messages:
+                self.stdout.write(f'Would send "{message.subject}" to {digest.email}')
+            self._summary(dry_run, len(digests), 0, skipped, 0)
+            return
+
+        sent = 0
+        failed = 0
+        if messages:
+            for digest, error in self._send_all(messages, concurrency):
+                if error is None:
+                    done_match_ids.extend(digest.match_ids)
+                    sent += 1
+                else:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'Failed to send to {digest.email}: {error}'))
+        mark_sent(done_match_ids)
+
+        self._summary(dry_run, len(digests), sent, skipped, failed)
+
+    def _send_all(self, messages, concurrency):
+        """Yield (digest, error or None) per message, sending with one SMTP connection per worker"""
+        local = threading.local()
+        connections = []
+        lock = threading.Lock()
+
+        def send(item):
+            digest, message = item
+            if getattr(local, 'connection', None) is None:
+                local.connection = get_connection()
+                with lock:
+                    connections.append(local.connection)
+            try:
+                local.connection.open()
+                message.connection = local.connection
+                message.send()
+                return digest, None
+            except Exception as e:
+                # Drop the connection; the next message reconnects
+                local.connection.close()
+                return digest, e
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(messages))) as executor:
+                yield from executor.map(send, messages)
+        finally:
+            for smtp_connection in connections:
+                smtp_connection.close()
+
+    def _summary(self, dry_run, recipients, sent, skipped, failed):
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Alert Digests Complete' + (' (dry run)' if dry_run else '')))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Recipients with pending matches: {recipients}')
+        self.stdout.write(f'Digests sent: {sent}')
+        self.stdout.write(f'Recipients with no visible listings left: {skipped}')
+        self.stdout.write(f'Digests failed: {failed}')
@@ -0,0 +1,41 @@
+"""
+Matching saved alerts against listings that just became visible.
+
+An alert watches one listing type (`search`, a typeCode) and bedroom count,
+optionally capped by rent and narrowed to a location. alerts_criteria_idx on
+(search, beds, max_rent) works as an inverted index from a listing's
+attributes to the alerts that can match it, so matching a batch of listings
+is one INSERT ... SELECT that probes the index per listing instead of
+scanning every alert. Matches are queued as pending AlertMatch rows for the
+digest sender; an alert is never queued twice for the same listing.
+"""
+
+from django.db import connection
+
+MATCH_SQL = """
+    INSERT INTO alert_matches (alert_id, listing_id, status, created_at)
+    SELECT a.id, l.id, 'pending', NOW()
+    FROM listings l
+    JOIN alerts a
+      ON a.search = l."typeCode"
+     AND a.beds = l.beds
+     AND (a.max_rent IS NULL OR a.max_rent >= l.rent)
+    WHERE l.id = ANY(%s)
+      AND l.visible = TRUE
+      AND l.date_expires >= CURRENT_DATE
+      AND (a.location IS NULL OR a.location = '' OR LOWER(a.location) = LOWER(l.location))
+    ON CONFLICT (alert_id, listing_id) DO NOTHING
+"""
+
+
+def match_listings(listing_ids):
+    """
+    Queue an AlertMatch for every alert matching the given listings (only
+    visible, unexpired listings match). Returns the number of new matches.
+    """
+    listing_ids = [int(listing_id) for listing_id in listing_ids]
+    if not listing_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(MATCH_SQL, [listing_ids])
+        return cursor.rowcount
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("alerts", "0001_initial"),
+        ("listings", "0021_listingcard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlertMatch",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("sent", "Sent")],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "alert_matches",
+                "managed": True,
+            },
+        ),
+        migrations.AddField(
+            model_name="alert",
+            name="location",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="alert",
+            name="max_rent",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(
+                fields=["search", "beds", "max_rent"], name="alerts_criteria_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="alertmatch",
+            name="alert",
+            field=models.ForeignKey(
+                db_column="alert_id",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="matches",
+                to="alerts.alert",
+            ),
+        ),
+        migrations.AddField(
+            model_name="alertmatch",
+            name="listing",
+            field=models.ForeignKey(
+                db_column="listing_id",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="alert_matches",
+                to="listings.listing",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alertmatch",
+            index=models.Index(
+                fields=["status", "created_at"], name="alert_matches_status_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="alertmatch",
+            constraint=models.UniqueConstraint(
+                fields=("alert", "listing"), name="alert_matches_unique"
+            ),
+        ),
+    ]
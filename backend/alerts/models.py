@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Alert(models.Model):
@@ -8,12 +9,58 @@ class Alert(models.Model):
     name = models.CharField(max_length=255, null=True, blank=True)
     beds = models.IntegerField()
     email = models.EmailField(max_length=255)
-    search = models.IntegerField()
+    search = models.IntegerField()  # listing typeCode the alert watches
     delete_key = models.IntegerField()
+    # Optional criteria; NULL matches any rent / location
+    max_rent = models.IntegerField(null=True, blank=True)
+    location = models.CharField(max_length=255, null=True, blank=True)
 
     class Meta:
         db_table = 'alerts'
         managed = True
+        indexes = [
+            # Lookup of the alerts a listing can match (see alerts.match_utils)
+            models.Index(fields=['search', 'beds', 'max_rent'], name='alerts_criteria_idx'),
+        ]
 
     def __str__(self):
         return f"Alert for {self.name or 'Unknown'} - {self.beds} beds"
+
+
+class AlertMatch(models.Model):
+    """A listing that matched an alert, waiting to be emailed (see alerts.match_utils)"""
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+    
+    id = models.BigAutoField(primary_key=True)
+    alert = models.ForeignKey(
+        Alert,
+        on_delete=models.CASCADE,
+        related_name='matches',
+        db_column='alert_id'
+    )
+    listing = models.ForeignKey(
+        'listings.Listing',
+        on_delete=models.CASCADE,
+        related_name='alert_matches',
+        db_column='listing_id'
+    )
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'alert_matches'
+        managed = True
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='alert_matches_status_idx'),
+        ]
+        constraints = [
+            # An alert is notified about a listing once
+            models.UniqueConstraint(fields=['alert', 'listing'], name='alert_matches_unique'),
+        ]
+
+    def __str__(self):
+        return f"Listing {self.listing_id} for Alert {self.alert_id} ({self.status})"
@@ -1,3 +1,132 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from listings.models import Listing
+from listings.tests import make_listing, make_user
+from payments.views import _activate_listing
+from .models import Alert, AlertMatch
+
+
+class SendAlertDigestsTests(TestCase):
+    """send_alert_digests against Django's in-memory mail outbox"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = make_user()
+        cls.rental = make_listing(user, listing_title='Euclid rental')
+        cls.sublet = make_listing(user, listing_title='Comstock sublet', typeCode=2)
+        cls.hidden = make_listing(user, listing_title='Hidden rental', visible=False)
+
+        # Two alerts of one recipient (email case differs) share a digest
+        cls.rentals_alert = cls.make_alert('Rentals', 'Renter@example.com', 1, [cls.rental, cls.hidden])
+        cls.sublets_alert = cls.make_alert('Sublets', 'renter@example.com', 2, [cls.sublet])
+        cls.other_alert = cls.make_alert('Other', 'other@example.com', 1, [cls.rental])
+        cls.gone_alert = cls.make_alert('Gone', 'gone@example.com', 1, [cls.hidden])
+
+    @classmethod
+    def make_alert(cls, name, email, search, listings):
+        alert = Alert.objects.create(name=name, beds=2, email=email, search=search, delete_key=1234)
+        for listing in listings:
+            AlertMatch.objects.create(alert=alert, listing=listing)
+        return alert
+
+    def send(self, *args):
+        call_command('send_alert_digests', *args, stdout=StringIO())
+
+    def test_one_digest_per_recipient(self):
+        with mock.patch(
+            'alerts.management.commands.send_alert_digests.get_connection', wraps=get_connection,
+        ) as connect:
+            self.send()
+
+        # One connection is reused for every message of the (single) worker
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['Renter@example.com', 'other@example.com'])
+
+        digest = next(message for message in mail.outbox if message.to == ['Renter@example.com'])
+        self.assertEqual(digest.subject, '2 new listings on Orange Housing')
+        self.assertIn('Euclid rental', digest.body)
+        self.assertIn('Comstock sublet', digest.body)
+        self.assertNotIn('Hidden rental', digest.body)
+        for alert in (self.rentals_alert, self.sublets_alert):
+            self.assertIn(f'/api/alerts/unsubscribe/{alert.id}/?key=1234', digest.body)
+
+        # Matches of listings that are no longer visible are settled without an email
+        self.assertFalse(AlertMatch.objects.filter(status=AlertMatch.Status.PENDING).exists())
+
+    @override_settings(API_URL='https://api.example.com/', FRONTEND_URL='https://example.com')
+    def test_links_are_absolute(self):
+        self.send()
+        digest = next(message for message in mail.outbox if message.to == ['other@example.com'])
+        link = f'https://api.example.com/api/alerts/unsubscribe/{self.other_alert.id}/?key=1234'
+        self.assertIn(link, digest.body)
+        self.assertEqual(digest.extra_headers['List-Unsubscribe'], f'<{link}>')
+        self.assertEqual(digest.extra_headers['List-Unsubscribe-Post'], 'List-Unsubscribe=One-Click')
+        self.assertIn(f'https://example.com/rentals/{self.rental.id}', digest.body)
+
+    def test_dry_run_sends_nothing(self):
+        self.send('--dry-run')
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(AlertMatch.objects.filter(status=AlertMatch.Status.SENT).exists())
+
+    def test_sent_matches_are_not_sent_again(self):
+        self.send()
+        mail.outbox.clear()
+        self.send()
+        self.assertEqual(mail.outbox, [])
+
+
+class UnsubscribeTests(TestCase):
+    def setUp(self):
+        self.client = Client(HTTP_HOST='localhost')
+        self.alert = Alert.objects.create(name='Rentals', beds=2, email='renter@example.com', search=1, delete_key=1234)
+        AlertMatch.objects.create(alert=self.alert, listing=make_listing(make_user()))
+
+    def test_get_only_asks_for_confirmation(self):
+        # Link scanners fetch every link in a message; that must not unsubscribe
+        response = self.client.get(f'/api/alerts/unsubscribe/{self.alert.id}/?key=1234')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<form method="post"')
+        self.assertContains(response, 'name="key" value="1234"')
+        self.assertTrue(Alert.objects.filter(id=self.alert.id).exists())
+
+    def test_confirmation_form_post_deletes_the_alert(self):
+        response = self.client.post(f'/api/alerts/unsubscribe/{self.alert.id}/', {'key': '1234'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Alert.objects.filter(id=self.alert.id).exists())
+        self.assertFalse(AlertMatch.objects.exists())
+
+    def test_one_click_post(self):
+        # RFC 8058: the client POSTs to the List-Unsubscribe URL itself
+        response = self.client.post(
+            f'/api/alerts/unsubscribe/{self.alert.id}/?key=1234', {'List-Unsubscribe': 'One-Click'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Alert.objects.filter(id=self.alert.id).exists())
+
+    def test_wrong_key_is_not_found(self):
+        for query in ('?key=4321', '?key=abc', ''):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/alerts/unsubscribe/{self.alert.id}/{query}')
+                self.assertEqual(response.status_code, 404)
+                response = self.client.post(f'/api/alerts/unsubscribe/{self.alert.id}/{query}')
+                self.assertEqual(response.status_code, 404)
+        self.assertTrue(Alert.objects.filter(id=self.alert.id).exists())
+
+
+class MatchFailureTests(TestCase):
+    def test_activation_logs_a_matching_failure(self):
+        listing = make_listing(make_user(), is_public=False)
+        with mock.patch('payments.views.match_listings', side_effect=RuntimeError('matcher down')), \
+                self.assertLogs('payments.views', 'ERROR') as logs:
+            _activate_listing(listing.id, 'sub_123')
+
+        self.assertIn(f'Alert matching failed for listing {listing.id}', logs.output[0])
+        self.assertIn('RuntimeError: matcher down', logs.output[0])
+        # The activation itself still went through
+        self.assertTrue(Listing.objects.get(id=listing.id).is_public)
@@ -2,5 +2,5 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    # Add your URL patterns here
+    path('unsubscribe/<int:alert_id>/', views.unsubscribe, name='alert_unsubscribe'),
 ]
@@ -1,3 +1,52 @@
-from django.shortcuts import render
+from django.http import HttpResponse
+from django.utils.html import format_html
+from django.views.decorators.csrf import csrf_exempt
+from .models import Alert
 
-# Create your views here.
+
+def _page(message, form='', status=200):
+    """Minimal HTML page for the unsubscribe link, opened from an email"""
+    return HttpResponse(format_html(
+        '<!doctype html><html><head><meta charset="utf-8"><title>Orange Housing alerts</title></head>'
+        '<body><p>{}</p>{}</body></html>',
+        message, form,
+    ), status=status)
+
+
+@csrf_exempt
+def unsubscribe(request, alert_id):
+    """
+    Unsubscribe link of the digest emails (?key=<delete_key>).
+
+    GET only shows a confirmation form, because mail scanners and link
+    prefetchers follow every link in a message; the alert is deleted by the
+    form's POST or by a mail client's one-click List-Unsubscribe POST.
+    """
+    if request.method not in ('GET', 'POST'):
+        return HttpResponse('Method not allowed', status=405)
+
+    key = request.GET.get('key') or request.POST.get('key')
+    try:
+        key = int(key)
+    except (TypeError, ValueError):
+        return _page('This alert was not found.', status=404)
+
+    alerts = Alert.objects.filter(id=alert_id, delete_key=key)
+    if request.method == 'GET':
+        alert = alerts.first()
+        if alert is None:
+            return _page('This alert was not found.', status=404)
+        return _page(
+            format_html('Stop emails for the alert "{}"?', alert.name or 'Your alert'),
+            format_html(
+                '<form method="post" action="{}"><input type="hidden" name="key" value="{}">'
+                '<button type="submit">Unsubscribe</button></form>',
+                request.path, key,
+            ),
+        )
+
+    # Pending matches go with the alert (ON DELETE CASCADE in the ORM)
+    deleted, _ = alerts.delete()
+    if not deleted:
+        return _page('This alert was not found.', status=404)
+    return _page('You have been unsubscribed from this alert.')
@@ -0,0 +1,166 @@
+"""
+Brotli/gzip compression of JSON API responses.
+
+Static files are precompressed by WhiteNoise; this middleware covers the
+JSON the API views return. Responses smaller than COMPRESSION_MIN_SIZE are
+sent as they are (the headers would outweigh the saving). Brotli is used
+when the client accepts it and the brotli package is installed, otherwise
+gzip. Streaming responses are compressed chunk by chunk.
+"""
+
+import gzip
+import io
+import re
+import zlib
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+
+_ACCEPT_ENCODING_RE = re.compile(r'^\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header with a non-zero q value"""
+    encodings = set()
+    for part in header.split(','):
+        match = _ACCEPT_ENCODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            encodings.add(match.group(1).lower())
+    return encodings
+
+
+def choose_encoding(header):
+    """'br', 'gzip' or None for a request's Accept-Encoding header"""
+    encodings = accepted_encodings(header or '')
+    if brotli is not None and 'br' in encodings:
+        return 'br'
+    if 'gzip' in encodings or '*' in encodings:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    """Compress a whole response body"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY))
+    return gzip.compress(data, compresslevel=getattr(settings, 'COMPRESSION_GZIP_LEVEL', DEFAULT_GZIP_LEVEL), mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor for streaming responses; flushes every chunk"""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(
+                quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)
+            )
+        else:
+            self.buffer = io.BytesIO()
+            self.compressor = gzip.GzipFile(
+                mode='wb', fileobj=self.buffer, mtime=0,
+                compresslevel=getattr(settings, 'COMPRESSION_GZIP_LEVEL', DEFAULT_GZIP_LEVEL),
+            )
+
+    def chunk(self, data):
+        if self.encoding == 'br':
+            return self.compressor.process(data) + self.compressor.flush()
+        self.compressor.write(data)
+        self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self._drain()
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self.compressor.finish()
+        self.compressor.close()
+        return self._drain()
+
+    def _drain(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def _compress_stream(content, encoding):
+    compressor = _StreamCompressor(encoding)
+    for data in content:
+        compressed = compressor.chunk(data)
+        if compressed:
+            yield compressed
+    yield compressor.finish()
+
+
+async def _compress_stream_async(content, encoding):
+    compressor = _StreamCompressor(encoding)
+    async for data in content:
+        compressed = compressor.chunk(data)
+        if compressed:
+            yield compressed
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON responses with Brotli or gzip according to the request's
+    Accept-Encoding. Place it above any middleware that reads or changes the
+    response body.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith('application/json'):
+            return response
+        # The body depends on Accept-Encoding from here on, compressed or not
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _compress_stream_async(response.streaming_content, encoding)
+            else:
+                response.streaming_content = _compress_stream(response.streaming_content, encoding)
+            # The compressed length is not known up front
+            del response['Content-Length']
+        else:
+            if len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE):
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # A strong ETag names the uncompressed bytes; the compressed body is
+        # only semantically equivalent (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
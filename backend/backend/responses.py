@@ -0,0 +1,50 @@
+"""
+JSON responses encoded with orjson when it is installed.
+
+FastJsonResponse is a drop-in replacement for django.http.JsonResponse.
+orjson serializes dicts, lists, dates and datetimes from raw cursor rows in
+C; Decimals and anything else it does not know fall back to
+DjangoJSONEncoder. Without orjson (or with FAST_JSON_RESPONSES=False) the
+stdlib encoder is used, so the output only differs in whitespace and in
+datetimes keeping their microseconds.
+"""
+
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_django_encoder = DjangoJSONEncoder()
+
+# UTC datetimes end in Z like DjangoJSONEncoder's; int dict keys become strings
+_ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def fast_json_available():
+    """Whether responses are encoded with orjson"""
+    return orjson is not None and getattr(settings, 'FAST_JSON_RESPONSES', True)
+
+
+def dumps(data):
+    """Serialize data to JSON bytes with the fastest available encoder"""
+    if fast_json_available():
+        return orjson.dumps(data, default=_django_encoder.default, option=_ORJSON_OPTIONS)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse encoded with dumps(); same arguments apart from encoder"""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
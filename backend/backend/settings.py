@@ -58,6 +58,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "backend.middleware.CompressionMiddleware",  # br/gzip for API JSON
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -106,9 +107,46 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD", ""),
         "HOST": os.environ.get("DB_HOST", ""),
         "PORT": os.environ.get("DB_PORT", "5432"),
+        # Reuse connections between requests (0 = close after each request)
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "0")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Local memory by default, which only suits a single process (runserver);
+# set REDIS_URL to share the cache and feed invalidations between processes
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "orange-housing",
+        }
+    }
+
+# Seconds a serialized listing feed stays cached (writes invalidate it sooner)
+LISTINGS_CACHE_TIMEOUT = int(os.getenv('LISTINGS_CACHE_TIMEOUT', '300'))
+
+# Encode API responses with orjson when it is installed (see backend.responses)
+FAST_JSON_RESPONSES = os.getenv('FAST_JSON_RESPONSES', 'True').lower() in ('true', '1', 'yes')
+
+# API JSON responses at least this many bytes are sent br/gzip compressed
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+
+# Hidden listings expired longer ago than this are moved to the archive tables (archive_listings)
+LISTING_ARCHIVE_AFTER_DAYS = int(os.getenv('LISTING_ARCHIVE_AFTER_DAYS', '365'))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -193,4 +231,18 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
 
+# Outgoing email (alert digests). For local testing run an SMTP stub, e.g.
+#   python -m aiosmtpd -n -l localhost:1025   and set EMAIL_PORT=1025
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False').lower() in ('true', '1', 'yes')
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '30'))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'Orange Housing <alerts@orangehousing.com>')
+
+# Public base URL of this API, for links in emails (alert unsubscribe)
+API_URL = os.getenv('API_URL', 'http://localhost:8000')
+
 
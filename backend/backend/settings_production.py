@@ -8,6 +8,8 @@ Environment variables are used for sensitive configuration.
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -61,6 +63,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Static files for production
+    "backend.middleware.CompressionMiddleware",  # br/gzip for API JSON
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -106,6 +109,75 @@ DATABASES = {
     }
 }
 
+# Connection reuse. Opening a TLS connection to Supabase on every request is
+# the dominant cost of small API calls, so by default connections are kept.
+#   DB_POOL_MODE=persistent  one connection per Gunicorn thread, reused for
+#                            DB_CONN_MAX_AGE seconds and health-checked
+#                            before reuse (default)
+#   DB_POOL_MODE=pool        psycopg 3 connection pool per worker process,
+#                            sized from GUNICORN_THREADS (requires
+#                            psycopg[pool] to be installed instead of psycopg2)
+#   DB_POOL_MODE=off         new connection per request
+# Keep GUNICORN_WORKERS/GUNICORN_THREADS in sync with the Dockerfile CMD.
+GUNICORN_WORKERS = int(os.environ.get("GUNICORN_WORKERS", "2"))
+GUNICORN_THREADS = int(os.environ.get("GUNICORN_THREADS", "4"))
+DB_POOL_MODE = os.environ.get("DB_POOL_MODE", "persistent").lower()
+
+if DB_POOL_MODE == "pool":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0  # Django requires 0 with a pool
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "1")),
+            # Every thread of a worker may hold a connection at once
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", str(GUNICORN_THREADS))),
+            "timeout": int(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        }
+    }
+elif DB_POOL_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# Supabase's pooler on port 6543 runs PgBouncer in transaction mode, which
+# cannot keep server-side cursors open across transactions
+if DATABASES["default"]["PORT"] == "6543":
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# =============================================================================
+# CACHE CONFIGURATION
+# =============================================================================
+
+# A shared Redis cache is required: the feed, cluster and facet caches and
+# the feed ETags are keyed on a generation that every write bumps, and with a
+# per-process cache the other workers, instances and management commands
+# would never see those bumps
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+if not REDIS_URL:
+    raise ImproperlyConfigured(
+        "REDIS_URL must be set to a Redis shared by every instance, e.g. redis://10.0.0.3:6379/0"
+    )
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+}
+
+# Seconds a serialized listing feed stays cached (writes invalidate it sooner)
+LISTINGS_CACHE_TIMEOUT = int(os.environ.get("LISTINGS_CACHE_TIMEOUT", "300"))
+
+# Encode API responses with orjson when it is installed (see backend.responses)
+FAST_JSON_RESPONSES = os.environ.get("FAST_JSON_RESPONSES", "True").lower() in ("true", "1", "yes")
+
+# API JSON responses at least this many bytes are sent br/gzip compressed
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+
+# Hidden listings expired longer ago than this are moved to the archive tables (archive_listings)
+LISTING_ARCHIVE_AFTER_DAYS = int(os.environ.get("LISTING_ARCHIVE_AFTER_DAYS", "365"))
+
 # =============================================================================
 # PASSWORD VALIDATION
 # =============================================================================
@@ -216,6 +288,30 @@ if not DEBUG:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
 
+# =============================================================================
+# EMAIL CONFIGURATION (alert digests)
+# =============================================================================
+
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", "587"))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "True").lower() in ("true", "1", "yes")
+EMAIL_TIMEOUT = int(os.environ.get("EMAIL_TIMEOUT", "30"))
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "Orange Housing <alerts@orangehousing.com>")
+
+# Public URLs used in emails: the frontend (listing pages) and this API (unsubscribe)
+FRONTEND_URL = os.environ.get("FRONTEND_URL", "https://orangehousing.com")
+API_URL = os.environ.get("API_URL", "")
+
+# Unsubscribe links in alert emails are built from API_URL; a relative link
+# would be dead in every mail client, so refuse to start without it
+if not API_URL.startswith(("https://", "http://")):
+    raise ImproperlyConfigured(
+        "API_URL must be set to the absolute public URL of this API, e.g. https://api.orangehousing.com"
+    )
+
 # =============================================================================
 # LOGGING CONFIGURATION
 # =============================================================================
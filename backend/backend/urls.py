@@ -38,6 +38,7 @@ urlpatterns = [
     path("ads/", include("ads.urls")),
     path("directory/", include("directory.urls")),
     path("payments/", include("payments.urls")),
+    path("alerts/", include("alerts.urls")),
 
     # API aliases for frontend compatibility
     path("api/users/", include("users.urls")),
@@ -45,6 +46,7 @@ urlpatterns = [
     path("api/ads/", include("ads.urls")),
     path("api/directory/", include("directory.urls")),
     path("api/payments/", include("payments.urls")),
+    path("api/alerts/", include("alerts.urls")),
 
 ]
 
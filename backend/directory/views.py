@@ -1,6 +1,7 @@
 from django.shortcuts import render
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import conditional_page
+from backend.responses import FastJsonResponse
 from .models import Directory
 
 
@@ -22,92 +23,93 @@ def _format_directory_entry(entry):
 def landlord_list(request):
     """Get all landlord entries from the directory"""
     if request.method != 'GET':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return FastJsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
         landlords = Directory.objects.filter(category='Landlord').order_by('name')
         data = [_format_directory_entry(entry) for entry in landlords]
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'count': len(data),
             'data': data
         })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
 
 
 def complex_list(request):
     """Get all complex entries from the directory"""
     if request.method != 'GET':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return FastJsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
         complexes = Directory.objects.filter(category='Complex').order_by('name')
         data = [_format_directory_entry(entry) for entry in complexes]
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'count': len(data),
             'data': data
         })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
 
 
 def manager_list(request):
     """Get all manager entries from the directory"""
     if request.method != 'GET':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return FastJsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
         managers = Directory.objects.filter(category='Manager').order_by('name')
         data = [_format_directory_entry(entry) for entry in managers]
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'count': len(data),
             'data': data
         })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
 
 
 def team_syracuse_list(request):
     """Get all Team Syracuse entries from the directory"""
     if request.method != 'GET':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return FastJsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
         team_syracuse = Directory.objects.filter(category='Team Syracuse').order_by('name')
         data = [_format_directory_entry(entry) for entry in team_syracuse]
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'count': len(data),
             'data': data
         })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
 
 
 def business_list(request):
     """Get all business entries from the directory"""
     if request.method != 'GET':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return FastJsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
         businesses = Directory.objects.filter(category='Business').order_by('name')
         data = [_format_directory_entry(entry) for entry in businesses]
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'count': len(data),
             'data': data
         })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
 
 
+@conditional_page
 def directory_list(request):
     """Get all entries from the directory with optional category filter"""
     if request.method != 'GET':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return FastJsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
         category = request.GET.get('category', None)
@@ -118,27 +120,27 @@ def directory_list(request):
             entries = Directory.objects.all().order_by('category', 'name')
         
         data = [_format_directory_entry(entry) for entry in entries]
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'count': len(data),
             'data': data
         })
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
 
 
 def directory_detail(request, directory_id):
     """Get a single directory entry by ID"""
     if request.method != 'GET':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return FastJsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
         entry = Directory.objects.get(id=directory_id)
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'data': _format_directory_entry(entry)
         })
     except Directory.DoesNotExist:
-        return JsonResponse({'error': 'Directory entry not found'}, status=404)
+        return FastJsonResponse({'error': 'Directory entry not found'}, status=404)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
@@ -0,0 +1,125 @@
+import re
+from django.db import connection
+
+# Free-text amenity column -> normalized boolean column. The booleans are
+# what the feed filters compare against; None means the text could not be
+# classified (it then matches neither yes nor no).
+# Keep in sync with migration 0020_listing_amenity_columns.
+AMENITY_COLUMNS = {
+    'pets': 'pets_allowed',
+    'furnished': 'is_furnished',
+    'laundry': 'has_laundry',
+    'parking': 'has_parking',
+    'smoking': 'smoking_allowed',
+}
+
+_NO_WORDS = ('no', 'not', 'none', 'non', 'never', 'without', 'prohibited', 'forbidden',
+             'unfurnished', 'n/a')
+_YES_WORDS = ('yes', 'allowed', 'ok', 'okay', 'full', 'furnished', 'cats', 'dogs', 'in unit',
+              'in building', 'on site', 'garage', 'off street', 'street', 'driveway', 'lot',
+              'coin', 'shared', 'available')
+# Wording that limits an indoor amenity (smoking) to outside the unit
+_OUTDOOR_WORDS = ('outside', 'outdoor', 'outdoors', 'porch', 'balcony')
+
+_TOKEN_RE = re.compile(r'n/a|[a-z0-9]+')
+
+
+def _has_phrase(padded, phrases):
+    """Whether any whole word or phrase occurs in ' '-padded token text"""
+    return any(f' {phrase} ' in padded for phrase in phrases)
+
+
+def classify_amenity(value, empty=None, indoor=False):
+    """
+    Map a free-text amenity value to True/False/None.
+
+    Legacy forms store '1' for yes and '2' for no. Words and phrases match
+    whole (so 'lot' is not found in 'pilot'), and negative wording is checked
+    first, so "not allowed" and "smoking prohibited" are False. With
+    indoor=True, wording that only allows the amenity outside ("outside
+    smoking only") is False too. `empty` is returned for NULL/blank values.
+    """
+    if value is None:
+        return empty
+    text = str(value).strip().lower()
+    if not text:
+        return empty
+    if text in ('1', 'y', 'true'):
+        return True
+    if text in ('0', '2', 'n', 'false'):
+        return False
+    tokens = _TOKEN_RE.findall(text)
+    padded = f" {' '.join(tokens)} "
+    if _has_phrase(padded, _NO_WORDS):
+        return False
+    if indoor and _has_phrase(padded, _OUTDOOR_WORDS):
+        return False
+    if _has_phrase(padded, _YES_WORDS):
+        return True
+    return None
+
+
+def amenity_values(row):
+    """Normalized amenity columns for a dict of free-text amenity values"""
+    return {
+        # The old pets=no filter matched blank values, so blank pets means no
+        'pets_allowed': classify_amenity(row.get('pets'), empty=False),
+        'is_furnished': classify_amenity(row.get('furnished'), empty=False),
+        'has_laundry': classify_amenity(row.get('laundry')),
+        'has_parking': classify_amenity(row.get('parking')),
+        'smoking_allowed': classify_amenity(row.get('smoking'), indoor=True),
+    }
+
+
+def amenity_clause(filters):
+    """
+    WHERE fragment for the amenity filters (pets, furnished, laundry,
+    parking, smoking). Returns (where_sql, params).
+    """
+    query = ""
+    params = []
+
+    pets = (filters.get('pets') or '').lower()
+    if pets and pets != 'all':
+        if 'yes' in pets or 'allowed' in pets:
+            query += " AND l.pets_allowed = %s"
+            params.append(True)
+        elif 'no' in pets:
+            query += " AND l.pets_allowed = %s"
+            params.append(False)
+
+    furnished = (filters.get('furnished') or '').lower()
+    if furnished == 'furnished':
+        query += " AND l.is_furnished = %s"
+        params.append(True)
+    elif furnished == 'unfurnished':
+        query += " AND l.is_furnished = %s"
+        params.append(False)
+
+    for param, column in (('laundry', 'has_laundry'), ('parking', 'has_parking'), ('smoking', 'smoking_allowed')):
+        value = (filters.get(param) or '').lower()
+        if value in ('yes', 'true', '1'):
+            query += f" AND l.{column} = %s"
+            params.append(True)
+        elif value in ('no', 'false', '0'):
+            query += f" AND l.{column} = %s"
+            params.append(False)
+
+    return query, params
+
+
+def update_amenity_columns(listing_id):
+    """Recompute the normalized amenity columns for a listing after it was written"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(AMENITY_COLUMNS)} FROM listings WHERE id = %s",
+            [listing_id]
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return
+        values = amenity_values(dict(zip(AMENITY_COLUMNS, row)))
+        cursor.execute(
+            f"UPDATE listings SET {', '.join(f'{column} = %s' for column in values)} WHERE id = %s",
+            list(values.values()) + [listing_id]
+        )
@@ -0,0 +1,167 @@
+"""
+Moving long-dead listings out of the hot tables.
+
+A listing hidden and past its date_expires by more than the archive horizon
+(LISTING_ARCHIVE_AFTER_DAYS) is moved, with its photos, photo variants and
+utility links, into listings_archive / photos_archive /
+listings_listing_utilities_archive. Each chunk is one transaction, so a
+listing is either fully archived or untouched. Derived rows (the listing's
+card and alert matches) and its social post jobs are dropped rather than
+archived. Rows are stored as to_jsonb() of the original row and restored
+with jsonb_populate_record(), which keeps the archive valid across later
+column changes.
+"""
+
+from datetime import date, timedelta
+from django.conf import settings
+from django.db import connection, transaction
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+
+HOT_TABLES = ['listings', 'photos', 'photo_variants', 'listings_listing_utilities', 'listing_cards']
+ARCHIVE_TABLES = ['listings_archive', 'photos_archive', 'listings_listing_utilities_archive']
+
+# Same shape as LISTING_AGGREGATES_SQL, read from the archive tables (no
+# cover variants; admin views use the full photos)
+ARCHIVE_AGGREGATES_SQL = """,
+                (SELECT array_agg(pa.data->>'name' ORDER BY (pa.data->>'is_main')::boolean DESC, pa.photo_id ASC)
+                   FROM photos_archive pa WHERE pa.listing_id = l.id) AS photo_names,
+                (SELECT array_agg(u.name ORDER BY u.name)
+                   FROM listings_listing_utilities_archive llua
+                   JOIN lookup_utilities u ON llua.utility_id = u.id
+                  WHERE llua.listing_id = l.id) AS utility_names,
+                NULL AS cover_variants"""
+
+
+def archive_cutoff(days=None):
+    """Listings that expired before this date are archived"""
+    if days is None:
+        days = getattr(settings, 'LISTING_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    return date.today() - timedelta(days=days)
+
+
+def count_archivable(cutoff):
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT COUNT(*) FROM listings
+            WHERE visible = FALSE AND date_expires < %s
+              AND approval_status IS DISTINCT FROM 'pending'
+        """, [cutoff])
+        return cursor.fetchone()[0]
+
+
+def archive_listings(cutoff, batch_size):
+    """
+    Archive one chunk of up to batch_size listings that expired before
+    cutoff, in a single transaction. Returns the archived ids.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id FROM listings
+            WHERE visible = FALSE AND date_expires < %s
+              AND approval_status IS DISTINCT FROM 'pending'
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, [cutoff, batch_size])
+        listing_ids = [row[0] for row in cursor.fetchall()]
+        if not listing_ids:
+            return []
+
+        cursor.execute("""
+            INSERT INTO listings_archive (id, user_id, date_expires, archived_at, data)
+            SELECT l.id, l.user_id, l.date_expires, NOW(), to_jsonb(l)
+            FROM listings l WHERE l.id = ANY(%s)
+        """, [listing_ids])
+        cursor.execute("""
+            INSERT INTO photos_archive (photo_id, listing_id, data, variants)
+            SELECT p.photo_id, p.listing_id, to_jsonb(p),
+                   COALESCE((SELECT jsonb_agg(to_jsonb(v)) FROM photo_variants v
+                              WHERE v.photo_id = p.photo_id), '[]'::jsonb)
+            FROM photos p WHERE p.listing_id = ANY(%s)
+        """, [listing_ids])
+        cursor.execute("""
+            INSERT INTO listings_listing_utilities_archive (listing_id, utility_id)
+            SELECT listing_id, utility_id FROM listings_listing_utilities
+            WHERE listing_id = ANY(%s)
+        """, [listing_ids])
+
+        # Children first: the foreign keys have no ON DELETE CASCADE in the database
+        cursor.execute("""
+            DELETE FROM photo_variants
+            WHERE photo_id IN (SELECT photo_id FROM photos WHERE listing_id = ANY(%s))
+        """, [listing_ids])
+        for table in ('photos', 'listings_listing_utilities', 'listing_cards', 'alert_matches', 'social_post_jobs'):
+            cursor.execute(f"DELETE FROM {table} WHERE listing_id = ANY(%s)", [listing_ids])
+        cursor.execute("DELETE FROM listings WHERE id = ANY(%s)", [listing_ids])
+        return listing_ids
+
+
+def restore_listings(listing_ids):
+    """
+    Move archived listings back into the hot tables, hidden, in a single
+    transaction. Returns the restored ids.
+    """
+    listing_ids = [int(listing_id) for listing_id in listing_ids]
+    if not listing_ids:
+        return []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id FROM listings_archive WHERE id = ANY(%s) ORDER BY id FOR UPDATE
+        """, [listing_ids])
+        listing_ids = [row[0] for row in cursor.fetchall()]
+        if not listing_ids:
+            return []
+
+        cursor.execute("""
+            INSERT INTO listings
+            SELECT r.* FROM listings_archive a,
+                 LATERAL jsonb_populate_record(NULL::listings, a.data) r
+            WHERE a.id = ANY(%s)
+        """, [listing_ids])
+        cursor.execute("""
+            INSERT INTO photos
+            SELECT r.* FROM photos_archive a,
+                 LATERAL jsonb_populate_record(NULL::photos, a.data) r
+            WHERE a.listing_id = ANY(%s)
+        """, [listing_ids])
+        cursor.execute("""
+            INSERT INTO photo_variants
+            SELECT r.* FROM photos_archive a,
+                 LATERAL jsonb_array_elements(a.variants) v,
+                 LATERAL jsonb_populate_record(NULL::photo_variants, v) r
+            WHERE a.listing_id = ANY(%s)
+        """, [listing_ids])
+        cursor.execute("""
+            INSERT INTO listings_listing_utilities (listing_id, utility_id)
+            SELECT listing_id, utility_id FROM listings_listing_utilities_archive
+            WHERE listing_id = ANY(%s)
+        """, [listing_ids])
+
+        for table in ('listings_listing_utilities_archive', 'photos_archive'):
+            cursor.execute(f"DELETE FROM {table} WHERE listing_id = ANY(%s)", [listing_ids])
+        cursor.execute("DELETE FROM listings_archive WHERE id = ANY(%s)", [listing_ids])
+
+        # Hidden until re-approved; the new date_modified keeps cards and ETags honest
+        cursor.execute("""
+            UPDATE listings SET visible = FALSE, date_modified = NOW() WHERE id = ANY(%s)
+        """, [listing_ids])
+        return listing_ids
+
+
+def table_sizes(tables):
+    """
+    [(table, rows, table_bytes, index_bytes, total_bytes)] for the given
+    tables; rows is the planner's estimate. Missing tables are left out.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.relname, GREATEST(c.reltuples, 0)::bigint, pg_relation_size(c.oid),
+                   pg_indexes_size(c.oid), pg_total_relation_size(c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind = 'r' AND c.relname = ANY(%s) AND n.nspname = current_schema()
+        """, [tables])
+        sizes = {row[0]: row for row in cursor.fetchall()}
+    return [sizes[table] for table in tables if table in sizes]
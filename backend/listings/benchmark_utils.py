@@ -0,0 +1,169 @@
+"""
+Helpers shared by the listing benchmark commands.
+
+Benchmarks seed synthetic rows inside a transaction that is rolled back at
+the end, so they can be pointed at a staging copy of the database without
+leaving anything behind.
+"""
+
+import time
+from django.db import connection
+
+BENCHMARK_USER_EMAIL = 'benchmark@orangehousing.invalid'
+
+SEED_LISTINGS_SQL = """
+    INSERT INTO listings (
+        listing_title, address, zip, unit, beds, baths, rent, pets, details, user_id,
+        date_avail, date_created, date_expires, contact_name, visible, featured,
+        location, building_type, furnished, laundry, parking, "latLng",
+        "typeCode", rent_type, is_public, approval_status,
+        social_media_posting, social_media_posted, "spotlightListing"
+    )
+    SELECT
+        NULL,
+        (g %% 900 + 100) || ' ' || (ARRAY['Euclid', 'Ostrom', 'Comstock', 'Livingston', 'Westcott',
+            'Harrison', 'Madison', 'Walnut', 'Clarendon', 'Sumner'])[g %% 10 + 1] || ' Ave',
+        13200 + g %% 25,
+        0,
+        g %% 6,
+        (1 + g %% 3)::text,
+        400 + (g * 37) %% 2600,
+        (ARRAY['yes', 'no', '', '1', '2'])[g %% 5 + 1],
+        'Listing ' || g || ' near ' || (ARRAY['campus', 'downtown', 'the hospital', 'the park',
+            'university hill'])[g %% 5 + 1] || ' with ' || (ARRAY['hardwood floors', 'a new kitchen',
+            'off-street parking', 'a large porch', 'laundry in unit'])[g %% 5 + 1],
+        %s,
+        CURRENT_DATE + (g %% 120),
+        CURRENT_DATE - (g %% 365),
+        CURRENT_DATE + 90 - (g %% 200),
+        'Benchmark',
+        g %% 10 <> 0,
+        CASE WHEN g %% 50 = 0 THEN 1 ELSE 0 END,
+        (ARRAY['University Hill', 'Westcott', 'Downtown', 'Eastwood', 'Strathmore'])[g %% 5 + 1],
+        (ARRAY['Apartment', 'House', 'Duplex', 'Studio', 'Townhouse'])[g %% 5 + 1],
+        (ARRAY['Yes', 'No', 'Partial'])[g %% 3 + 1],
+        (ARRAY['In Unit', 'In Building', 'None'])[g %% 3 + 1],
+        (ARRAY['Off Street', 'Street', 'Garage'])[g %% 3 + 1],
+        ROUND((43.0 + (g %% 1000) / 10000.0)::numeric, 5) || ','
+            || ROUND((-76.2 + (g %% 997) / 10000.0)::numeric, 5),
+        g %% 4 + 1,
+        'perBed',
+        g %% 10 <> 0,
+        'approved',
+        FALSE,
+        FALSE,
+        CURRENT_DATE - (g %% 400)
+    FROM generate_series(1, %s) AS g
+"""
+
+
+def create_benchmark_user(cursor):
+    """Insert the owner of the synthetic listings and return its user_id"""
+    cursor.execute("""
+        INSERT INTO users (
+            user_email, user_pass, user_salt, user_date, user_level, user_banned,
+            password_type, first_name, last_name, contact_number
+        ) VALUES (%s, '', '', NOW(), 1, '0', 'bcrypt', 'Benchmark', 'User', '')
+        RETURNING user_id
+    """, [BENCHMARK_USER_EMAIL])
+    return cursor.fetchone()[0]
+
+
+def seed_listings(rows):
+    """
+    Seed `rows` synthetic listings owned by a new benchmark user.
+    Must be called inside a transaction that the caller rolls back.
+    Returns the benchmark user_id.
+    """
+    # Imported here so the seed stays valid as derived columns are added
+    from .amenity_utils import AMENITY_COLUMNS, amenity_values
+    from .search_utils import SEARCH_DOCUMENT_SQL
+
+    with connection.cursor() as cursor:
+        user_id = create_benchmark_user(cursor)
+        cursor.execute(SEED_LISTINGS_SQL, [user_id, rows])
+        cursor.execute(
+            f"UPDATE listings SET search_document = {SEARCH_DOCUMENT_SQL} WHERE user_id = %s",
+            [user_id]
+        )
+        # Same values listings.geo_utils.geo_columns() derives from latLng
+        cursor.execute("""
+            UPDATE listings SET
+                latitude = CAST(split_part("latLng", ',', 1) AS double precision),
+                longitude = CAST(split_part("latLng", ',', 2) AS double precision)
+            WHERE user_id = %s
+        """, [user_id])
+        cursor.execute("""
+            UPDATE listings SET geo_cell =
+                (FLOOR(latitude / 0.01) + 9000) * 100000 + FLOOR(longitude / 0.01) + 18000
+            WHERE user_id = %s
+        """, [user_id])
+        # Amenity flags: the seed only uses a handful of distinct free-text
+        # values, so classify each one with listings.amenity_utils
+        for source, target in AMENITY_COLUMNS.items():
+            cursor.execute(f"SELECT DISTINCT {source} FROM listings WHERE user_id = %s", [user_id])
+            for (value,) in cursor.fetchall():
+                cursor.execute(
+                    f"UPDATE listings SET {target} = %s WHERE user_id = %s AND {source} IS NOT DISTINCT FROM %s",
+                    [amenity_values({source: value})[target], user_id, value]
+                )
+        cursor.execute("ANALYZE listings")
+    return user_id
+
+
+def seed_photos(user_id, per_listing=1):
+    """
+    Give each listing of the benchmark user `per_listing` photos, the first
+    one main. Same transaction rules as seed_listings.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO photos (listing_id, name, path, description, date_added, is_main)
+            SELECT l.id, 'benchmark-' || l.id || '-' || n || '.jpg', '', '', NOW(), n = 1
+            FROM listings l, generate_series(1, %s) AS n
+            WHERE l.user_id = %s
+        """, [per_listing, user_id])
+        cursor.execute("ANALYZE photos")
+
+
+def time_calls(fn, iterations, clock=time.perf_counter):
+    """
+    Call fn() `iterations` times and return the latencies in milliseconds.
+    Pass clock=time.process_time to measure CPU time of this process instead.
+    """
+    samples = []
+    for _ in range(iterations):
+        start = clock()
+        fn()
+        samples.append((clock() - start) * 1000)
+    return samples
+
+
+def explain_plan(sql, params=None, analyze=True):
+    """
+    EXPLAIN output of a query as a list of plan lines. With params=None the
+    SQL is sent as it is (e.g. a captured query with its values inlined).
+    """
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN ({options}) {sql}", params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """p50/p99/mean summary line for a list of latencies"""
+    mean = sum(samples) / len(samples) if samples else 0.0
+    return (
+        f'p50={percentile(samples, 50):.2f}ms  '
+        f'p99={percentile(samples, 99):.2f}ms  '
+        f'mean={mean:.2f}ms  n={len(samples)}'
+    )
@@ -0,0 +1,128 @@
+"""
+Response cache for the public listing feeds.
+
+Feed responses are stored fully serialized, keyed by the view and its
+normalized query string. Rather than deleting keys on every write, each key
+embeds a generation number; invalidate_listing_feeds() bumps the generation
+so every previously cached feed is skipped at once and simply ages out.
+The generation only reaches the processes that share the cache, so
+production requires Redis (REDIS_URL); the local-memory backend is only
+right for a single development process.
+"""
+
+import hashlib
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+
+GENERATION_KEY = 'listings:feed:generation'
+STAMP_KEY = 'listings:feed:stamp'
+HITS_KEY = 'listings:feed:hits'
+MISSES_KEY = 'listings:feed:misses'
+
+
+def _incr(key):
+    """Increment a counter that never expires, creating it if needed"""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def get_feed_generation():
+    """Current feed generation (starts at 1)"""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def get_feed_stamp():
+    """
+    (generation, last_modified) of the feeds, from the cache alone.
+
+    last_modified is when the current generation was first seen, and always
+    at least a second after the previous generation's so HTTP dates (one
+    second resolution) move forward with every write.
+    """
+    generation = get_feed_generation()
+    stamp = cache.get(STAMP_KEY)
+    if stamp and stamp[0] == generation:
+        return stamp
+    last_modified = timezone.now().replace(microsecond=0)
+    if stamp:
+        last_modified = max(last_modified, stamp[1] + timedelta(seconds=1))
+    stamp = (generation, last_modified)
+    cache.set(STAMP_KEY, stamp, timeout=None)
+    return stamp
+
+
+def invalidate_listing_feeds():
+    """Drop every cached feed; call after any write that changes listing data"""
+    if cache.get(GENERATION_KEY) is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+    _incr(GENERATION_KEY)
+
+
+def feed_cache_key(name, request):
+    """
+    Build the cache key for a feed request.
+
+    Query parameters are sorted so ?a=1&b=2 and ?b=2&a=1 share an entry.
+    With local media storage the image URLs embed the request host, so the
+    host is part of the key as well.
+    """
+    normalized = '&'.join(
+        f'{key}={value.strip()}' for key, value in sorted(request.GET.items())
+    )
+    if getattr(settings, 'MEDIA_URL', '/media/').startswith('/'):
+        normalized = f'{request.scheme}://{request.get_host()}|{normalized}'
+    digest = hashlib.md5(normalized.encode('utf-8')).hexdigest()
+    return f'listings:feed:{get_feed_generation()}:{name}:{digest}'
+
+
+def get_feed_cache_stats():
+    """Hit/miss counters shared by every worker using the same cache"""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+        'generation': get_feed_generation(),
+        'backend': settings.CACHES['default']['BACKEND'],
+    }
+
+
+def cache_feed_response(view_func):
+    """
+    Serve a GET feed view from the cache, storing successful responses.
+    Responses carry an X-Cache header of HIT or MISS.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view_func(request, *args, **kwargs)
+
+        key = feed_cache_key(view_func.__name__, request)
+        content = cache.get(key)
+        if content is not None:
+            _incr(HITS_KEY)
+            response = HttpResponse(content, content_type='application/json')
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _incr(MISSES_KEY)
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.content, getattr(settings, 'LISTINGS_CACHE_TIMEOUT', 300))
+        response['X-Cache'] = 'MISS'
+        return response
+
+    return wrapper
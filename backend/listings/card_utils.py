@@ -0,0 +1,130 @@
+"""
+Pre-serialized listing cards for the feed endpoints.
+
+A card is the JSON object _format_listings_data() produces for a listing,
+stored in listing_cards together with the listings.date_modified it was
+built from. Every listing write bumps date_modified (photo and utility
+changes included), so the feed query only joins cards whose
+listing_modified still matches; missing or stale cards are rebuilt on the
+spot and the response is the stored fragments joined together.
+
+Cards are built without a request. With local storage (a relative
+MEDIA_URL) the photo URLs need the request host, so the stored card has
+MEDIA_MARKER where a photo URL's MEDIA_URL goes and serving a page is one
+string replace over the joined cards.
+"""
+
+import json
+import uuid
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+
+from backend.responses import dumps
+
+# Columns a feed query selects in card mode: the sort key and the card
+CARD_COLUMNS_SQL = "l.id, l.featured, l.date_created, lc.card"
+
+# Card fields holding photo URLs (srcset entries are "url width")
+CARD_URL_FIELDS = ('images', 'thumbnail', 'srcset')
+
+# Stands for a relative MEDIA_URL in stored cards. JSON encoders always
+# escape control characters, so the raw character never comes from listing
+# text; it only appears where build_cards put it
+MEDIA_MARKER = '\x01'
+
+# Only cards built from the listing's current version are used
+CARD_JOIN_SQL = (
+    " LEFT JOIN listing_cards lc ON lc.listing_id = l.id"
+    " AND lc.listing_modified IS NOT DISTINCT FROM l.date_modified"
+)
+
+
+def serialize_card(listing_data):
+    """JSON text of one formatted listing, encoded the way FastJsonResponse does"""
+    return dumps(listing_data).decode('utf-8')
+
+
+def build_cards(rows):
+    """{listing_id: card_json} for raw listing rows (LISTING_COLUMNS_SQL + aggregates)"""
+    from .views import _format_listings_data
+
+    media_url = getattr(settings, 'MEDIA_URL', '/media/')
+    if not media_url.startswith('/'):
+        return {listing_data['id']: serialize_card(listing_data) for listing_data in _format_listings_data(rows)}
+    return {listing_data['id']: _marked_card(listing_data, media_url) for listing_data in _format_listings_data(rows)}
+
+
+def _marked_card(listing_data, media_url):
+    """Card JSON with MEDIA_MARKER in place of the relative MEDIA_URL of its photo URLs"""
+    # A random token survives encoding unchanged and cannot collide with listing text
+    token = uuid.uuid4().hex
+
+    def mark(url):
+        return f'{token}{url[len(media_url):]}' if isinstance(url, str) and url.startswith(media_url) else url
+
+    for field in CARD_URL_FIELDS:
+        value = listing_data.get(field)
+        if isinstance(value, list):
+            listing_data[field] = [mark(url) for url in value]
+        elif value is not None:
+            listing_data[field] = mark(value)
+    return serialize_card(listing_data).replace(token, MEDIA_MARKER)
+
+
+def card_data(card):
+    """Parsed card, with photo URLs relative to MEDIA_URL as _format_listings_data builds them"""
+    return json.loads(card.replace(MEDIA_MARKER, getattr(settings, 'MEDIA_URL', '/media/')))
+
+
+def store_cards(rows, cards):
+    """Upsert the cards built from `rows`, stamped with each row's date_modified"""
+    with connection.cursor() as cursor:
+        cursor.executemany("""
+            INSERT INTO listing_cards (listing_id, card, listing_modified, built_at)
+            VALUES (%s, %s, %s, NOW())
+            ON CONFLICT (listing_id) DO UPDATE SET
+                card = EXCLUDED.card,
+                listing_modified = EXCLUDED.listing_modified,
+                built_at = EXCLUDED.built_at
+        """, [(row['id'], cards[row['id']], row['date_modified']) for row in rows])
+
+
+def rebuild_listing_cards(listing_ids):
+    """
+    Build and store the cards of the given listings.
+    Returns {listing_id: card_json} for the listings that exist.
+    """
+    from .views import _get_raw_listings_by_ids
+
+    rows = _get_raw_listings_by_ids(listing_ids)
+    if not rows:
+        return {}
+    cards = build_cards(rows)
+    store_cards(rows, cards)
+    return cards
+
+
+def listing_cards_json(rows, request=None):
+    """
+    JSON array of the cards for feed rows selected with CARD_COLUMNS_SQL, in
+    row order. Returns (json_text, count).
+    """
+    missing = [row['id'] for row in rows if row['card'] is None]
+    rebuilt = rebuild_listing_cards(missing) if missing else {}
+
+    cards = [row['card'] or rebuilt.get(row['id']) for row in rows]
+    cards = [card for card in cards if card]
+    cards_json = '[' + ','.join(cards) + ']'
+
+    media_url = getattr(settings, 'MEDIA_URL', '/media/')
+    if media_url.startswith('/'):
+        host_url = f'{request.scheme}://{request.get_host()}' if request else ''
+        cards_json = cards_json.replace(MEDIA_MARKER, f'{host_url}{media_url}')
+    return cards_json, len(cards)
+
+
+def cards_response(cards_json, count, **fields):
+    """Feed response with the pre-serialized cards under 'listings'"""
+    rest = dumps({'count': count, **fields}).decode('utf-8')
+    return HttpResponse('{"listings": ' + cards_json + ',' + rest[1:], content_type='application/json')
@@ -0,0 +1,80 @@
+"""
+Conditional GET support for the listing endpoints.
+
+Feeds are validated by the feed cache generation (see cache_utils): every
+listing write bumps it, so the ETag and Last-Modified come from two reads of
+the shared cache and a client holding a fresh copy gets a 304 without any
+query. Expired listings leave the feeds at midnight without a write, so the
+date is part of a feed ETag and a feed's Last-Modified is never earlier than
+the last midnight. Single-listing views validate with an aggregate over
+their primary-key lookup instead.
+"""
+
+import hashlib
+from datetime import datetime, time
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .cache_utils import get_feed_stamp
+
+
+# Single-listing validator; where_sql selects the listing by primary key
+VALIDATOR_SQL = "SELECT MAX(l.date_modified), COUNT(*) FROM listings l WHERE 1=1"
+
+
+def get_listing_validator(where_sql, params):
+    """Return (max date_modified, row count) for listings matching where_sql"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"{VALIDATOR_SQL}{where_sql}", params)
+        return cursor.fetchone()
+
+
+def get_feed_validator():
+    """(last_modified, token) of the feeds from the feed stamp and today's date"""
+    generation, last_modified = get_feed_stamp()
+    today = timezone.localdate()
+    midnight = timezone.make_aware(datetime.combine(today, time.min))
+    return max(last_modified, midnight), f'{generation}|{last_modified}|{today}'
+
+
+def listing_conditions(where_func=None):
+    """
+    Decorate a listing view with ETag/Last-Modified handling.
+
+    Without where_func the view is a feed and is validated by the feed
+    stamp. Otherwise where_func(request, *args, **kwargs) returns the
+    (where_sql, params) of the single listing the view reads, and the
+    aggregate runs at most once per request.
+    """
+    def validator(request, *args, **kwargs):
+        """(last_modified, token) of the response, token None if unknown"""
+        if not hasattr(request, '_listing_validator'):
+            if where_func is None:
+                request._listing_validator = get_feed_validator()
+            else:
+                try:
+                    where_sql, params = where_func(request, *args, **kwargs)
+                except ValueError:
+                    # Malformed arguments; the view itself answers with a 400
+                    request._listing_validator = (None, None)
+                else:
+                    last_modified, count = get_listing_validator(where_sql, params)
+                    request._listing_validator = (last_modified, f'{last_modified}|{count}')
+        return request._listing_validator
+
+    def etag(request, *args, **kwargs):
+        token = validator(request, *args, **kwargs)[1]
+        if token is None:
+            return None
+        parts = [request.path, request.GET.urlencode(), token]
+        if getattr(settings, 'MEDIA_URL', '/media/').startswith('/'):
+            # Local media URLs embed the request host
+            parts.append(request.get_host())
+        return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        return validator(request, *args, **kwargs)[0]
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,120 @@
+"""
+Hiding listings past their date_expires and cancelling their billing.
+
+expire_listings() hides one batch of expired listings with a single
+UPDATE ... RETURNING feeding an INSERT into listing_expirations, so the
+listings and the log never disagree. Stripe has no bulk cancel endpoint;
+cancel_subscriptions() cancels each distinct subscription once, a few at a
+time, and leaves alone subscriptions that still pay for a visible listing
+(a checkout can cover several listings). Failed cancellations stay in the
+log and are retried by the next sweep.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import stripe
+from django.db import connection
+
+from .models import ListingExpiration
+
+stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
+
+Status = ListingExpiration.StripeStatus
+
+EXPIRE_SQL = """
+    WITH expired AS (
+        UPDATE listings SET visible = FALSE, date_modified = NOW()
+        WHERE id IN (
+            SELECT id FROM listings
+            WHERE visible = TRUE AND date_expires < CURRENT_DATE
+            ORDER BY date_expires, id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, date_expires, stripe_subscription_id
+    )
+    INSERT INTO listing_expirations (listing_id, date_expires, expired_at, stripe_subscription_id, stripe_status)
+    SELECT id, date_expires, NOW(), NULLIF(stripe_subscription_id, ''),
+           CASE WHEN COALESCE(stripe_subscription_id, '') = '' THEN %s ELSE %s END
+    FROM expired
+    RETURNING listing_id
+"""
+
+
+def count_expired():
+    """(listings, subscriptions) a sweep would hide and cancel right now"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT NULLIF(stripe_subscription_id, ''))
+            FROM listings
+            WHERE visible = TRUE AND date_expires < CURRENT_DATE
+        """)
+        return cursor.fetchone()
+
+
+def expire_listings(batch_size):
+    """Hide up to batch_size expired listings and log them; returns their ids"""
+    with connection.cursor() as cursor:
+        cursor.execute(EXPIRE_SQL, [batch_size, Status.NONE, Status.PENDING])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def pending_subscriptions():
+    """
+    Subscriptions of expired listings still to cancel. Those that also cover
+    a visible listing are marked shared and left out.
+    """
+    pending = [Status.PENDING, Status.FAILED]
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE listing_expirations e SET stripe_status = %s
+            WHERE e.stripe_status = ANY(%s)
+              AND EXISTS (
+                  SELECT 1 FROM listings l
+                  WHERE l.stripe_subscription_id = e.stripe_subscription_id AND l.visible = TRUE
+              )
+        """, [Status.SHARED, pending])
+        cursor.execute("""
+            SELECT DISTINCT stripe_subscription_id FROM listing_expirations
+            WHERE stripe_status = ANY(%s)
+            ORDER BY stripe_subscription_id
+        """, [pending])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _cancel(subscription_id):
+    try:
+        stripe.Subscription.cancel(subscription_id)
+        return subscription_id, Status.CANCELED, None
+    except stripe.error.InvalidRequestError as e:
+        if e.code == 'resource_missing':
+            # Already gone on Stripe's side
+            return subscription_id, Status.CANCELED, None
+        return subscription_id, Status.FAILED, str(e)
+    except stripe.error.StripeError as e:
+        return subscription_id, Status.FAILED, str(e)
+
+
+def cancel_subscriptions(subscription_ids, concurrency=4):
+    """
+    Cancel the given subscriptions on Stripe and record the outcome on their
+    listing_expirations rows. Returns {status: count}.
+    """
+    if not subscription_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max(concurrency, 1), len(subscription_ids))) as executor:
+        results = list(executor.map(_cancel, subscription_ids))
+
+    with connection.cursor() as cursor:
+        cursor.executemany("""
+            UPDATE listing_expirations SET stripe_status = %s, stripe_error = %s
+            WHERE stripe_subscription_id = %s AND stripe_status = ANY(%s)
+        """, [
+            (status, error, subscription_id, [Status.PENDING, Status.FAILED])
+            for subscription_id, status, error in results
+        ])
+
+    counts = {}
+    for _, status, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+    return counts
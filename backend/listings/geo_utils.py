@@ -0,0 +1,184 @@
+import math
+from django.db import connection
+
+# Listings are bucketed into a grid of GRID_SIZE-degree cells (about 1.1 km
+# north-south and 0.8 km east-west around Syracuse). listings.geo_cell holds
+# the cell number and is indexed, so a viewport or radius query becomes an
+# index lookup on the handful of cells it covers - no PostGIS needed.
+GRID_SIZE = 0.01
+_CELL_ROW_OFFSET = 9000    # floor(-90 / GRID_SIZE)
+_CELL_COL_OFFSET = 18000   # floor(-180 / GRID_SIZE)
+_CELL_ROW_FACTOR = 100000  # > number of columns (36000)
+
+# Viewports covering more cells than this are filtered on latitude and
+# longitude alone; at that size most listings match anyway
+MAX_BBOX_CELLS = 2500
+
+MILES_PER_DEGREE_LAT = 69.0
+DEFAULT_RADIUS_MILES = 1.0
+MAX_RADIUS_MILES = 50.0
+
+# Map clusters: zoom levels served, and roughly how many screen pixels one
+# cluster cell spans (a 256px web-map tile covers 360 / 2**zoom degrees)
+MIN_CLUSTER_ZOOM = 0
+MAX_CLUSTER_ZOOM = 20
+CLUSTER_CELL_PIXELS = 64
+
+
+class InvalidGeoFilter(ValueError):
+    """Raised when a client sends a malformed bbox, near or radius"""
+
+
+def parse_lat_lng(value):
+    """Parse a "lat,lng" string as stored in listings.latLng; None if invalid"""
+    if not value:
+        return None
+    parts = str(value).split(',')
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lng = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or (lat == 0 and lng == 0):
+        return None
+    return lat, lng
+
+
+def grid_cell(lat, lng):
+    """Grid cell number containing a point"""
+    row = math.floor(lat / GRID_SIZE) + _CELL_ROW_OFFSET
+    col = math.floor(lng / GRID_SIZE) + _CELL_COL_OFFSET
+    return row * _CELL_ROW_FACTOR + col
+
+
+def cells_for_bbox(south, west, north, east):
+    """Every grid cell overlapping a box, or None if there are more than MAX_BBOX_CELLS"""
+    row_min = math.floor(south / GRID_SIZE) + _CELL_ROW_OFFSET
+    row_max = math.floor(north / GRID_SIZE) + _CELL_ROW_OFFSET
+    col_min = math.floor(west / GRID_SIZE) + _CELL_COL_OFFSET
+    col_max = math.floor(east / GRID_SIZE) + _CELL_COL_OFFSET
+    if (row_max - row_min + 1) * (col_max - col_min + 1) > MAX_BBOX_CELLS:
+        return None
+    return [
+        row * _CELL_ROW_FACTOR + col
+        for row in range(row_min, row_max + 1)
+        for col in range(col_min, col_max + 1)
+    ]
+
+
+def parse_bbox(value):
+    """
+    Parse ?bbox=west,south,east,north (the order Leaflet's toBBoxString and
+    GeoJSON use). Returns (south, west, north, east).
+    """
+    try:
+        west, south, east, north = [float(part) for part in value.split(',')]
+    except ValueError:
+        raise InvalidGeoFilter('bbox must be west,south,east,north')
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise InvalidGeoFilter('bbox is out of range')
+    return south, west, north, east
+
+
+def parse_near(near, radius=None):
+    """Parse ?near=lat,lng&radius=miles. Returns (lat, lng, radius_miles)."""
+    point = parse_lat_lng(near)
+    if point is None:
+        raise InvalidGeoFilter('near must be lat,lng')
+    radius_miles = DEFAULT_RADIUS_MILES
+    if radius:
+        try:
+            radius_miles = float(radius)
+        except ValueError:
+            raise InvalidGeoFilter('radius must be a number of miles')
+        if not 0 < radius_miles <= MAX_RADIUS_MILES:
+            raise InvalidGeoFilter(f'radius must be between 0 and {MAX_RADIUS_MILES:g} miles')
+    return point[0], point[1], radius_miles
+
+
+def bbox_clause(south, west, north, east):
+    """WHERE fragment matching listings inside a box"""
+    query = " AND l.latitude BETWEEN %s AND %s AND l.longitude BETWEEN %s AND %s"
+    params = [south, north, west, east]
+    cells = cells_for_bbox(south, west, north, east)
+    if cells is not None:
+        query = " AND l.geo_cell IN (" + ", ".join(["%s"] * len(cells)) + ")" + query
+        params = cells + params
+    return query, params
+
+
+def near_clause(lat, lng, radius_miles):
+    """
+    WHERE fragment matching listings within radius_miles of a point.
+    The circle's bounding box narrows the search to a few grid cells; the
+    distance test uses an equirectangular approximation (plain arithmetic,
+    accurate to well under 1% at these distances).
+    """
+    lat_delta = radius_miles / MILES_PER_DEGREE_LAT
+    lng_scale = math.cos(math.radians(lat))
+    lng_delta = lat_delta / max(lng_scale, 0.01)
+    query, params = bbox_clause(
+        max(lat - lat_delta, -90), max(lng - lng_delta, -180),
+        min(lat + lat_delta, 90), min(lng + lng_delta, 180),
+    )
+    query += (
+        " AND ((l.latitude - %s) * %s) * ((l.latitude - %s) * %s)"
+        " + ((l.longitude - %s) * %s) * ((l.longitude - %s) * %s) <= %s"
+    )
+    lng_miles = MILES_PER_DEGREE_LAT * lng_scale
+    params += [
+        lat, MILES_PER_DEGREE_LAT, lat, MILES_PER_DEGREE_LAT,
+        lng, lng_miles, lng, lng_miles,
+        radius_miles * radius_miles,
+    ]
+    return query, params
+
+
+def parse_zoom(value):
+    """Parse ?zoom= as an integer map zoom level"""
+    try:
+        zoom = int(value)
+    except (TypeError, ValueError):
+        raise InvalidGeoFilter('zoom must be an integer')
+    if not MIN_CLUSTER_ZOOM <= zoom <= MAX_CLUSTER_ZOOM:
+        raise InvalidGeoFilter(f'zoom must be between {MIN_CLUSTER_ZOOM} and {MAX_CLUSTER_ZOOM}')
+    return zoom
+
+
+def cluster_cell_size(zoom):
+    """Size in degrees of a cluster cell at a map zoom level"""
+    return 360.0 / (2 ** zoom) * CLUSTER_CELL_PIXELS / 256
+
+
+def geo_clause(filters):
+    """
+    Build the WHERE fragment for the bbox / near / radius filters.
+    Returns (where_sql, params); raises InvalidGeoFilter on bad input.
+    """
+    if filters.get('bbox'):
+        return bbox_clause(*parse_bbox(filters['bbox']))
+    if filters.get('near'):
+        return near_clause(*parse_near(filters['near'], filters.get('radius')))
+    return "", []
+
+
+def geo_columns(lat_lng):
+    """(latitude, longitude, geo_cell) for a latLng string, all None if unparseable"""
+    point = parse_lat_lng(lat_lng)
+    if point is None:
+        return None, None, None
+    return point[0], point[1], grid_cell(*point)
+
+
+def update_geo_columns(listing_id):
+    """Recompute latitude, longitude and geo_cell for a listing after it was written"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT "latLng" FROM listings WHERE id = %s', [listing_id])
+        row = cursor.fetchone()
+        if row is None:
+            return
+        cursor.execute(
+            "UPDATE listings SET latitude = %s, longitude = %s, geo_cell = %s WHERE id = %s",
+            [*geo_columns(row[0]), listing_id]
+        )
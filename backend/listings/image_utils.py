@@ -0,0 +1,119 @@
+"""
+Thumbnail and WebP/AVIF variants of listing photos.
+
+Each photo gets one variant per width in VARIANT_WIDTHS and per supported
+format, written next to the original through the default storage (R2 in
+production) under variants/ and recorded as PhotoVariant rows. The feed
+serializers use the WebP variants of a listing's cover photo for its
+`thumbnail` and `srcset`.
+
+Variants are only made by the generate_photo_variants command: the API has
+no photo upload path, so run it after photos are added (it skips photos
+that already have variants). render_variants() only works on bytes, so the
+command can run it in a process pool; storage and database writes stay in
+the parent process. Pillow is optional: without it photos are served as
+uploaded.
+"""
+
+import io
+from pathlib import PurePosixPath
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Listing, PhotoVariant
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+# Widths generated for every photo; the smallest is the feed thumbnail
+VARIANT_WIDTHS = (320, 640, 1280)
+
+# Feeds serve the WebP variants; AVIF is generated too when Pillow can encode it
+VARIANT_QUALITY = {'webp': 80, 'avif': 60}
+
+VARIANTS_DIR = 'variants'
+
+
+def images_available():
+    """Whether Pillow is installed"""
+    return Image is not None
+
+
+def variant_formats():
+    """Formats this Pillow build can encode, WebP first"""
+    if Image is None:
+        return []
+    formats = []
+    if features.check('webp'):
+        formats.append('webp')
+    if features.check('avif'):
+        formats.append('avif')
+    return formats
+
+
+def variant_name(name, width, fmt):
+    """Storage key of a variant, e.g. variants/abc_640w.webp for abc.jpg"""
+    return f"{VARIANTS_DIR}/{PurePosixPath(name).stem}_{width}w.{fmt}"
+
+
+def render_variants(data, widths=VARIANT_WIDTHS, formats=None):
+    """
+    Resize and encode an original image, never upscaling it.
+    Returns [(width, format, bytes), ...] where width is the width actually
+    encoded: widths larger than the original are skipped, except the
+    smallest, which is produced at the original's width.
+    """
+    if Image is None:
+        raise RuntimeError('Pillow is not installed. Run: pip install Pillow')
+    formats = formats or variant_formats()
+
+    with Image.open(io.BytesIO(data)) as original:
+        # Apply camera rotation before resizing, and drop alpha/palette modes
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        rendered = []
+        for width in sorted(widths):
+            if width > image.width and width != min(widths):
+                continue
+            width = min(width, image.width)
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=VARIANT_QUALITY.get(fmt, 80))
+                rendered.append((width, fmt, buffer.getvalue()))
+        return rendered
+
+
+def save_variants(photo_id, name, rendered):
+    """Write rendered variants to storage and replace the photo's PhotoVariant rows"""
+    variants = []
+    for width, fmt, content in rendered:
+        key = variant_name(name, width, fmt)
+        # Storage never overwrites, so clear any previous copy of this variant
+        if default_storage.exists(key):
+            default_storage.delete(key)
+        saved_name = default_storage.save(key, ContentFile(content))
+        variants.append(PhotoVariant(
+            photo_id=photo_id, width=width, format=fmt, name=saved_name, size_bytes=len(content)
+        ))
+
+    with transaction.atomic():
+        PhotoVariant.objects.filter(photo_id=photo_id).delete()
+        PhotoVariant.objects.bulk_create(variants)
+        # The feed card changes, so conditional GET validators must too
+        Listing.objects.filter(photos__photo_id=photo_id).update(date_modified=timezone.now())
+    return variants
+
+
+def generate_photo_variants(photo):
+    """Render and store every variant of a Photo from its original in storage"""
+    with default_storage.open(photo.name, 'rb') as f:
+        data = f.read()
+    return save_variants(photo.photo_id, photo.name, render_variants(data))
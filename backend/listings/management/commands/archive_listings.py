@@ -0,0 +1,120 @@
+"""
+Django management command to move long-dead listings into the archive tables.
+
+Usage:
+    python manage.py archive_listings --dry-run
+    python manage.py archive_listings
+    python manage.py archive_listings --days 730 --batch-size 200 --vacuum
+
+This command will:
+1. Report the size of the hot and archive tables and their indexes
+2. Move hidden listings that expired more than --days ago (default:
+   LISTING_ARCHIVE_AFTER_DAYS) with their photos, photo variants and utility
+   links into the archive tables, one transaction per batch
+3. With --vacuum, VACUUM ANALYZE the tables so the freed space is reusable
+   and the row estimates are current
+4. Report the sizes again
+
+Archived listings are listed at /api/listings/admin/archived/ and brought
+back with restore_archived_listings.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from listings.archive_utils import (
+    ARCHIVE_TABLES, HOT_TABLES, archive_cutoff, archive_listings, count_archivable, table_sizes,
+)
+from listings.cache_utils import invalidate_listing_feeds
+
+
+def _mb(size):
+    return f'{size / (1024 * 1024):.1f} MB'
+
+
+class Command(BaseCommand):
+    help = 'Move listings expired beyond the archive horizon into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Archive listings that expired more than this many days ago '
+                 '(default: LISTING_ARCHIVE_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be archived without moving anything',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Limit the number of listings to archive (0 = no limit)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Listings moved per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help='VACUUM ANALYZE the hot and archive tables afterwards',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        limit = options['limit']
+        batch_size = max(options['batch_size'], 1)
+
+        self._report_sizes('before')
+
+        if options['dry_run']:
+            self.stdout.write(f'Would archive {count_archivable(cutoff)} listings that expired before {cutoff}')
+            return
+
+        archived = 0
+        while True:
+            if limit > 0:
+                batch_size = min(batch_size, limit - archived)
+                if batch_size <= 0:
+                    break
+            listing_ids = archive_listings(cutoff, batch_size)
+            if not listing_ids:
+                break
+            archived += len(listing_ids)
+            self.stdout.write(self.style.SUCCESS(f'Archived {len(listing_ids)} listings (total {archived})'))
+
+        if archived:
+            # Landlord and admin views list hidden listings too
+            invalidate_listing_feeds()
+
+        if options['vacuum']:
+            with connection.cursor() as cursor:
+                for table in HOT_TABLES + ARCHIVE_TABLES:
+                    cursor.execute(f'VACUUM (ANALYZE) {table}')
+
+        self._report_sizes('after')
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Listing Archive Complete'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Expired before: {cutoff}')
+        self.stdout.write(f'Listings archived: {archived}')
+        if archived and not options['vacuum']:
+            self.stdout.write('Freed space becomes reusable after (auto)vacuum; use --vacuum to run it now')
+
+    def _report_sizes(self, label):
+        self.stdout.write('')
+        self.stdout.write(f'Table sizes {label}:')
+        self.stdout.write(f'  {"table":<36}{"rows":>10}{"table":>12}{"indexes":>12}{"total":>12}')
+        for table, rows, table_bytes, index_bytes, total_bytes in table_sizes(HOT_TABLES + ARCHIVE_TABLES):
+            self.stdout.write(
+                f'  {table:<36}{rows:>10}{_mb(table_bytes):>12}{_mb(index_bytes):>12}{_mb(total_bytes):>12}'
+            )
@@ -0,0 +1,278 @@
+"""
+Django management command to benchmark listing query paths.
+
+Usage:
+    python manage.py benchmark_listings --scenario search --rows 100000
+
+Synthetic listings are seeded inside a transaction that is rolled back when
+the command finishes, so nothing is left behind in the database.
+"""
+
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.test import Client, RequestFactory
+
+from backend.middleware import brotli, compress
+from backend.responses import dumps, fast_json_available
+from listings.benchmark_utils import explain_plan, seed_listings, summarize, time_calls
+from listings.card_utils import cards_response, listing_cards_json
+from listings.views import (
+    _build_listing_where, _format_listings_data, _get_listing_by_id, _get_listings_by_ids,
+    _get_listings_page, _get_raw_listings,
+)
+
+# The search predicate used before the search document existed
+LEGACY_SEARCH_SQL = """
+    SELECT l.id FROM listings l
+    WHERE l.visible = TRUE AND (
+        l.address LIKE %s OR
+        l."physicalAddress" LIKE %s OR
+        l.location LIKE %s OR
+        l.details LIKE %s OR
+        l.building_type LIKE %s OR
+        CAST(l.zip AS TEXT) LIKE %s
+    )
+    ORDER BY l.featured DESC, l.date_created DESC LIMIT 100
+"""
+
+# Viewport filter without the derived columns: parse latLng on every row
+LEGACY_VIEWPORT_SQL = """
+    SELECT l.id FROM listings l
+    WHERE l.visible = TRUE AND l."latLng" LIKE '%%,%%'
+      AND CAST(split_part(l."latLng", ',', 1) AS double precision) BETWEEN %s AND %s
+      AND CAST(split_part(l."latLng", ',', 2) AS double precision) BETWEEN %s AND %s
+    ORDER BY l.featured DESC, l.date_created DESC LIMIT 100
+"""
+
+# (label, west, south, east, north) around the synthetic listings
+VIEWPORTS = [
+    ('block (0.01 deg)', -76.155, 43.045, -76.145, 43.055),
+    ('neighborhood (0.03 deg)', -76.165, 43.035, -76.135, 43.065),
+    ('city (0.1 deg)', -76.2, 43.0, -76.1, 43.1),
+]
+
+# Amenity filters as they were written before the normalized amenity columns
+LEGACY_AMENITY_SQL = {
+    'pets=yes': "(l.pets LIKE '%%yes%%' OR l.pets LIKE '%%allowed%%' OR l.pets = '1')",
+    'pets=no': "(l.pets LIKE '%%no%%' OR l.pets IS NULL OR l.pets = '' OR l.pets = '2')",
+    'furnished=furnished': "(l.furnished LIKE '%%yes%%' OR l.furnished LIKE '%%full%%' OR l.furnished = 'Yes')",
+    'furnished=unfurnished': (
+        "(l.furnished LIKE '%%no%%' OR l.furnished LIKE '%%unfurnished%%' OR l.furnished IS NULL)"
+    ),
+}
+
+AMENITY_FEED_SQL = """
+    SELECT l.id FROM listings l
+    WHERE 1=1{where}
+    ORDER BY l.featured DESC, l.date_created DESC, l.id DESC LIMIT 100
+"""
+
+SEARCH_TERMS = ['euclid', 'westcott ave', '13210', 'porch', 'university hill', 'hardwood']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark listing query paths against synthetic data'
+
+    scenarios = ['search', 'pagination', 'by_id', 'viewport', 'amenities', 'cards', 'json', 'compression']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            choices=self.scenarios,
+            action='append',
+            help='Scenario to run (may be repeated, default: all)',
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100000,
+            help='Number of synthetic listings to seed (default: 100000)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=100,
+            help='Timed iterations per measured path (default: 100)',
+        )
+
+    def handle(self, *args, **options):
+        scenarios = options['scenario'] or self.scenarios
+        rows = options['rows']
+        self.iterations = options['iterations']
+
+        with transaction.atomic():
+            self.stdout.write(f'Seeding {rows} synthetic listings...')
+            self.user_id = seed_listings(rows)
+
+            for scenario in scenarios:
+                self.stdout.write(self.style.SUCCESS(f'\n=== {scenario} ==='))
+                getattr(self, f'run_{scenario}')()
+
+            # Never keep the synthetic rows
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('\nBenchmark complete (seed data rolled back)'))
+
+    def report(self, label, samples):
+        self.stdout.write(f'  {label:<28} {summarize(samples)}')
+
+    def run_search(self):
+        """Six-column LIKE scan vs. the GIN-indexed search document"""
+        for term in SEARCH_TERMS:
+            self.stdout.write(f'q="{term}"')
+
+            def legacy():
+                with connection.cursor() as cursor:
+                    cursor.execute(LEGACY_SEARCH_SQL, [f'%{term}%'] * 6)
+                    cursor.fetchall()
+
+            def indexed():
+                _get_raw_listings(visible=True, filters={'q': term})
+
+            self.report('LIKE scan (old)', time_calls(legacy, self.iterations))
+            self.report('search document (new)', time_calls(indexed, self.iterations))
+
+    def run_pagination(self):
+        """First page vs. a deep page of the main feed"""
+        limit = 50
+        cursor = None
+        pages = {}
+        for page in range(1, 201):
+            if page in (1, 10, 200):
+                pages[page] = cursor
+            _, cursor = _get_listings_page(limit, cursor, visible=True)
+            if not cursor:
+                break
+
+        for page, page_cursor in pages.items():
+            self.report(
+                f'page {page} (limit {limit})',
+                time_calls(lambda: _get_listings_page(limit, page_cursor, visible=True), self.iterations),
+            )
+
+    def run_by_id(self):
+        """Fetch the oldest listings (sorted well past any feed LIMIT) by id"""
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT id FROM listings WHERE user_id = %s
+                ORDER BY featured ASC, date_created ASC, id ASC LIMIT 3
+            """, [self.user_id])
+            listing_ids = [row[0] for row in cursor.fetchall()]
+        if not listing_ids:
+            raise CommandError('No seeded listings to fetch')
+
+        self.report('by id (1)', time_calls(lambda: _get_listing_by_id(listing_ids[0]), self.iterations))
+        self.report(f'by ids ({len(listing_ids)})', time_calls(lambda: _get_listings_by_ids(listing_ids), self.iterations))
+
+    def run_viewport(self):
+        """latLng parsed per row vs. the indexed grid cells, for map viewports"""
+        for label, west, south, east, north in VIEWPORTS:
+            self.stdout.write(f'bbox {label}')
+
+            def legacy():
+                with connection.cursor() as cursor:
+                    cursor.execute(LEGACY_VIEWPORT_SQL, [south, north, west, east])
+                    cursor.fetchall()
+
+            def indexed():
+                _get_raw_listings(visible=True, filters={'bbox': f'{west},{south},{east},{north}'})
+
+            self.report('parse latLng (old)', time_calls(legacy, self.iterations))
+            self.report('grid cells (new)', time_calls(indexed, self.iterations))
+
+        self.stdout.write('near=43.05,-76.15')
+        for radius in ('0.5', '1', '3'):
+            self.report(
+                f'radius {radius} mi',
+                time_calls(
+                    lambda: _get_raw_listings(visible=True, filters={'near': '43.05,-76.15', 'radius': radius}),
+                    self.iterations,
+                ),
+            )
+
+    def run_amenities(self):
+        """String LIKE amenity filters vs. equality on the normalized columns, with query plans"""
+        for label, legacy_where in LEGACY_AMENITY_SQL.items():
+            param, value = label.split('=')
+            legacy_sql = AMENITY_FEED_SQL.format(where=f" AND l.visible = %s AND {legacy_where}")
+            where, params, _, _ = _build_listing_where(visible=True, filters={param: value})
+            new_sql = AMENITY_FEED_SQL.format(where=where)
+
+            def run(sql, params):
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    return [row[0] for row in cursor.fetchall()]
+
+            self.stdout.write(f'{label}')
+            self.report('LIKE (old)', time_calls(lambda: run(legacy_sql, [True]), self.iterations))
+            self.report('normalized column (new)', time_calls(lambda: run(new_sql, params), self.iterations))
+            for name, sql, sql_params in (('old', legacy_sql, [True]), ('new', new_sql, params)):
+                self.stdout.write(f'  plan ({name}):')
+                for line in explain_plan(sql, sql_params):
+                    self.stdout.write(f'    {line}')
+
+    def run_cards(self):
+        """Formatting every listing per request vs. joining the stored card JSON"""
+        request = RequestFactory(HTTP_HOST='localhost').get('/listings/')
+
+        for limit in (20, 100):
+            def formatted():
+                listings, next_cursor = _get_listings_page(limit, visible=True)
+                listings_data = _format_listings_data(listings, request)
+                return JsonResponse({'listings': listings_data, 'count': len(listings_data), 'next': next_cursor})
+
+            def cards():
+                listings, next_cursor = _get_listings_page(limit, visible=True, cards=True)
+                cards_json, count = listing_cards_json(listings, request)
+                return cards_response(cards_json, count, next=next_cursor)
+
+            # Build the cards of the page first; the feeds keep them warm
+            cards()
+            self.stdout.write(f'feed page of {limit}')
+            self.report('format rows (old) wall', time_calls(formatted, self.iterations))
+            self.report('stored cards (new) wall', time_calls(cards, self.iterations))
+            self.report('format rows (old) CPU', time_calls(formatted, self.iterations, time.process_time))
+            self.report('stored cards (new) CPU', time_calls(cards, self.iterations, time.process_time))
+
+    def run_json(self):
+        """Stdlib JSON encoder vs. backend.responses.dumps on formatted feed pages"""
+        if not fast_json_available():
+            self.stdout.write(self.style.WARNING('  orjson is not installed; dumps() uses the stdlib encoder'))
+
+        for limit in (20, 100):
+            listings, next_cursor = _get_listings_page(limit, visible=True)
+            payload = {'listings': _format_listings_data(listings), 'count': len(listings), 'next': next_cursor}
+            self.stdout.write(f'feed page of {limit}')
+            for label, encode in (
+                ('json + DjangoJSONEncoder', lambda: json.dumps(payload, cls=DjangoJSONEncoder).encode('utf-8')),
+                ('responses.dumps', lambda: dumps(payload)),
+            ):
+                size = len(encode())
+                samples = time_calls(encode, self.iterations)
+                mean_seconds = sum(samples) / len(samples) / 1000
+                self.report(label, samples)
+                self.stdout.write(f'  {"":<28} {size} bytes, {size / mean_seconds / (1024 * 1024):.1f} MB/s')
+
+    def run_compression(self):
+        """Bytes on the wire and compression CPU cost for the feed endpoints"""
+        client = Client(HTTP_HOST='localhost')
+        encodings = ['gzip'] + (['br'] if brotli is not None else [])
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('  brotli is not installed; measuring gzip only'))
+
+        for url in ('/listings/?limit=20', '/listings/?limit=100', '/listings/rentals/?limit=100'):
+            body = client.get(url).content
+            self.stdout.write(f'{url}  identity: {len(body)} bytes')
+            for encoding in encodings:
+                response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+                if response.get('Content-Encoding') != encoding:
+                    raise CommandError(f'{url} was not served with Content-Encoding: {encoding}')
+                size = len(response.content)
+                self.stdout.write(f'  {encoding:<28} {size} bytes ({size / len(body):.0%} of identity)')
+                self.report(
+                    f'{encoding} CPU', time_calls(lambda: compress(body, encoding), self.iterations, time.process_time)
+                )
@@ -0,0 +1,124 @@
+"""
+Django management command to check the pre-serialized listing cards against
+the listings they were built from.
+
+Usage:
+    python manage.py check_listing_cards
+    python manage.py check_listing_cards --fix
+
+This command will:
+1. Walk the listings table in id order, in batches
+2. Rebuild each listing's card in memory and compare it with listing_cards
+   (as parsed JSON, so a change of JSON encoder is not a difference)
+3. Report cards that are missing, stale (the listing changed since the card
+   was built - rebuilt on the next feed read) or mismatched (built from the
+   current version of the listing but different, i.e. a write path changed
+   the listing without bumping date_modified)
+4. With --fix, store the rebuilt cards
+
+Exits with an error when mismatched cards are left unfixed.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from listings.card_utils import build_cards, card_data, store_cards
+from listings.views import LISTING_AGGREGATES_SQL, LISTING_COLUMNS_SQL
+
+
+class Command(BaseCommand):
+    help = 'Check listing_cards against freshly built cards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Store rebuilt cards for missing, stale and mismatched listings',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Limit the number of listings to check (0 = no limit)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Listings checked per query (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+        limit = options['limit']
+        batch_size = max(options['batch_size'], 1)
+
+        counts = {'ok': 0, 'missing': 0, 'stale': 0, 'mismatched': 0}
+        fixed = 0
+        last_id = 0
+
+        while True:
+            if limit > 0:
+                batch_size = min(batch_size, limit - sum(counts.values()))
+                if batch_size <= 0:
+                    break
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT {LISTING_COLUMNS_SQL}{LISTING_AGGREGATES_SQL},
+                           lc.card AS stored_card, lc.listing_modified AS stored_modified,
+                           lc.listing_id IS NOT NULL AS has_card
+                    FROM listings l
+                    LEFT JOIN listing_cards lc ON lc.listing_id = l.id
+                    WHERE l.id > %s
+                    ORDER BY l.id
+                    LIMIT %s
+                """, [last_id, batch_size])
+                columns = [col[0] for col in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+
+            cards = build_cards(rows)
+            to_fix = []
+            for row in rows:
+                if not row['has_card']:
+                    status = 'missing'
+                elif row['stored_modified'] != row['date_modified']:
+                    status = 'stale'
+                elif card_data(row['stored_card']) != card_data(cards[row['id']]):
+                    status = 'mismatched'
+                    self.stdout.write(self.style.WARNING(f'Mismatched card: listing {row["id"]}'))
+                else:
+                    status = 'ok'
+                counts[status] += 1
+                if status != 'ok':
+                    to_fix.append(row)
+
+            if fix and to_fix:
+                store_cards(to_fix, cards)
+                fixed += len(to_fix)
+
+            checked = sum(counts.values())
+            if checked % 5000 < len(rows):
+                self.stdout.write(self.style.SUCCESS(f'Progress: {checked} listings checked'))
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Listing Card Check Complete'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Listings checked: {sum(counts.values())}')
+        self.stdout.write(f'Cards up to date: {counts["ok"]}')
+        self.stdout.write(f'Cards missing: {counts["missing"]}')
+        self.stdout.write(f'Cards stale: {counts["stale"]}')
+        self.stdout.write(f'Cards mismatched: {counts["mismatched"]}')
+        if fix:
+            self.stdout.write(f'Cards rebuilt: {fixed}')
+
+        if counts['mismatched'] and not fix:
+            raise CommandError(
+                f'{counts["mismatched"]} cards differ from their listing without a date_modified change'
+            )
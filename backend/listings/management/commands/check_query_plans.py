@@ -0,0 +1,124 @@
+"""
+Django management command to check that the listing endpoints' queries use
+indexes.
+
+Usage:
+    python manage.py check_query_plans
+    python manage.py check_query_plans --rows 100000 --verbose
+
+Synthetic listings (with one photo each) are seeded inside a transaction
+that is rolled back when the command finishes, so nothing is left behind in
+the database.
+
+This command will:
+1. Seed the synthetic listings and photos and ANALYZE them
+2. Request each feed, spotlight, landlord, detail and admin endpoint once to
+   warm the listing cards, then again while capturing its SQL
+3. EXPLAIN every captured SELECT (without running it) and look for a
+   sequential scan on listings or photos
+
+Exits with an error when any query plan scans one of those tables.
+listings.tests.QueryPlanTests runs it on every test run; run it by hand
+against a copy of the real database to check plans on production data.
+"""
+
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from listings.benchmark_utils import explain_plan, seed_listings, seed_photos
+from listings.cache_utils import invalidate_listing_feeds
+
+# Tables large enough that a sequential scan is a regression
+SEQ_SCAN_RE = re.compile(r'Seq Scan on (listings|photos)\b')
+
+
+class Command(BaseCommand):
+    help = 'Fail if a listing endpoint query plan uses a sequential scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100000,
+            help='Number of synthetic listings to seed (default: 100000)',
+        )
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Print every query plan',
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+
+        with transaction.atomic():
+            self.stdout.write(f'Seeding {rows} synthetic listings...')
+            user_id = seed_listings(rows)
+            seed_photos(user_id)
+            with connection.cursor() as cursor:
+                # The admin endpoints check the caller's user_level
+                cursor.execute("UPDATE users SET user_level = 10 WHERE user_id = %s", [user_id])
+                cursor.execute("SELECT MAX(id) FROM listings WHERE user_id = %s", [user_id])
+                listing_id = cursor.fetchone()[0]
+                # Plan against the statistics of the seeded rows, not the defaults
+                cursor.execute("ANALYZE listings, photos")
+
+            endpoints = [
+                '/listings/',
+                '/listings/rentals/',
+                '/listings/sublets/',
+                '/listings/rooms/',
+                '/listings/featured/',
+                f'/listings/landlord/?user_id={user_id}',
+                f'/listings/{listing_id}/',
+                f'/listings/admin/pending/?admin_user_id={user_id}',
+            ]
+            failures = self.check_endpoints(endpoints, options['verbose'])
+
+            # Never keep the synthetic rows
+            transaction.set_rollback(True)
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Query Plan Check Complete (seed data rolled back)'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Endpoints checked: {len(endpoints)}')
+        self.stdout.write(f'Endpoints with sequential scans: {len(failures)}')
+
+        if failures:
+            raise CommandError(f'Sequential scans in: {", ".join(failures)}')
+
+    def check_endpoints(self, endpoints, verbose):
+        client = Client(HTTP_HOST='localhost')
+        failures = []
+        for url in endpoints:
+            client.get(url)
+            invalidate_listing_feeds()
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+
+            statements = [query['sql'] for query in queries if query['sql'].lstrip().upper().startswith('SELECT')]
+            scans = []
+            for sql in statements:
+                plan = explain_plan(sql, analyze=False)
+                for line in plan:
+                    match = SEQ_SCAN_RE.search(line)
+                    if match:
+                        scans.append(match.group(0))
+                    if verbose:
+                        self.stdout.write(f'    {line}')
+
+            if response.status_code != 200:
+                status = f'FAIL (status {response.status_code})'
+            elif scans:
+                status = f'FAIL ({", ".join(sorted(set(scans)))})'
+            else:
+                status = 'ok'
+            self.stdout.write(f'  {url:<48} statements={len(statements)} {status}')
+            if status != 'ok':
+                failures.append(url)
+        return failures
@@ -0,0 +1,141 @@
+"""
+Django management command to generate thumbnail and WebP/AVIF variants for
+existing listing photos.
+
+Usage:
+    python manage.py generate_photo_variants
+    python manage.py generate_photo_variants --workers 8 --limit 500
+
+This command will:
+1. Select photos from the photos table that have no variants yet (or every
+   photo with --force)
+2. Read each original from the default storage (R2 in production)
+3. Resize and encode it in a pool of worker processes
+4. Write the variants back to storage and record them as PhotoVariant rows
+
+Prerequisites:
+- Pillow must be installed (pip install Pillow)
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from listings.cache_utils import invalidate_listing_feeds
+from listings.image_utils import images_available, render_variants, save_variants, variant_formats
+from listings.models import Photo
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/AVIF variants of listing photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the photos that would be processed without processing them',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Limit the number of photos to process (0 = no limit)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Worker processes for resizing (default: number of CPUs)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants for photos that already have them',
+        )
+
+    def handle(self, *args, **options):
+        if not images_available():
+            raise CommandError('Pillow is not installed. Run: pip install Pillow')
+
+        formats = variant_formats()
+        if not formats:
+            raise CommandError('This Pillow build cannot encode WebP or AVIF')
+
+        photos = Photo.objects.order_by('photo_id')
+        if not options['force']:
+            photos = photos.filter(variants__isnull=True)
+        if options['limit'] > 0:
+            photos = photos[:options['limit']]
+        photos = list(photos.values_list('photo_id', 'name'))
+
+        self.stdout.write(f'Found {len(photos)} photos to process (formats: {", ".join(formats)})')
+
+        if options['dry_run']:
+            for photo_id, name in photos:
+                self.stdout.write(f'[DRY RUN] Would process: {photo_id} {name}')
+            return
+
+        processed = 0
+        errors = 0
+        bytes_written = 0
+        started = time.perf_counter()
+
+        # Originals are read here and handed to the pool as bytes; only the
+        # CPU-bound resize/encode runs in the workers
+        workers = max(options['workers'] or os.cpu_count() or 1, 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            max_in_flight = workers * 2
+            in_flight = {}
+            queue = iter(photos)
+
+            while True:
+                # Keep a bounded number of originals in memory
+                for photo_id, name in queue:
+                    try:
+                        with default_storage.open(name, 'rb') as f:
+                            data = f.read()
+                    except Exception as e:
+                        errors += 1
+                        self.stdout.write(self.style.ERROR(f'Error reading {name}: {e}'))
+                        continue
+                    in_flight[executor.submit(render_variants, data, formats=formats)] = (photo_id, name)
+                    if len(in_flight) >= max_in_flight:
+                        break
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    photo_id, name = in_flight.pop(future)
+                    try:
+                        variants = save_variants(photo_id, name, future.result())
+                    except Exception as e:
+                        errors += 1
+                        self.stdout.write(self.style.ERROR(f'Error processing {name}: {e}'))
+                        continue
+
+                    processed += 1
+                    bytes_written += sum(variant.size_bytes for variant in variants)
+                    if processed % 100 == 0:
+                        self.stdout.write(
+                            self.style.SUCCESS(f'Progress: {processed}/{len(photos)} photos')
+                        )
+
+        if processed:
+            invalidate_listing_feeds()
+
+        duration = time.perf_counter() - started
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Photo Variants Complete'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Photos processed: {processed}')
+        self.stdout.write(f'Errors: {errors}')
+        self.stdout.write(f'Variant data written: {bytes_written / (1024 * 1024):.1f} MB')
+        if duration > 0:
+            self.stdout.write(f'Throughput: {processed / duration:.1f} photos/s ({duration:.1f}s)')
@@ -0,0 +1,118 @@
+"""
+Django management command to measure how many database connections a
+running server opens under load.
+
+Usage:
+    python manage.py loadtest_db_connections --url http://localhost:8080/listings/
+
+Run it once against a server started with DB_POOL_MODE=off and once with
+the pooled/persistent mode to compare. Connections are counted on the
+Postgres side from pg_stat_database.sessions (PostgreSQL 14+), so the
+command needs the same database settings as the server under test.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from listings.benchmark_utils import percentile
+
+
+class Command(BaseCommand):
+    help = 'Report database connections opened per 1,000 requests against a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            action='append',
+            required=True,
+            help='URL to request (may be repeated; requests are spread across them)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Total number of requests to send (default: 1000)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Concurrent client threads (default: 8)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30.0,
+            help='Per-request timeout in seconds (default: 30)',
+        )
+
+    def get_session_count(self):
+        """Cumulative number of sessions Postgres has accepted for this database"""
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(
+                    "SELECT sessions FROM pg_stat_database WHERE datname = current_database()"
+                )
+            except Exception as e:
+                raise CommandError(f'Could not read pg_stat_database.sessions (PostgreSQL 14+ required): {e}')
+            return cursor.fetchone()[0]
+
+    def handle(self, *args, **options):
+        urls = options['url']
+        total = options['requests']
+        timeout = options['timeout']
+
+        local = threading.local()
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def send(i):
+            # One keep-alive HTTP session per client thread
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            url = urls[i % len(urls)]
+            start = time.perf_counter()
+            try:
+                response = session.get(url, timeout=timeout)
+                ok = response.status_code < 500
+            except requests.RequestException as e:
+                ok = False
+                response = e
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors.append(f'{url}: {response}')
+
+        sessions_before = self.get_session_count()
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(send, range(total)))
+
+        duration = time.perf_counter() - started
+        # Our own connection was opened by the first reading, so it is not counted
+        sessions_after = self.get_session_count()
+        opened = sessions_after - sessions_before
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Load Test Complete'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Requests sent: {total} ({len(errors)} errors)')
+        self.stdout.write(f'Throughput: {total / duration:.1f} req/s')
+        self.stdout.write(
+            f'Latency: p50={percentile(latencies, 50):.1f}ms p99={percentile(latencies, 99):.1f}ms'
+        )
+        self.stdout.write(f'Database connections opened: {opened}')
+        self.stdout.write(f'Connections per 1,000 requests: {opened * 1000 / total:.1f}')
+
+        for error in errors[:5]:
+            self.stdout.write(self.style.ERROR(f'  {error}'))
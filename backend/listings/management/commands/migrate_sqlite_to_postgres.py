@@ -1,13 +1,33 @@
 """
 Django management command to migrate data from SQLite to PostgreSQL.
 This reads data from a local SQLite database and inserts it into the configured PostgreSQL database.
+
+Usage:
+    python manage.py migrate_sqlite_to_postgres --sqlite-db local.db
+    python manage.py migrate_sqlite_to_postgres --bulk --chunk-size 5000
+
+--bulk streams each table from SQLite in chunks and loads every chunk with a
+single multi-row INSERT (psycopg2 execute_values) instead of one INSERT per
+row, reporting progress and rows/sec per table.
+
+Both modes insert with ON CONFLICT DO NOTHING: rows whose key already exists
+in PostgreSQL are left as they are and counted as already present, so the
+command can be rerun over a partly migrated database.
 """
 
 import sqlite3
-from django.core.management.base import BaseCommand
+import time
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connection
 from pathlib import Path
 
+try:
+    from psycopg2.extras import execute_values
+except ImportError:
+    execute_values = None
+
+DATE_TYPES = ('timestamp without time zone', 'timestamp with time zone', 'date')
+
 
 class Command(BaseCommand):
     help = 'Migrate data from SQLite database to PostgreSQL'
@@ -24,10 +44,27 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be done without actually inserting data'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Load rows in chunks with multi-row INSERTs instead of row by row '
+                 '(existing rows are skipped in both modes)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows read from SQLite and inserted per statement in --bulk mode (default: 5000)'
+        )
 
     def handle(self, *args, **options):
         sqlite_path = options['sqlite_db']
         dry_run = options['dry_run']
+        bulk = options['bulk']
+        chunk_size = max(options['chunk_size'], 1)
+
+        if bulk and execute_values is None:
+            raise CommandError('--bulk requires psycopg2 (pip install psycopg2-binary)')
 
         # Check if SQLite file exists
         if not Path(sqlite_path).exists():
@@ -92,12 +129,18 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write(self.style.WARNING('\n=== DRY RUN MODE ===\n'))
 
+        started = time.perf_counter()
         with connection.cursor() as pg_cursor:
             for table_name in tables_to_migrate:
-                self.migrate_table(sqlite_cursor, pg_cursor, table_name, pg_tables[table_name], dry_run)
+                if bulk:
+                    self.migrate_table_bulk(
+                        sqlite_cursor, pg_cursor, table_name, pg_tables[table_name], dry_run, chunk_size
+                    )
+                else:
+                    self.migrate_table(sqlite_cursor, pg_cursor, table_name, pg_tables[table_name], dry_run)
 
         sqlite_conn.close()
-        self.stdout.write(self.style.SUCCESS('\nMigration complete!'))
+        self.stdout.write(self.style.SUCCESS(f'\nMigration complete! ({time.perf_counter() - started:.1f}s)'))
 
     def get_pg_tables(self):
         """Get PostgreSQL table and column information"""
@@ -129,29 +172,58 @@ class Command(BaseCommand):
         
         return tables
 
+    def get_common_columns(self, sqlite_cursor, table_name, pg_columns):
+        """Columns present in both the SQLite and PostgreSQL table, in SQLite order"""
+        # Get column names from SQLite
+        sqlite_cursor.execute(f'PRAGMA table_info("{table_name}")')
+        sqlite_columns_info = sqlite_cursor.fetchall()
+        sqlite_columns = [col['name'] for col in sqlite_columns_info]
+        
+        if not sqlite_columns:
+            self.stdout.write(f'  {table_name}: No columns found, skipping')
+            return []
+
+        # Find common columns (exist in both SQLite and PostgreSQL)
+        common_columns = [col for col in sqlite_columns if col in pg_columns]
+        
+        if not common_columns:
+            self.stdout.write(f'  {table_name}: No common columns, skipping')
+            return []
+        
+        # Columns that exist in SQLite but not PostgreSQL
+        missing_in_pg = [col for col in sqlite_columns if col not in pg_columns]
+        if missing_in_pg:
+            self.stdout.write(f'  {table_name}: Skipping columns not in PostgreSQL: {", ".join(missing_in_pg)}')
+
+        return common_columns
+
+    def convert_row(self, row, common_columns, pg_columns):
+        """Values of a SQLite row for the common columns, converted for PostgreSQL"""
+        values = []
+        for col in common_columns:
+            val = row[col]
+            pg_type = pg_columns[col]['type']
+            
+            # Convert SQLite integers to booleans for boolean columns
+            if pg_type == 'boolean' and isinstance(val, int):
+                val = bool(val)
+            
+            # Handle invalid date/time values from SQLite
+            if pg_type in DATE_TYPES:
+                if isinstance(val, str):
+                    # Convert invalid dates to NULL
+                    if val.startswith('0000-00-00') or val == '' or val == '0':
+                        val = None
+            
+            values.append(val)
+        return values
+
     def migrate_table(self, sqlite_cursor, pg_cursor, table_name, pg_columns, dry_run):
         """Migrate data from a single table"""
         try:
-            # Get column names from SQLite
-            sqlite_cursor.execute(f'PRAGMA table_info("{table_name}")')
-            sqlite_columns_info = sqlite_cursor.fetchall()
-            sqlite_columns = [col['name'] for col in sqlite_columns_info]
-            
-            if not sqlite_columns:
-                self.stdout.write(f'  {table_name}: No columns found, skipping')
-                return
-
-            # Find common columns (exist in both SQLite and PostgreSQL)
-            common_columns = [col for col in sqlite_columns if col in pg_columns]
-            
+            common_columns = self.get_common_columns(sqlite_cursor, table_name, pg_columns)
             if not common_columns:
-                self.stdout.write(f'  {table_name}: No common columns, skipping')
                 return
-            
-            # Columns that exist in SQLite but not PostgreSQL
-            missing_in_pg = [col for col in sqlite_columns if col not in pg_columns]
-            if missing_in_pg:
-                self.stdout.write(f'  {table_name}: Skipping columns not in PostgreSQL: {", ".join(missing_in_pg)}')
 
             # Get all data from SQLite
             sqlite_cursor.execute(f'SELECT * FROM "{table_name}"')
@@ -179,26 +251,9 @@ class Command(BaseCommand):
             for row in rows:
                 try:
                     # Get values for common columns only
-                    values = []
-                    for col in common_columns:
-                        val = row[col]
-                        pg_type = pg_columns[col]['type']
-                        
-                        # Convert SQLite integers to booleans for boolean columns
-                        if pg_type == 'boolean' and isinstance(val, int):
-                            val = bool(val)
-                        
-                        # Handle invalid date/time values from SQLite
-                        if pg_type in ('timestamp without time zone', 'timestamp with time zone', 'date'):
-                            if isinstance(val, str):
-                                # Convert invalid dates to NULL
-                                if val.startswith('0000-00-00') or val == '' or val == '0':
-                                    val = None
-                        
-                        values.append(val)
-                    
+                    values = self.convert_row(row, common_columns, pg_columns)
                     pg_cursor.execute(insert_sql, values)
-                    inserted += 1
+                    inserted += pg_cursor.rowcount
                 except Exception as e:
                     errors += 1
                     if errors <= 5:  # Only show first 5 errors
@@ -207,7 +262,82 @@ class Command(BaseCommand):
             # Update sequence for auto-increment columns
             self.update_sequence(pg_cursor, table_name, common_columns)
             
-            self.stdout.write(f'    Inserted {inserted} rows ({errors} errors)')
+            self.stdout.write(
+                f'    Inserted {inserted} rows, {len(rows) - inserted - errors} already present ({errors} errors)'
+            )
+            
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f'  Error migrating {table_name}: {e}'))
+
+    def migrate_table_bulk(self, sqlite_cursor, pg_cursor, table_name, pg_columns, dry_run, chunk_size):
+        """Migrate a table in chunks, one multi-row INSERT per chunk"""
+        try:
+            common_columns = self.get_common_columns(sqlite_cursor, table_name, pg_columns)
+            if not common_columns:
+                return
+
+            sqlite_cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"')
+            total = sqlite_cursor.fetchone()[0]
+
+            if not total:
+                self.stdout.write(f'  {table_name}: No data to migrate')
+                return
+
+            self.stdout.write(f'  {table_name}: Found {total} rows ({len(common_columns)} columns)')
+
+            if dry_run:
+                self.stdout.write(f'    Would insert {total} rows in chunks of {chunk_size}')
+                return
+
+            columns_str = ', '.join([f'"{col}"' for col in common_columns])
+            bulk_sql = f'INSERT INTO "{table_name}" ({columns_str}) VALUES %s ON CONFLICT DO NOTHING'
+            placeholders = ', '.join(['%s'] * len(common_columns))
+            row_sql = f'INSERT INTO "{table_name}" ({columns_str}) VALUES ({placeholders}) ON CONFLICT DO NOTHING'
+
+            # Stream from SQLite rather than loading the whole table
+            sqlite_cursor.execute(f'SELECT {columns_str} FROM "{table_name}"')
+
+            processed = 0
+            inserted = 0
+            errors = 0
+            started = time.perf_counter()
+
+            while True:
+                rows = sqlite_cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                values = [self.convert_row(row, common_columns, pg_columns) for row in rows]
+
+                try:
+                    # page_size covers the whole chunk, so this is one statement
+                    execute_values(pg_cursor.cursor, bulk_sql, values, page_size=len(values))
+                    inserted += pg_cursor.rowcount
+                except Exception as e:
+                    # Fall back to row by row so one bad row does not lose the chunk
+                    self.stderr.write(f'    Chunk failed ({e}), retrying row by row')
+                    for row_values in values:
+                        try:
+                            pg_cursor.execute(row_sql, row_values)
+                            inserted += pg_cursor.rowcount
+                        except Exception as row_error:
+                            errors += 1
+                            if errors <= 5:  # Only show first 5 errors
+                                self.stderr.write(f'    Error inserting row: {row_error}')
+
+                processed += len(rows)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'    {processed}/{total} rows ({processed / elapsed if elapsed else 0:.0f} rows/s)'
+                )
+
+            # Update sequence for auto-increment columns
+            self.update_sequence(pg_cursor, table_name, common_columns)
+
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f'    Inserted {inserted} rows, {processed - inserted - errors} already present '
+                f'({errors} errors) in {elapsed:.1f}s - {processed / elapsed if elapsed else 0:.0f} rows/s'
+            ))
             
         except Exception as e:
             self.stderr.write(self.style.ERROR(f'  Error migrating {table_name}: {e}'))
@@ -3,29 +3,88 @@ Django management command to migrate existing files from local storage to Cloudf
 
 Usage:
     python manage.py migrate_to_r2
+    python manage.py migrate_to_r2 --concurrency 16
+    python manage.py migrate_to_r2 --verify-existing
 
 This command will:
 1. Read all files from the local uploads directory
-2. Upload each file to Cloudflare R2
-3. Track progress and handle errors
+2. Upload them to Cloudflare R2 from a pool of threads (large files are sent
+   as multipart uploads)
+3. Record every finished file in a JSON-lines manifest (key, ETag, size), so
+   a rerun skips finished files without asking R2 about each one. The ETag
+   comes from the PutObject / CompleteMultipartUpload response.
+   --verify-existing additionally HEADs each file missing from the manifest
+   and skips it if R2 already has it at the same size (for buckets filled
+   before the manifest existed)
+4. Track progress and handle errors, then report files/s and MB/s
 
 Prerequisites:
 - R2 credentials must be configured in environment variables
 - boto3 must be installed (pip install boto3)
+
+For testing, --endpoint-url can point at any S3-compatible server (e.g.
+moto_server or MinIO).
 """
 
 import os
+import json
+import time
+import threading
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 
 try:
     import boto3
+    from botocore.config import Config as BotoConfig
     from botocore.exceptions import ClientError
 except ImportError:
     boto3 = None
 
+MB = 1024 * 1024
+
+
+class UploadManifest:
+    """
+    Append-only JSON-lines record of files already in the bucket.
+    One line per file: {"key", "etag", "size", "uploaded_at"}.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written last line of an interrupted run
+                    self.entries[entry['key']] = entry
+
+    def is_done(self, key, size):
+        entry = self.entries.get(key)
+        return entry is not None and entry.get('size') == size
+
+    def record(self, key, etag, size):
+        entry = {
+            'key': key,
+            'etag': etag,
+            'size': size,
+            'uploaded_at': datetime.now(timezone.utc).isoformat(),
+        }
+        with self.lock:
+            self.entries[key] = entry
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
 
 class Command(BaseCommand):
     help = 'Migrate existing media files from local storage to Cloudflare R2'
@@ -48,6 +107,67 @@ class Command(BaseCommand):
             default=0,
             help='Skip the first N files (useful for resuming)',
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Number of files uploaded in parallel (default: 8)',
+        )
+        parser.add_argument(
+            '--multipart-threshold',
+            type=int,
+            default=16,
+            help='Files of at least this many MB use multipart upload (default: 16)',
+        )
+        parser.add_argument(
+            '--verify-existing',
+            action='store_true',
+            help='HEAD files missing from the manifest and skip those already in R2',
+        )
+        parser.add_argument(
+            '--manifest',
+            type=str,
+            default=None,
+            help='Path of the JSON-lines upload manifest (default: <BASE_DIR>/r2_manifest.jsonl)',
+        )
+        parser.add_argument(
+            '--endpoint-url',
+            type=str,
+            default=None,
+            help='Override the R2 endpoint (e.g. a local S3-compatible server for testing)',
+        )
+
+    def multipart_upload(self, s3_client, bucket, key, file_path, size, chunk_size, extra_args):
+        """
+        Upload one file in parts of chunk_size, four at a time, and return the
+        ETag from CompleteMultipartUpload. The upload is aborted on failure so
+        R2 does not keep the orphaned parts.
+        """
+        upload_id = s3_client.create_multipart_upload(Bucket=bucket, Key=key, **extra_args)['UploadId']
+
+        def upload_part(part_number, offset):
+            with open(file_path, 'rb') as f:
+                f.seek(offset)
+                body = f.read(chunk_size)
+            response = s3_client.upload_part(
+                Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body,
+            )
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                parts = list(executor.map(
+                    upload_part,
+                    range(1, -(-size // chunk_size) + 1),
+                    range(0, size, chunk_size),
+                ))
+            response = s3_client.complete_multipart_upload(
+                Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts},
+            )
+        except Exception:
+            s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+        return response['ETag']
 
     def handle(self, *args, **options):
         if boto3 is None:
@@ -73,25 +193,33 @@ class Command(BaseCommand):
         dry_run = options['dry_run']
         limit = options['limit']
         skip = options['skip']
+        concurrency = max(options['concurrency'], 1)
 
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN - No files will be uploaded'))
 
-        # Initialize R2 client
-        endpoint_url = f"https://{r2_account_id}.r2.cloudflarestorage.com"
-        
+        # Initialize R2 client (boto3 clients are safe to share between threads)
+        endpoint_url = options['endpoint_url'] or f"https://{r2_account_id}.r2.cloudflarestorage.com"
+
         s3_client = boto3.client(
             's3',
             endpoint_url=endpoint_url,
             aws_access_key_id=r2_access_key,
             aws_secret_access_key=r2_secret_key,
             region_name='auto',  # R2 uses 'auto' as region
+            config=BotoConfig(max_pool_connections=concurrency * 2),
         )
+        threshold = options['multipart_threshold'] * MB
+        chunk_size = max(threshold // 2, 8 * MB)
+        verify_existing = options['verify_existing']
+
+        manifest = UploadManifest(options['manifest'] or Path(settings.BASE_DIR) / 'r2_manifest.jsonl')
+        self.stdout.write(f'Manifest: {manifest.path} ({len(manifest.entries)} files already recorded)')
 
         # Get list of files
-        files = list(uploads_dir.glob('*'))
+        files = sorted(path for path in uploads_dir.glob('*') if path.is_file())
         total_files = len(files)
-        
+
         self.stdout.write(f'Found {total_files} files in {uploads_dir}')
 
         if skip > 0:
@@ -102,58 +230,91 @@ class Command(BaseCommand):
             files = files[:limit]
             self.stdout.write(f'Processing only {limit} files')
 
-        uploaded = 0
-        skipped = 0
-        errors = 0
-
-        for i, file_path in enumerate(files, 1):
-            if not file_path.is_file():
-                continue
+        # Files recorded in the manifest with the same size are already done
+        pending = []
+        in_manifest = 0
+        for file_path in files:
+            if manifest.is_done(file_path.name, file_path.stat().st_size):
+                in_manifest += 1
+            else:
+                pending.append(file_path)
+        if in_manifest:
+            self.stdout.write(f'Skipping {in_manifest} files already in the manifest')
 
+        def upload(file_path):
+            """Upload one file; returns ('uploaded' | 'exists', bytes sent)"""
             file_name = file_path.name
-            
+            size = file_path.stat().st_size
+
+            if verify_existing:
+                # Not in the manifest - it may still be in R2 from an older run
+                try:
+                    head = s3_client.head_object(Bucket=r2_bucket, Key=file_name)
+                    if head['ContentLength'] == size:
+                        manifest.record(file_name, head['ETag'].strip('"'), size)
+                        return 'exists', 0
+                except ClientError as e:
+                    if e.response['Error']['Code'] not in ('404', 'NoSuchKey', 'NotFound'):
+                        raise
+
             # Guess content type
             content_type, _ = mimetypes.guess_type(str(file_path))
             if content_type is None:
                 content_type = 'application/octet-stream'
+            extra_args = {
+                'ContentType': content_type,
+                'CacheControl': 'max-age=31536000',  # 1 year cache
+            }
 
-            try:
-                if dry_run:
-                    self.stdout.write(f'[DRY RUN] Would upload: {file_name}')
-                    uploaded += 1
-                else:
-                    # Check if file already exists in R2
+            if size >= threshold:
+                etag = self.multipart_upload(
+                    s3_client, r2_bucket, file_name, file_path, size, chunk_size, extra_args,
+                )
+            else:
+                with open(file_path, 'rb') as f:
+                    etag = s3_client.put_object(Bucket=r2_bucket, Key=file_name, Body=f, **extra_args)['ETag']
+
+            manifest.record(file_name, etag.strip('"'), size)
+            return 'uploaded', size
+
+        uploaded = 0
+        skipped = 0
+        errors = 0
+        bytes_uploaded = 0
+        started = time.perf_counter()
+
+        if dry_run:
+            for file_path in pending:
+                self.stdout.write(f'[DRY RUN] Would upload: {file_path.name}')
+            uploaded = len(pending)
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {executor.submit(upload, file_path): file_path for file_path in pending}
+                for future in as_completed(futures):
+                    file_name = futures[future].name
                     try:
-                        s3_client.head_object(Bucket=r2_bucket, Key=file_name)
+                        status, size = future.result()
+                    except Exception as e:
+                        errors += 1
+                        self.stdout.write(
+                            self.style.ERROR(f'Error uploading {file_name}: {e}')
+                        )
+                        continue
+
+                    if status == 'exists':
                         self.stdout.write(f'[SKIP] Already exists: {file_name}')
                         skipped += 1
                         continue
-                    except ClientError as e:
-                        if e.response['Error']['Code'] != '404':
-                            raise
-
-                    # Upload file
-                    with open(file_path, 'rb') as f:
-                        s3_client.put_object(
-                            Bucket=r2_bucket,
-                            Key=file_name,
-                            Body=f,
-                            ContentType=content_type,
-                            CacheControl='max-age=31536000',  # 1 year cache
-                        )
-                    
+
                     uploaded += 1
-                    
+                    bytes_uploaded += size
+
                     if uploaded % 100 == 0:
                         self.stdout.write(
-                            self.style.SUCCESS(f'Progress: {uploaded}/{len(files)} uploaded')
+                            self.style.SUCCESS(f'Progress: {uploaded}/{len(pending)} uploaded')
                         )
 
-            except Exception as e:
-                errors += 1
-                self.stdout.write(
-                    self.style.ERROR(f'Error uploading {file_name}: {e}')
-                )
+        duration = time.perf_counter() - started
 
         # Summary
         self.stdout.write('')
@@ -162,8 +323,14 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('=' * 50))
         self.stdout.write(f'Total files found: {total_files}')
         self.stdout.write(f'Files uploaded: {uploaded}')
+        self.stdout.write(f'Files skipped (in manifest): {in_manifest}')
         self.stdout.write(f'Files skipped (already exist): {skipped}')
         self.stdout.write(f'Errors: {errors}')
+        if not dry_run and duration > 0:
+            self.stdout.write(
+                f'Throughput: {uploaded / duration:.1f} files/s, '
+                f'{bytes_uploaded / MB / duration:.2f} MB/s ({duration:.1f}s)'
+            )
 
         if errors > 0:
             self.stdout.write(
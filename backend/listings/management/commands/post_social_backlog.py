@@ -0,0 +1,229 @@
+"""
+Django management command to post the backlog of listings that asked for
+social media posting but were never posted (e.g. after a Meta outage).
+
+Usage:
+    python manage.py post_social_backlog --dry-run
+    python manage.py post_social_backlog --limit 50 --concurrency 4
+
+This command will:
+1. Select every approved, visible listing with social_media_posting set and
+   social_media_posted unset in one query (listings with a queued or running
+   SocialPostJob are left to the process_social_jobs worker)
+2. Format them in a single batch
+3. Post to Instagram and Facebook with bounded concurrency, spacing posts to
+   each platform by --interval seconds
+4. Write every result back in a single UPDATE
+
+Listings are processed in id order; the summary prints the --start-after
+value to resume from if the run is interrupted. Listings whose last attempt
+failed (social_media_error set) are skipped, so a resumed run neither
+re-posts nor loops on them; pass --retry-failed to try them again.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from listings.cache_utils import invalidate_listing_feeds
+from listings.social_jobs import PLATFORMS, format_errors, format_post_ids
+from listings.social_utils import MetaSocialManager
+from listings.views import LISTING_AGGREGATES_SQL, LISTING_COLUMNS_SQL, _format_listings_data
+
+
+class _PlatformRateLimiter:
+    """Let at most one post through per `interval` seconds"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start_at = max(now, self.next_at)
+            self.next_at = start_at + self.interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+
+class Command(BaseCommand):
+    help = 'Post approved listings still waiting for their social media post'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the listings that would be posted without posting them',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Limit the number of listings to process (0 = no limit)',
+        )
+        parser.add_argument(
+            '--start-after',
+            type=int,
+            default=0,
+            help='Only process listings with an id greater than this (useful for resuming)',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also post listings whose last attempt failed (social_media_error set)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Posts in flight at once across both platforms (default: 4)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Minimum seconds between two posts to the same platform (default: 5)',
+        )
+
+    def get_backlog(self, start_after, limit, retry_failed=False):
+        """Raw rows of the listings still waiting to be posted, in id order"""
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {LISTING_COLUMNS_SQL}{LISTING_AGGREGATES_SQL}
+                FROM listings l
+                WHERE l.social_media_posting = TRUE
+                  AND l.social_media_posted = FALSE
+                  AND l.visible = TRUE
+                  AND l.approval_status = 'approved'
+                  AND l.id > %s
+                  AND (%s OR l.social_media_error IS NULL)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM social_post_jobs j
+                      WHERE j.listing_id = l.id AND j.status IN ('pending', 'running')
+                  )
+                ORDER BY l.id
+                LIMIT %s
+            """, [start_after, retry_failed, limit or None])
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def save_results(self, results):
+        """Write (listing_id, posted, post_id, error) rows back in one statement"""
+        if not results:
+            return
+        values_sql = ', '.join(['(%s, %s, %s, %s)'] * len(results))
+        params = [value for row in results for value in row]
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                UPDATE listings AS l
+                SET social_media_posted = v.posted,
+                    social_media_post_id = v.post_id,
+                    social_media_error = v.error,
+                    date_modified = NOW()
+                FROM (VALUES {values_sql}) AS v(id, posted, post_id, error)
+                WHERE l.id = v.id
+            """, params)
+        invalidate_listing_feeds()
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        start_after = options['start_after']
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - Nothing will be posted'))
+
+        listings = _format_listings_data(self.get_backlog(start_after, options['limit'], options['retry_failed']))
+        self.stdout.write(f'Found {len(listings)} listings waiting to be posted')
+
+        if dry_run:
+            for listing in listings:
+                self.stdout.write(f'[DRY RUN] Would post: {listing["id"]} {listing.get("title") or ""}')
+            return
+
+        manager = MetaSocialManager()
+        limiters = {platform: _PlatformRateLimiter(options['interval']) for platform in PLATFORMS}
+        outcomes = {listing['id']: {'post_ids': {}, 'errors': {}} for listing in listings}
+        started = time.perf_counter()
+
+        def post(listing, platform):
+            limiters[platform].wait()
+            results = manager.post_listing(listing, platforms=(platform,))
+            return results.get(platform, results)
+
+        def record(future):
+            """Add a finished post to its listing's outcome; an exception counts as an error"""
+            listing_id, platform = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'error': f'{type(e).__name__}: {e}'}
+            outcome = outcomes[listing_id]
+            if 'id' in result:
+                outcome['post_ids'][platform] = result['id']
+            else:
+                outcome['errors'][platform] = result.get('error', 'Unknown error')
+            return listing_id, platform, result
+
+        executor = ThreadPoolExecutor(max_workers=max(options['concurrency'], 1))
+        futures = {
+            executor.submit(post, listing, platform): (listing['id'], platform)
+            for listing in listings for platform in PLATFORMS
+        }
+        recorded = set()
+        try:
+            for future in as_completed(futures):
+                listing_id, platform, result = record(future)
+                recorded.add(future)
+                if 'id' in result:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'  ✓ {listing_id} {platform} ({result.get("latency_ms", 0):.0f}ms)'
+                    ))
+                else:
+                    self.stdout.write(self.style.ERROR(f'  ✗ {listing_id} {platform}: {result.get("error")}'))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nInterrupted - waiting for posts in flight, then saving'))
+        finally:
+            # Posts already sent are always recorded so a resume never repeats them
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future in futures:
+                if future not in recorded and not future.cancelled():
+                    record(future)
+
+            # Listings with an answer from both platforms, or posted to at
+            # least one, are written back; the rest are picked up again on the
+            # next run
+            finished = [
+                listing_id for listing_id, outcome in outcomes.items()
+                if outcome['post_ids'] or len(outcome['errors']) == len(PLATFORMS)
+            ]
+            rows = []
+            for listing_id in finished:
+                post_id = format_post_ids(outcomes[listing_id]['post_ids'])
+                rows.append((listing_id, post_id is not None, post_id, format_errors(outcomes[listing_id]['errors'])))
+            self.save_results(rows)
+
+        posted = sum(1 for row in rows if row[1])
+        unfinished = [listing_id for listing_id in outcomes if listing_id not in finished]
+        duration = time.perf_counter() - started
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Social Backlog Complete'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Listings found: {len(listings)}')
+        self.stdout.write(f'Listings posted: {posted}')
+        self.stdout.write(f'Listings failed: {len(rows) - posted}')
+        self.stdout.write(f'Duration: {duration:.1f}s')
+
+        if unfinished:
+            resume_after = min(unfinished) - 1
+            self.stdout.write(
+                self.style.WARNING(f'\n{len(unfinished)} listings were not finished. Resume with --start-after {resume_after}')
+            )
+        elif rows:
+            self.stdout.write(f'Last listing processed: {max(finished)}')
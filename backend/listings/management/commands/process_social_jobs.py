@@ -0,0 +1,79 @@
+"""
+Django management command that works the social media posting queue.
+
+Usage:
+    python manage.py process_social_jobs
+    python manage.py process_social_jobs --once
+
+Approving a listing with social_media_posting only queues a SocialPostJob;
+this worker posts it to Instagram and Facebook, retrying failures with
+exponential backoff. Several workers may run at once - jobs are claimed with
+FOR UPDATE SKIP LOCKED. Point META_GRAPH_URL at a stub server to test
+without reaching Meta.
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from listings.models import SocialPostJob
+from listings.social_jobs import claim_due_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Post queued listings to Instagram and Facebook'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the jobs that are due now, then exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5,
+            help='Jobs claimed per round (default: 5)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=10.0,
+            help='Seconds to wait when no job is due (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        counts = {status: 0 for status in SocialPostJob.Status.values}
+
+        try:
+            while True:
+                close_old_connections()
+                jobs = claim_due_jobs(options['batch_size'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                for job in jobs:
+                    status = run_job(job)
+                    counts[status] += 1
+                    message = f'Job {job.id} (listing {job.listing_id}, attempt {job.attempts}): {status}'
+                    if status == SocialPostJob.Status.SUCCEEDED:
+                        self.stdout.write(self.style.SUCCESS(f'  ✓ {message}'))
+                    elif status == SocialPostJob.Status.FAILED:
+                        self.stdout.write(self.style.ERROR(f'  ✗ {message}: {job.last_error}'))
+                    else:
+                        self.stdout.write(self.style.WARNING(
+                            f'  ↻ {message}, retrying after {job.run_after:%H:%M:%S}: {job.last_error}'
+                        ))
+        except KeyboardInterrupt:
+            self.stdout.write('\nStopping worker...')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Social Posting Worker Summary'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Posted: {counts[SocialPostJob.Status.SUCCEEDED]}')
+        self.stdout.write(f'Retrying later: {counts[SocialPostJob.Status.PENDING]}')
+        self.stdout.write(f'Failed permanently: {counts[SocialPostJob.Status.FAILED]}')
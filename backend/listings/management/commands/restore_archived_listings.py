@@ -0,0 +1,83 @@
+"""
+Django management command to bring archived listings back.
+
+Usage:
+    python manage.py restore_archived_listings --ids 123,456
+    python manage.py restore_archived_listings --user-id 42 --dry-run
+
+This command will:
+1. Find the archived listings by id or by owner
+2. Move them, with their photos, photo variants and utility links, back into
+   the hot tables in one transaction
+3. Leave them hidden (visible = FALSE) until an admin approves them again
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from listings.archive_utils import restore_listings
+from listings.cache_utils import invalidate_listing_feeds
+
+
+class Command(BaseCommand):
+    help = 'Restore archived listings into the listings table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ids',
+            type=str,
+            default='',
+            help='Comma-separated listing ids to restore',
+        )
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            default=None,
+            help='Restore every archived listing of this user',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the listings that would be restored',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            listing_ids = [int(part) for part in options['ids'].split(',') if part.strip()]
+        except ValueError:
+            raise CommandError('--ids must be a comma-separated list of integers')
+        if not listing_ids and options['user_id'] is None:
+            raise CommandError('Pass --ids or --user-id')
+
+        with connection.cursor() as cursor:
+            if options['user_id'] is not None:
+                cursor.execute(
+                    "SELECT id FROM listings_archive WHERE user_id = %s ORDER BY id",
+                    [options['user_id']]
+                )
+            else:
+                cursor.execute(
+                    "SELECT id FROM listings_archive WHERE id = ANY(%s) ORDER BY id",
+                    [listing_ids]
+                )
+            found = [row[0] for row in cursor.fetchall()]
+
+        missing = sorted(set(listing_ids) - set(found))
+        for listing_id in missing:
+            self.stdout.write(self.style.WARNING(f'Listing {listing_id} is not in the archive'))
+
+        if options['dry_run']:
+            self.stdout.write(f'Would restore {len(found)} listings: {", ".join(map(str, found))}')
+            return
+
+        restored = restore_listings(found)
+        if restored:
+            invalidate_listing_feeds()
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Listing Restore Complete'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Listings restored: {len(restored)}')
+        self.stdout.write(f'Not found in archive: {len(missing)}')
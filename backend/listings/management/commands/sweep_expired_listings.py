@@ -0,0 +1,103 @@
+"""
+Django management command to hide listings past their expiry date.
+
+Usage:
+    python manage.py sweep_expired_listings
+    python manage.py sweep_expired_listings --dry-run
+    python manage.py sweep_expired_listings --batch-size 1000 --concurrency 8
+
+Run it daily (e.g. from cron shortly after midnight). The visible feeds
+already leave out listings whose date_expires has passed; the sweep makes
+that permanent and stops their billing.
+
+This command will:
+1. Hide expired visible listings in batches, each batch one UPDATE that also
+   writes a listing_expirations row per listing
+2. Invalidate the cached feeds after every batch
+3. Cancel the Stripe subscriptions of the hidden listings, several in
+   parallel, keeping subscriptions that still cover a visible listing.
+   Cancellations that failed on an earlier run are retried
+"""
+
+from django.core.management.base import BaseCommand
+
+from listings.cache_utils import invalidate_listing_feeds
+from listings.expiry_utils import (
+    Status, cancel_subscriptions, count_expired, expire_listings, pending_subscriptions,
+)
+
+
+class Command(BaseCommand):
+    help = 'Hide expired listings and cancel their Stripe subscriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be expired without changing anything',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Limit the number of listings to expire (0 = no limit)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Listings hidden per UPDATE (default: 500)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Parallel Stripe cancellation requests (default: 4)',
+        )
+        parser.add_argument(
+            '--skip-stripe',
+            action='store_true',
+            help='Only hide listings; their subscriptions stay pending for the next run',
+        )
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        batch_size = max(options['batch_size'], 1)
+
+        if options['dry_run']:
+            listings, subscriptions = count_expired()
+            self.stdout.write(f'Would expire {listings} listings and cancel up to {subscriptions} subscriptions')
+            return
+
+        expired = 0
+        while True:
+            if limit > 0:
+                batch_size = min(batch_size, limit - expired)
+                if batch_size <= 0:
+                    break
+            listing_ids = expire_listings(batch_size)
+            if not listing_ids:
+                break
+            expired += len(listing_ids)
+            invalidate_listing_feeds()
+            self.stdout.write(self.style.SUCCESS(f'Expired {len(listing_ids)} listings (total {expired})'))
+
+        cancellations = {}
+        if not options['skip_stripe']:
+            cancellations = cancel_subscriptions(pending_subscriptions(), options['concurrency'])
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Expiry Sweep Complete'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f'Listings expired: {expired}')
+        if options['skip_stripe']:
+            self.stdout.write('Stripe cancellations skipped')
+        else:
+            self.stdout.write(f'Subscriptions canceled: {cancellations.get(Status.CANCELED, 0)}')
+            failed = cancellations.get(Status.FAILED, 0)
+            if failed:
+                self.stdout.write(self.style.ERROR(
+                    f'Subscriptions failed: {failed} (see listing_expirations.stripe_error; retried next run)'
+                ))
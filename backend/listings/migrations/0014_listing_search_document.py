@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:23
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Keep in sync with listings.search_utils.SEARCH_DOCUMENT_SQL
+BACKFILL_SEARCH_DOCUMENT = """
+    UPDATE listings SET search_document =
+        setweight(to_tsvector('simple', coalesce(listing_title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(address, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce("physicalAddress", '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(CAST(zip AS TEXT), '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(building_type, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(details, '')), 'C')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0013_listing_social_media_error_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="search_document",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, null=True
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_SEARCH_DOCUMENT, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="listing",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="listings_search_gin"
+            ),
+        ),
+    ]
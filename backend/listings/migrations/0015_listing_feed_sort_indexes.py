@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0014_listing_search_document"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["-featured", "-date_created", "-id"],
+                name="listings_feed_sort_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["-spotlightListing", "-date_created", "-id"],
+                name="listings_spotlight_sort_idx",
+            ),
+        ),
+    ]
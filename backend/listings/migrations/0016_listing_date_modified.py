@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0015_listing_feed_sort_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="date_modified",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        # Existing rows start out as last modified when they were created
+        migrations.RunSQL(
+            "UPDATE listings SET date_modified = date_created WHERE date_modified IS NULL",
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0016_listing_date_modified"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SocialPostJob",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("max_attempts", models.PositiveSmallIntegerField(default=5)),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "instagram_post_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "facebook_post_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("last_error", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "listing",
+                    models.ForeignKey(
+                        db_column="listing_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="social_post_jobs",
+                        to="listings.listing",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "social_post_jobs",
+                "managed": True,
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="social_jobs_status_run_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("status__in", ["pending", "running"])),
+                        fields=("listing",),
+                        name="social_jobs_one_active_per_listing",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0017_socialpostjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PhotoVariant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("width", models.PositiveIntegerField()),
+                ("format", models.CharField(max_length=10)),
+                ("name", models.CharField(max_length=255)),
+                ("size_bytes", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "photo",
+                    models.ForeignKey(
+                        db_column="photo_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="variants",
+                        to="listings.photo",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "photo_variants",
+                "managed": True,
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("photo", "width", "format"),
+                        name="photo_variants_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:38
+
+import math
+
+from django.db import migrations, models
+
+
+# Keep in sync with listings.geo_utils.geo_columns
+def geo_columns(lat_lng):
+    parts = str(lat_lng).split(",")
+    if len(parts) != 2:
+        return None, None, None
+    try:
+        lat, lng = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None, None, None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or (lat == 0 and lng == 0):
+        return None, None, None
+    cell = (math.floor(lat / 0.01) + 9000) * 100000 + math.floor(lng / 0.01) + 18000
+    return lat, lng, cell
+
+
+def backfill_geo_columns(apps, schema_editor):
+    """Parse latitude/longitude/geo_cell from the free-text latLng column"""
+    Listing = apps.get_model("listings", "Listing")
+    batch = []
+    for listing in Listing.objects.exclude(latLng__isnull=True).exclude(latLng="").only("id", "latLng").iterator():
+        listing.latitude, listing.longitude, listing.geo_cell = geo_columns(listing.latLng)
+        if listing.latitude is not None:
+            batch.append(listing)
+        if len(batch) >= 1000:
+            Listing.objects.bulk_update(batch, ["latitude", "longitude", "geo_cell"])
+            batch = []
+    if batch:
+        Listing.objects.bulk_update(batch, ["latitude", "longitude", "geo_cell"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0018_photovariant"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="geo_cell",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_geo_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(fields=["geo_cell"], name="listings_geo_cell_idx"),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:41
+
+import re
+
+from django.db import migrations, models
+
+
+# Exact copy of listings.amenity_utils.classify_amenity (checked by
+# listings.tests.AmenityClassificationTests)
+NO_WORDS = ("no", "not", "none", "non", "never", "without", "prohibited", "forbidden",
+            "unfurnished", "n/a")
+YES_WORDS = ("yes", "allowed", "ok", "okay", "full", "furnished", "cats", "dogs", "in unit",
+             "in building", "on site", "garage", "off street", "street", "driveway", "lot",
+             "coin", "shared", "available")
+OUTDOOR_WORDS = ("outside", "outdoor", "outdoors", "porch", "balcony")
+
+TOKEN_RE = re.compile(r"n/a|[a-z0-9]+")
+
+
+def has_phrase(padded, phrases):
+    return any(f" {phrase} " in padded for phrase in phrases)
+
+
+def classify_amenity(value, empty=None, indoor=False):
+    if value is None:
+        return empty
+    text = str(value).strip().lower()
+    if not text:
+        return empty
+    if text in ("1", "y", "true"):
+        return True
+    if text in ("0", "2", "n", "false"):
+        return False
+    tokens = TOKEN_RE.findall(text)
+    padded = f" {' '.join(tokens)} "
+    if has_phrase(padded, NO_WORDS):
+        return False
+    if indoor and has_phrase(padded, OUTDOOR_WORDS):
+        return False
+    if has_phrase(padded, YES_WORDS):
+        return True
+    return None
+
+
+def backfill_amenity_columns(apps, schema_editor):
+    """Classify the free-text amenity columns into the new boolean columns"""
+    Listing = apps.get_model("listings", "Listing")
+    fields = ["pets_allowed", "is_furnished", "has_laundry", "has_parking", "smoking_allowed"]
+    batch = []
+    for listing in Listing.objects.only("id", "pets", "furnished", "laundry", "parking", "smoking").iterator():
+        listing.pets_allowed = classify_amenity(listing.pets, empty=False)
+        listing.is_furnished = classify_amenity(listing.furnished, empty=False)
+        listing.has_laundry = classify_amenity(listing.laundry)
+        listing.has_parking = classify_amenity(listing.parking)
+        listing.smoking_allowed = classify_amenity(listing.smoking, indoor=True)
+        batch.append(listing)
+        if len(batch) >= 1000:
+            Listing.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Listing.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0019_listing_geo_columns"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="has_laundry",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="has_parking",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="is_furnished",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="pets_allowed",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="smoking_allowed",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_amenity_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["pets_allowed", "-featured", "-date_created", "-id"],
+                name="listings_pets_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["is_furnished", "-featured", "-date_created", "-id"],
+                name="listings_furnished_feed_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0020_listing_amenity_columns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListingCard",
+            fields=[
+                (
+                    "listing",
+                    models.OneToOneField(
+                        db_column="listing_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="feed_card",
+                        serialize=False,
+                        to="listings.listing",
+                    ),
+                ),
+                ("card", models.TextField()),
+                ("listing_modified", models.DateTimeField(blank=True, null=True)),
+                ("built_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "listing_cards",
+                "managed": True,
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0021_listingcard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListingExpiration",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("listing_id", models.IntegerField(db_index=True)),
+                ("date_expires", models.DateField()),
+                ("expired_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "stripe_subscription_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "stripe_status",
+                    models.CharField(
+                        choices=[
+                            ("none", "No subscription"),
+                            ("pending", "Pending"),
+                            ("canceled", "Canceled"),
+                            ("shared", "Kept (covers other visible listings)"),
+                            ("failed", "Failed"),
+                        ],
+                        default="none",
+                        max_length=20,
+                    ),
+                ),
+                ("stripe_error", models.TextField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "listing_expirations",
+                "managed": True,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["visible", "date_expires"], name="listings_visible_expires_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listingexpiration",
+            index=models.Index(
+                fields=["stripe_status"], name="listing_expirations_stripe_idx"
+            ),
+        ),
+    ]
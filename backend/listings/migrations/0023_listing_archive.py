@@ -0,0 +1,56 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0022_listing_expirations"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedListing",
+            fields=[
+                ("id", models.IntegerField(primary_key=True, serialize=False)),
+                ("user_id", models.IntegerField(db_index=True)),
+                ("date_expires", models.DateField()),
+                (
+                    "archived_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("data", models.JSONField()),
+            ],
+            options={
+                "db_table": "listings_archive",
+                "managed": True,
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedListingUtility",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("listing_id", models.IntegerField(db_index=True)),
+                ("utility_id", models.IntegerField()),
+            ],
+            options={
+                "db_table": "listings_listing_utilities_archive",
+                "managed": True,
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedPhoto",
+            fields=[
+                ("photo_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("listing_id", models.IntegerField(db_index=True)),
+                ("data", models.JSONField()),
+                ("variants", models.JSONField(default=list)),
+            ],
+            options={
+                "db_table": "photos_archive",
+                "managed": True,
+            },
+        ),
+    ]
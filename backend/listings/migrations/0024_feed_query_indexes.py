@@ -0,0 +1,63 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("listings", "0023_listing_archive"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="listing",
+            name="listings_spotlight_sort_idx",
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                condition=models.Q(("visible", True)),
+                fields=["-featured", "-date_created", "-id"],
+                name="listings_visible_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                condition=models.Q(("visible", True)),
+                fields=["typeCode", "-featured", "-date_created", "-id"],
+                name="listings_type_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                condition=models.Q(("visible", True)),
+                fields=["-spotlightListing", "-date_created", "-id"],
+                name="listings_spotlight_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["user", "-featured", "-date_created", "-id"],
+                name="listings_user_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                condition=models.Q(("approval_status", "pending"), ("visible", False)),
+                fields=["-date_created"],
+                name="listings_pending_review_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(
+                fields=["listing", "-is_main", "photo_id"],
+                name="photos_listing_order_idx",
+            ),
+        ),
+    ]
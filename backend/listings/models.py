@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 from users.models import User
 
 
@@ -110,6 +113,8 @@ class Listing(models.Model):
     date_avail = models.DateField(null=True, blank=True)
     date_created = models.DateField(auto_now_add=True)
     date_expires = models.DateField()
+    # Bumped by every write path; drives ETag/Last-Modified on the feeds
+    date_modified = models.DateTimeField(auto_now=True, null=True, blank=True)
     
     # Contact information
     contact_name = models.CharField(max_length=255)
@@ -200,6 +205,10 @@ class Listing(models.Model):
     
     # Geographic and physical address
     latLng = models.CharField(max_length=20, null=True, blank=True)
+    # Parsed from latLng and maintained by listings.geo_utils
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geo_cell = models.BigIntegerField(null=True, blank=True)
     physicalAddress = models.CharField(max_length=255, null=True, blank=True)
     textOk = models.BooleanField(null=True, blank=True)
     
@@ -209,9 +218,57 @@ class Listing(models.Model):
     # Cover photo
     cover_photo_id = models.CharField(max_length=255, null=True, blank=True)
 
+    # Normalized amenity flags classified from the free-text columns above and
+    # maintained by listings.amenity_utils; NULL when the text is unclear
+    pets_allowed = models.BooleanField(null=True, blank=True)
+    is_furnished = models.BooleanField(null=True, blank=True)
+    has_laundry = models.BooleanField(null=True, blank=True)
+    has_parking = models.BooleanField(null=True, blank=True)
+    smoking_allowed = models.BooleanField(null=True, blank=True)
+
+    # Full-text search document, maintained by listings.search_utils
+    search_document = SearchVectorField(null=True, blank=True)
+
     class Meta:
         db_table = 'listings'
         managed = True
+        indexes = [
+            GinIndex(fields=['search_document'], name='listings_search_gin'),
+            # Keyset pagination order for the listing feeds (all listings: admin view)
+            models.Index(fields=['-featured', '-date_created', '-id'], name='listings_feed_sort_idx'),
+            # Public feeds only ever read visible rows: the combined feed, the
+            # per-type feeds and the spotlight feed, each in its keyset order
+            models.Index(
+                fields=['-featured', '-date_created', '-id'],
+                name='listings_visible_feed_idx',
+                condition=models.Q(visible=True),
+            ),
+            models.Index(
+                fields=['typeCode', '-featured', '-date_created', '-id'],
+                name='listings_type_feed_idx',
+                condition=models.Q(visible=True),
+            ),
+            models.Index(
+                fields=['-spotlightListing', '-date_created', '-id'],
+                name='listings_spotlight_feed_idx',
+                condition=models.Q(visible=True),
+            ),
+            # Landlord dashboard: one owner's listings in feed order
+            models.Index(fields=['user', '-featured', '-date_created', '-id'], name='listings_user_feed_idx'),
+            # Admin review queue
+            models.Index(
+                fields=['-date_created'],
+                name='listings_pending_review_idx',
+                condition=models.Q(visible=False, approval_status='pending'),
+            ),
+            # Grid cell lookups for the bbox / near filters
+            models.Index(fields=['geo_cell'], name='listings_geo_cell_idx'),
+            # Pets / furnished filters, in feed order
+            models.Index(fields=['pets_allowed', '-featured', '-date_created', '-id'], name='listings_pets_feed_idx'),
+            models.Index(fields=['is_furnished', '-featured', '-date_created', '-id'], name='listings_furnished_feed_idx'),
+            # Expiry sweep and the feeds' date_expires filter
+            models.Index(fields=['visible', 'date_expires'], name='listings_visible_expires_idx'),
+        ]
 
     def __str__(self):
         return f"{self.address or 'No Address'} - ${self.rent or 0}/mo"
@@ -236,11 +293,66 @@ class Photo(models.Model):
     class Meta:
         db_table = 'photos'
         managed = True
+        indexes = [
+            # A listing's photos in display order (main photo first), as read by
+            # the feed aggregates and the cover photo lookup
+            models.Index(fields=['listing', '-is_main', 'photo_id'], name='photos_listing_order_idx'),
+        ]
 
     def __str__(self):
         return f"Photo {self.photo_id} for Listing {self.listing_id}"
 
 
+class PhotoVariant(models.Model):
+    """Resized/re-encoded copy of a listing photo (see listings.image_utils)"""
+    
+    photo = models.ForeignKey(
+        Photo,
+        on_delete=models.CASCADE,
+        related_name='variants',
+        db_column='photo_id'
+    )
+    width = models.PositiveIntegerField()
+    format = models.CharField(max_length=10)  # webp, avif
+    name = models.CharField(max_length=255)  # storage key
+    size_bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'photo_variants'
+        managed = True
+        constraints = [
+            models.UniqueConstraint(fields=['photo', 'width', 'format'], name='photo_variants_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.format} {self.width}w of Photo {self.photo_id}"
+
+
+class ListingCard(models.Model):
+    """Pre-serialized feed card of a listing (see listings.card_utils)"""
+    
+    listing = models.OneToOneField(
+        Listing,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_card',
+        db_column='listing_id'
+    )
+    card = models.TextField()  # JSON object, as served in the feeds
+    # listings.date_modified the card was built from; a card whose listing
+    # has moved on is stale and is rebuilt on the next read
+    listing_modified = models.DateTimeField(null=True, blank=True)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'listing_cards'
+        managed = True
+
+    def __str__(self):
+        return f"Card for Listing {self.listing_id}"
+
+
 class PendingListing(models.Model):
     """Pending listing model for listings awaiting approval"""
     
@@ -257,3 +369,137 @@ class PendingListing(models.Model):
 
     def __str__(self):
         return f"Pending Listing {self.id} - User {self.userId}"
+
+
+class SocialPostJob(models.Model):
+    """Queued Instagram/Facebook post for an approved listing (see listings.social_jobs)"""
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+    
+    id = models.BigAutoField(primary_key=True)
+    listing = models.ForeignKey(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name='social_post_jobs',
+        db_column='listing_id'
+    )
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    
+    # Per-platform results, written as soon as each platform succeeds so a
+    # retried job never posts to the same platform twice
+    instagram_post_id = models.CharField(max_length=255, null=True, blank=True)
+    facebook_post_id = models.CharField(max_length=255, null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'social_post_jobs'
+        managed = True
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='social_jobs_status_run_idx'),
+        ]
+        constraints = [
+            # At most one queued or running job per listing
+            models.UniqueConstraint(
+                fields=['listing'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='social_jobs_one_active_per_listing',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Social post job {self.id} for Listing {self.listing_id} ({self.status})"
+
+
+class ListingExpiration(models.Model):
+    """A listing hidden by the expiry sweep (see sweep_expired_listings)"""
+    
+    class StripeStatus(models.TextChoices):
+        NONE = 'none', 'No subscription'
+        PENDING = 'pending', 'Pending'
+        CANCELED = 'canceled', 'Canceled'
+        SHARED = 'shared', 'Kept (covers other visible listings)'
+        FAILED = 'failed', 'Failed'
+    
+    id = models.BigAutoField(primary_key=True)
+    # Plain column rather than a foreign key so the log outlives the listing
+    listing_id = models.IntegerField(db_index=True)
+    date_expires = models.DateField()
+    expired_at = models.DateTimeField(default=timezone.now)
+    stripe_subscription_id = models.CharField(max_length=255, null=True, blank=True)
+    stripe_status = models.CharField(max_length=20, choices=StripeStatus.choices, default=StripeStatus.NONE)
+    stripe_error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'listing_expirations'
+        managed = True
+        indexes = [
+            models.Index(fields=['stripe_status'], name='listing_expirations_stripe_idx'),
+        ]
+
+    def __str__(self):
+        return f"Listing {self.listing_id} expired {self.expired_at:%Y-%m-%d}"
+
+
+# ==================== ARCHIVE ====================
+# Listings long past their expiry are moved out of the hot tables by
+# archive_listings (see listings.archive_utils). Rows are kept as JSON
+# (to_jsonb of the original row) so the archive survives later column
+# changes and restore_archived_listings can put them back as they were.
+
+class ArchivedListing(models.Model):
+    """An archived row of the listings table"""
+    
+    id = models.IntegerField(primary_key=True)  # the listing's original id
+    user_id = models.IntegerField(db_index=True)
+    date_expires = models.DateField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    data = models.JSONField()
+
+    class Meta:
+        db_table = 'listings_archive'
+        managed = True
+
+    def __str__(self):
+        return f"Archived Listing {self.id}"
+
+
+class ArchivedPhoto(models.Model):
+    """An archived photos row, with its photo_variants rows"""
+    
+    photo_id = models.IntegerField(primary_key=True)
+    listing_id = models.IntegerField(db_index=True)
+    data = models.JSONField()
+    variants = models.JSONField(default=list)
+
+    class Meta:
+        db_table = 'photos_archive'
+        managed = True
+
+    def __str__(self):
+        return f"Archived Photo {self.photo_id} for Listing {self.listing_id}"
+
+
+class ArchivedListingUtility(models.Model):
+    """An archived listings_listing_utilities row"""
+    
+    id = models.BigAutoField(primary_key=True)
+    listing_id = models.IntegerField(db_index=True)
+    utility_id = models.IntegerField()
+
+    class Meta:
+        db_table = 'listings_listing_utilities_archive'
+        managed = True
+
+    def __str__(self):
+        return f"Archived Utility {self.utility_id} for Listing {self.listing_id}"
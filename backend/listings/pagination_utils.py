@@ -0,0 +1,72 @@
+import base64
+import json
+
+# Page size used when the client does not ask for one, and the most a
+# client may ask for in a single request.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+
+# Query string parameters consumed by pagination (not listing filters)
+PAGINATION_PARAMS = ('cursor', 'limit')
+
+
+class InvalidPageRequest(ValueError):
+    """Raised when a client sends a malformed limit or cursor"""
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque token"""
+    raw = json.dumps(list(values), default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Decode a token produced by encode_cursor, checking it has `size` keys"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidPageRequest('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidPageRequest('Invalid cursor')
+    return values
+
+
+def get_page_params(request, default=DEFAULT_PAGE_SIZE):
+    """
+    Read ?limit= and ?cursor= from a request.
+    Returns (limit, cursor_token); the token is decoded by the query that
+    knows its sort key.
+    """
+    limit_param = request.GET.get('limit')
+    limit = default
+    if limit_param:
+        if not limit_param.isdigit() or int(limit_param) < 1:
+            raise InvalidPageRequest('limit must be a positive integer')
+        limit = min(int(limit_param), MAX_PAGE_SIZE)
+    return limit, request.GET.get('cursor') or None
+
+
+def keyset_clause(sort_keys, cursor_values):
+    """
+    Build the WHERE fragment that continues a descending keyset scan.
+
+    sort_keys is a list of (sql_expression, sql_type) pairs in ORDER BY
+    order, all sorted DESC. A row comparison lets Postgres walk the
+    matching composite index from the cursor position, so deep pages cost
+    the same as the first one.
+    """
+    exprs = ', '.join(expr for expr, _ in sort_keys)
+    placeholders = ', '.join(f'CAST(%s AS {sql_type})' for _, sql_type in sort_keys)
+    return f" AND ({exprs}) < ({placeholders})", list(cursor_values)
+
+
+def paginate_rows(rows, limit, sort_values):
+    """
+    Trim a result fetched with LIMIT limit + 1 down to one page.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort_values(rows[-1]))
@@ -0,0 +1,61 @@
+import re
+from django.db import connection
+
+# Text search configuration used for both the document and the query.
+# 'simple' does no stemming or stop-word removal, so street names, numbers
+# and zip codes are indexed exactly as typed.
+SEARCH_CONFIG = 'simple'
+
+# The weighted document stored in listings.search_document.
+# Keep in sync with migration 0014_listing_search_document.
+SEARCH_DOCUMENT_SQL = """
+    setweight(to_tsvector('simple', coalesce(listing_title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(address, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce("physicalAddress", '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(CAST(zip AS TEXT), '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(location, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(building_type, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(details, '')), 'C')
+"""
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_tsquery(search_query):
+    """
+    Turn free text from the search box into a prefix tsquery.
+
+    Every word must match and the last characters typed may be a partial
+    word, so "321 eucl" becomes "321:* & eucl:*". Returns None if the input
+    has no searchable words.
+    """
+    if not search_query:
+        return None
+    tokens = _TOKEN_RE.findall(search_query.lower())
+    if not tokens:
+        return None
+    return ' & '.join(f"{token}:*" for token in tokens)
+
+
+def search_clause(search_query):
+    """
+    Build the WHERE fragment and rank expression for a search query.
+
+    Returns (where_sql, where_params, rank_sql, rank_params), or None if the
+    query has nothing to search for.
+    """
+    tsquery = build_tsquery(search_query)
+    if not tsquery:
+        return None
+    where_sql = f" AND l.search_document @@ to_tsquery('{SEARCH_CONFIG}', %s)"
+    rank_sql = f"ts_rank(l.search_document, to_tsquery('{SEARCH_CONFIG}', %s))"
+    return where_sql, [tsquery], rank_sql, [tsquery]
+
+
+def update_search_document(listing_id):
+    """Recompute the search document for a listing after it was written"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE listings SET search_document = {SEARCH_DOCUMENT_SQL} WHERE id = %s",
+            [listing_id]
+        )
@@ -0,0 +1,173 @@
+"""
+Background queue for posting approved listings to Instagram and Facebook.
+
+admin_approve_listing only enqueues a SocialPostJob; the process_social_jobs
+worker claims due jobs with FOR UPDATE SKIP LOCKED (so several workers can
+run side by side), posts them and retries failures with exponential backoff.
+Each platform's post id is saved on the job as soon as that platform
+succeeds, so a retry only posts to the platforms that are still missing.
+
+Set META_GRAPH_URL to point MetaSocialManager at a local stub Graph API.
+"""
+
+import logging
+from datetime import timedelta
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .cache_utils import invalidate_listing_feeds
+from .models import SocialPostJob
+from .social_utils import MetaSocialManager
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ('instagram', 'facebook')
+PLATFORM_LABELS = {'instagram': 'Instagram', 'facebook': 'Facebook'}
+PLATFORM_PREFIXES = {'instagram': 'ig', 'facebook': 'fb'}
+
+# Retry after 1, 2, 4, 8... minutes, never waiting more than an hour
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 3600
+
+# A job left running this long belonged to a worker that died; claim it again
+STALE_LOCK_SECONDS = 600
+
+ACTIVE_STATUSES = [SocialPostJob.Status.PENDING, SocialPostJob.Status.RUNNING]
+
+
+def enqueue_social_post(listing_id):
+    """
+    Queue a social post for a listing and return its job.
+    Returns the existing job if one is already queued, running or done.
+    """
+    existing = (
+        SocialPostJob.objects
+        .filter(listing_id=listing_id, status__in=ACTIVE_STATUSES + [SocialPostJob.Status.SUCCEEDED])
+        .order_by('-id')
+        .first()
+    )
+    if existing:
+        return existing
+
+    # Carry over platforms a previous (failed) job already posted to
+    previous = SocialPostJob.objects.filter(listing_id=listing_id).order_by('-id').first()
+    try:
+        with transaction.atomic():
+            return SocialPostJob.objects.create(
+                listing_id=listing_id,
+                instagram_post_id=previous.instagram_post_id if previous else None,
+                facebook_post_id=previous.facebook_post_id if previous else None,
+            )
+    except IntegrityError:
+        # Another request queued it first (one active job per listing)
+        return SocialPostJob.objects.filter(listing_id=listing_id, status__in=ACTIVE_STATUSES).first()
+
+
+def claim_due_jobs(limit):
+    """
+    Mark up to `limit` due jobs as running for this worker and return them.
+    Rows locked by another worker are skipped rather than waited on.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE social_post_jobs
+            SET status = 'running', locked_at = NOW(), attempts = attempts + 1, updated_at = NOW()
+            WHERE id IN (
+                SELECT id FROM social_post_jobs
+                WHERE (status = 'pending' AND run_after <= NOW())
+                   OR (status = 'running' AND locked_at < NOW() - make_interval(secs => %s))
+                ORDER BY run_after
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id
+        """, [STALE_LOCK_SECONDS, limit])
+        job_ids = [row[0] for row in cursor.fetchall()]
+    return list(SocialPostJob.objects.filter(id__in=job_ids).order_by('run_after', 'id'))
+
+
+def backoff_delay(attempts):
+    """Seconds to wait before the next attempt after `attempts` failures"""
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+def _load_listing(listing_id):
+    """Formatted listing payload for the post, or None if it no longer exists"""
+    from .views import _get_listing_by_id
+
+    return _get_listing_by_id(listing_id)
+
+
+def run_job(job):
+    """
+    Post a claimed job to every platform it has not reached yet and record
+    the outcome on the job and the listing. Returns the job's new status.
+    """
+    errors = {}
+    try:
+        listing = _load_listing(job.listing_id)
+        if listing is None:
+            errors['job'] = 'Listing not found'
+        else:
+            missing = [platform for platform in PLATFORMS if not getattr(job, f'{platform}_post_id')]
+            results = MetaSocialManager().post_listing(listing, platforms=missing)
+            posted = []
+            for platform in missing:
+                result = results.get(platform, results)
+                if 'id' in result:
+                    setattr(job, f'{platform}_post_id', result['id'])
+                    posted.append(f'{platform}_post_id')
+                else:
+                    errors[platform] = result.get('error', 'Unknown error')
+            if posted:
+                # Saved before anything else so a later failure never re-posts here
+                job.save(update_fields=posted + ['updated_at'])
+    except Exception as e:
+        logger.exception(f"Social post job {job.id} failed")
+        errors['job'] = str(e)
+
+    if not errors:
+        job.status = SocialPostJob.Status.SUCCEEDED
+        job.last_error = None
+    elif job.attempts >= job.max_attempts:
+        job.status = SocialPostJob.Status.FAILED
+        job.last_error = format_errors(errors)
+    else:
+        job.status = SocialPostJob.Status.PENDING
+        job.last_error = format_errors(errors)
+        job.run_after = timezone.now() + timedelta(seconds=backoff_delay(job.attempts))
+    job.locked_at = None
+    job.save(update_fields=['status', 'last_error', 'run_after', 'locked_at', 'updated_at'])
+
+    _save_listing_result(job)
+    return job.status
+
+
+def format_errors(errors):
+    """Errors keyed by platform as stored in social_media_error, or None"""
+    return " | ".join(
+        f"{PLATFORM_LABELS.get(key, 'Job')}: {message}" for key, message in errors.items()
+    ) or None
+
+
+def format_post_ids(post_ids):
+    """Post ids keyed by platform as stored in social_media_post_id ("ig:1, fb:2"), or None"""
+    return ", ".join(
+        f"{PLATFORM_PREFIXES[platform]}:{post_ids[platform]}"
+        for platform in PLATFORMS if post_ids.get(platform)
+    ) or None
+
+
+def _save_listing_result(job):
+    """Mirror the job outcome onto the listing's social_media_* columns"""
+    post_id = format_post_ids({platform: getattr(job, f'{platform}_post_id') for platform in PLATFORMS})
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE listings
+            SET social_media_posted = %s,
+                social_media_post_id = %s,
+                social_media_error = %s,
+                date_modified = NOW()
+            WHERE id = %s
+        """, [post_id is not None, post_id, job.last_error, job.listing_id])
+    invalidate_listing_feeds()
@@ -1,9 +1,45 @@
 import os
+import time
+import threading
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts for every Graph API call
+GRAPH_TIMEOUT = (
+    float(os.getenv('META_CONNECT_TIMEOUT', '5')),
+    float(os.getenv('META_READ_TIMEOUT', '30')),
+)
+
+# Instagram processes an uploaded image before it can be published; poll
+# the container's status_code this often, for at most this long
+CONTAINER_POLL_INTERVAL = float(os.getenv('META_CONTAINER_POLL_INTERVAL', '1'))
+CONTAINER_POLL_TIMEOUT = float(os.getenv('META_CONTAINER_POLL_TIMEOUT', '60'))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_graph_session():
+    """
+    Keep-alive session shared by every MetaSocialManager in the process, so
+    repeated posts reuse TLS connections to the Graph API.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
 class MetaSocialManager:
     """
     Handles posting listings to Instagram and Facebook via Meta Graph API.
@@ -13,11 +49,12 @@ class MetaSocialManager:
         self.access_token = os.getenv('META_ACCESS_TOKEN')
         self.instagram_account_id = os.getenv('META_INSTAGRAM_ACCOUNT_ID')
         self.facebook_page_id = os.getenv('META_FACEBOOK_PAGE_ID')
-        self.graph_url = "https://graph.facebook.com/v19.0"
+        # Overridable so a local stub Graph API can stand in for Meta in tests
+        self.graph_url = os.getenv('META_GRAPH_URL', "https://graph.facebook.com/v19.0").rstrip('/')
 
-    def post_listing(self, listing_data):
+    def post_listing(self, listing_data, platforms=('instagram', 'facebook')):
         """
-        Posts a listing to both Instagram and Facebook.
+        Posts a listing to Instagram and Facebook (or only the given platforms).
         returns: {'instagram': {'id': str, 'error': str}, 'facebook': {'id': str, 'error': str}}
         """
         results = {}
@@ -32,20 +69,46 @@ class MetaSocialManager:
         # If it's a relative path, we might need to prepend base URL 
         # (Assuming the system provides full URLs in the listing object now)
 
-        # 1. Post to Instagram
-        if self.instagram_account_id and self.access_token:
-            results['instagram'] = self._post_to_instagram(image_url, caption)
-        else:
-            results['instagram'] = {'error': 'Instagram API not configured'}
-
-        # 2. Post to Facebook
-        if self.facebook_page_id and self.access_token:
-            results['facebook'] = self._post_to_facebook(image_url, caption)
-        else:
-            results['facebook'] = {'error': 'Facebook API not configured'}
+        posters = {}
+        if 'instagram' in platforms:
+            if self.instagram_account_id and self.access_token:
+                posters['instagram'] = self._post_to_instagram
+            else:
+                results['instagram'] = {'error': 'Instagram API not configured'}
+
+        if 'facebook' in platforms:
+            if self.facebook_page_id and self.access_token:
+                posters['facebook'] = self._post_to_facebook
+            else:
+                results['facebook'] = {'error': 'Facebook API not configured'}
+
+        # Publish to every platform at once; each result carries its latency
+        if posters:
+            with ThreadPoolExecutor(max_workers=len(posters)) as executor:
+                futures = {
+                    platform: executor.submit(self._timed, poster, image_url, caption)
+                    for platform, poster in posters.items()
+                }
+                for platform, future in futures.items():
+                    results[platform] = future.result()
             
         return results
 
+    def _timed(self, poster, image_url, caption):
+        """Run a platform poster and add its wall time as latency_ms"""
+        start = time.perf_counter()
+        result = poster(image_url, caption)
+        result['latency_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    def _graph_post(self, path, payload):
+        response = get_graph_session().post(f"{self.graph_url}/{path}", data=payload, timeout=GRAPH_TIMEOUT)
+        return response.json()
+
+    def _graph_get(self, path, params):
+        response = get_graph_session().get(f"{self.graph_url}/{path}", params=params, timeout=GRAPH_TIMEOUT)
+        return response.json()
+
     def _build_caption(self, listing_data):
         """Builds a formatted caption for the post"""
         title = listing_data.get('title', 'New Listing')
@@ -65,54 +128,79 @@ class MetaSocialManager:
     def _post_to_instagram(self, image_url, caption):
         """
         Instagram requires 2 steps: 
-        1. Create a media container
+        1. Create a media container (and wait until Meta has processed it)
         2. Publish the container
         """
+        steps = {}
         try:
             # Step 1: Create Container
-            container_url = f"{self.graph_url}/{self.instagram_account_id}/media"
-            container_payload = {
+            step_start = time.perf_counter()
+            container_data = self._graph_post(f"{self.instagram_account_id}/media", {
                 'image_url': image_url,
                 'caption': caption,
                 'access_token': self.access_token
-            }
-            container_res = requests.post(container_url, data=container_payload)
-            container_data = container_res.json()
+            })
+            steps['container_ms'] = round((time.perf_counter() - step_start) * 1000, 1)
             
             if 'id' not in container_data:
-                return {'error': f"Container creation failed: {container_data.get('error', {}).get('message', 'Unknown error')}"}
+                return {'error': f"Container creation failed: {container_data.get('error', {}).get('message', 'Unknown error')}", 'steps': steps}
             
             creation_id = container_data['id']
+
+            # Publishing before the container is FINISHED fails, so poll first
+            step_start = time.perf_counter()
+            status_error = self._wait_for_container(creation_id)
+            steps['processing_ms'] = round((time.perf_counter() - step_start) * 1000, 1)
+            if status_error:
+                return {'error': status_error, 'steps': steps}
             
             # Step 2: Publish
-            publish_url = f"{self.graph_url}/{self.instagram_account_id}/media_publish"
-            publish_payload = {
+            step_start = time.perf_counter()
+            publish_data = self._graph_post(f"{self.instagram_account_id}/media_publish", {
                 'creation_id': creation_id,
                 'access_token': self.access_token
-            }
-            publish_res = requests.post(publish_url, data=publish_payload)
-            publish_data = publish_res.json()
+            })
+            steps['publish_ms'] = round((time.perf_counter() - step_start) * 1000, 1)
             
             if 'id' not in publish_data:
-                return {'error': f"Publish failed: {publish_data.get('error', {}).get('message', 'Unknown error')}"}
+                return {'error': f"Publish failed: {publish_data.get('error', {}).get('message', 'Unknown error')}", 'steps': steps}
                 
-            return {'id': publish_data['id']}
+            return {'id': publish_data['id'], 'steps': steps}
             
         except Exception as e:
             logger.error(f"Instagram posting error: {e}")
-            return {'error': str(e)}
+            return {'error': str(e), 'steps': steps}
+
+    def _wait_for_container(self, creation_id):
+        """
+        Poll an Instagram media container until it is ready to publish.
+        Returns None when FINISHED, otherwise an error message.
+        """
+        deadline = time.monotonic() + CONTAINER_POLL_TIMEOUT
+        while True:
+            data = self._graph_get(creation_id, {
+                'fields': 'status_code',
+                'access_token': self.access_token
+            })
+            status_code = data.get('status_code')
+            if status_code == 'FINISHED':
+                return None
+            if status_code in ('ERROR', 'EXPIRED'):
+                return f"Container processing failed: {status_code}"
+            if 'error' in data:
+                return f"Container status check failed: {data['error'].get('message', 'Unknown error')}"
+            if time.monotonic() >= deadline:
+                return f"Container not ready after {CONTAINER_POLL_TIMEOUT:.0f}s (status: {status_code})"
+            time.sleep(CONTAINER_POLL_INTERVAL)
 
     def _post_to_facebook(self, image_url, caption):
         """Post photo to Facebook Page"""
         try:
-            fb_url = f"{self.graph_url}/{self.facebook_page_id}/photos"
-            payload = {
+            data = self._graph_post(f"{self.facebook_page_id}/photos", {
                 'url': image_url,
                 'caption': caption,
                 'access_token': self.access_token
-            }
-            response = requests.post(fb_url, data=payload)
-            data = response.json()
+            })
             
             if 'id' not in data:
                 return {'error': f"FB posting failed: {data.get('error', {}).get('message', 'Unknown error')}"}
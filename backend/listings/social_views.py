@@ -2,8 +2,9 @@ import json
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.db import connection
+from .cache_utils import invalidate_listing_feeds
 from .social_utils import MetaSocialManager
-from .views import _get_raw_listings, _format_listings_data
+from .views import _get_listing_by_id
 
 @csrf_exempt
 def post_listing_to_socials(request, listing_id):
@@ -16,17 +17,13 @@ def post_listing_to_socials(request, listing_id):
 
     try:
         # 1. Get listing data
-        listings = _get_raw_listings(visible='all')
-        filtered = [l for l in listings if l['id'] == listing_id]
+        listing_formatted = _get_listing_by_id(listing_id, request)
         
-        if not filtered:
+        if not listing_formatted:
             return JsonResponse({'error': 'Listing not found'}, status=404)
         
-        listing_raw = filtered[0]
-        listing_formatted = _format_listings_data([listing_raw], request)[0]
-        
         # 2. Check if posting is requested/already done
-        if not listing_raw.get('social_media_posting'):
+        if not listing_formatted.get('social_media_posting'):
             return JsonResponse({'error': 'Social media posting not requested for this listing'}, status=400)
             
         # 3. Post to social media
@@ -62,9 +59,11 @@ def post_listing_to_socials(request, listing_id):
                 UPDATE listings 
                 SET social_media_posted = %s, 
                     social_media_post_id = %s, 
-                    social_media_error = %s 
+                    social_media_error = %s,
+                    date_modified = NOW()
                 WHERE id = %s
-            """, [1 if social_media_posted else 0, social_media_post_id, social_media_error, listing_id])
+            """, [social_media_posted, social_media_post_id, social_media_error, listing_id])
+        invalidate_listing_feeds()
 
         return JsonResponse({
             'message': 'Social media posting process completed',
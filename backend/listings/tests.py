@@ -1,3 +1,487 @@
-from django.test import TestCase
+import io
+import os
+from datetime import date, timedelta
+from importlib import import_module
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import requests
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from users.models import User
+from .amenity_utils import amenity_clause, amenity_values, classify_amenity
+from .cache_utils import invalidate_listing_feeds
+from .card_utils import MEDIA_MARKER, card_data
+from .image_utils import images_available, render_variants
+from .models import Listing, ListingCard, Photo, PhotoVariant, SocialPostJob, Utility
+from .pagination_utils import DEFAULT_PAGE_SIZE
+from .social_jobs import backoff_delay, claim_due_jobs, enqueue_social_post, run_job
+from .views import _get_listing_by_id, _get_listings_by_ids, _get_raw_listings
+
+
+def make_user(email='landlord@example.com', level=1):
+    return User.objects.create(
+        user_email=email, user_pass='', user_salt='', user_level=level,
+        first_name='Test', last_name='User', contact_number='',
+    )
+
+
+def make_listing(user, photos=1, **fields):
+    """A visible, approved listing with `photos` photos (the first one main)"""
+    values = {
+        'listing_title': 'Test listing', 'address': '100 Euclid Ave', 'beds': 2, 'rent': 900,
+        'date_expires': date.today() + timedelta(days=90), 'contact_name': 'Test',
+        'visible': True, 'approval_status': 'approved', 'typeCode': 1,
+    }
+    values.update(fields)
+    listing = Listing.objects.create(user=user, **values)
+    for index in range(photos):
+        Photo.objects.create(listing=listing, name=f'{listing.id}-{index}.jpg', path='', is_main=index == 0)
+    return listing
+
+
+class AmenityClassificationTests(SimpleTestCase):
+    """listings.amenity_utils.classify_amenity and its copy in migration 0020"""
+
+    CASES = [
+        # (value, indoor, expected)
+        ('Smoking prohibited', True, False),
+        ('outside smoking only', True, False),
+        ('Non-smoking', True, False),
+        ('No smoking', True, False),
+        ('Smoking OK', True, True),
+        ('Pilot', False, None),
+        ('Parking lot', False, True),
+        ('Off-street', False, True),
+        ('Street', False, True),
+        ('Cats OK', False, True),
+        ('Dogs allowed', False, True),
+        ('No pets', False, False),
+        ('Not allowed', False, False),
+        ('Furnished', False, True),
+        ('Unfurnished', False, False),
+        ('In-unit washer/dryer', False, True),
+        ('N/A', False, False),
+        ('1', False, True),
+        ('2', False, False),
+        ('Partial', False, None),
+    ]
+
+    def test_cases(self):
+        for value, indoor, expected in self.CASES:
+            with self.subTest(value=value):
+                self.assertIs(classify_amenity(value, indoor=indoor), expected)
+
+    def test_empty_values(self):
+        self.assertIsNone(classify_amenity(None))
+        self.assertIs(classify_amenity('  ', empty=False), False)
+
+    def test_migration_copy_matches(self):
+        migration = import_module('listings.migrations.0020_listing_amenity_columns')
+        for value, indoor, _ in self.CASES:
+            with self.subTest(value=value):
+                self.assertIs(
+                    migration.classify_amenity(value, indoor=indoor),
+                    classify_amenity(value, indoor=indoor),
+                )
+
+    def test_amenity_values_treat_smoking_as_indoor(self):
+        values = amenity_values({'smoking': 'outside smoking only', 'parking': 'Outside lot'})
+        self.assertIs(values['smoking_allowed'], False)
+        self.assertIs(values['has_parking'], True)
+        # Blank pets / furnished count as no, like the old LIKE filters
+        self.assertIs(values['pets_allowed'], False)
+        self.assertIs(values['is_furnished'], False)
+
+    def test_amenity_clause(self):
+        where_sql, params = amenity_clause({'pets': 'yes', 'smoking': 'no'})
+        self.assertEqual(where_sql, " AND l.pets_allowed = %s AND l.smoking_allowed = %s")
+        self.assertEqual(params, [True, False])
+
+
+@skipUnless(images_available(), 'Pillow is not installed')
+class PhotoVariantTests(TestCase):
+    """Variants are labelled with the width actually encoded, never upscaled"""
+
+    def image(self, width, height):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), 'orange').save(buffer, format='JPEG')
+        return buffer.getvalue()
+
+    def rendered_widths(self, width):
+        return [rendered[0] for rendered in render_variants(self.image(width, 100), formats=['webp'])]
+
+    def test_small_photo_keeps_its_width(self):
+        self.assertEqual(self.rendered_widths(200), [200])
+
+    def test_widths_past_the_original_are_skipped(self):
+        self.assertEqual(self.rendered_widths(500), [320])
+        self.assertEqual(self.rendered_widths(2000), [320, 640, 1280])
+
+    def test_srcset_uses_the_stored_widths(self):
+        listing = make_listing(make_user())
+        photo = listing.photos.get()
+        PhotoVariant.objects.create(photo=photo, width=200, format='webp', name='variants/small_200w.webp')
+        PhotoVariant.objects.create(photo=photo, width=200, format='avif', name='variants/small_200w.avif')
+
+        srcset = _get_listing_by_id(listing.id)['srcset']
+        self.assertEqual(len(srcset), 1)
+        self.assertTrue(srcset[0].endswith('variants/small_200w.webp 200w'))
+
+
+class FeedQueryCountTests(TestCase):
+    """Each feed is one SQL statement; revalidating a feed costs none"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        utility, _ = Utility.objects.get_or_create(name='Heat')
+        for index in range(30):
+            listing = make_listing(
+                cls.user, photos=2, typeCode=index % 4 + 1,
+                spotlightListing=date.today() - timedelta(days=index % 10),
+            )
+            listing.utilities_m2m.add(utility)
+        cls.listing = listing
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client(HTTP_HOST='localhost')
+
+    def assert_budget(self, url, queries):
+        # The first read builds the listing cards; measure the steady state
+        self.assertEqual(self.client.get(url).status_code, 200)
+        invalidate_listing_feeds()
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_feeds_are_one_statement(self):
+        for url in ['/listings/', '/listings/rentals/', '/listings/sublets/', '/listings/rooms/',
+                    '/listings/featured/', f'/listings/landlord/?user_id={self.user.user_id}']:
+            with self.subTest(url=url):
+                response = self.assert_budget(url, 1)
+                self.assertTrue(response.json()['listings'])
+
+    def test_feed_revalidation_runs_no_query(self):
+        for url in ['/listings/', '/listings/rentals/', '/listings/featured/']:
+            with self.subTest(url=url):
+                response = self.assert_budget(url, 1)
+                with self.assertNumQueries(0):
+                    not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(not_modified.status_code, 304)
+
+    def test_feed_validators_change_at_midnight(self):
+        response = self.assert_budget('/listings/', 1)
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch('listings.conditional_utils.timezone.localdate', return_value=tomorrow):
+            # Expired listings drop out without a write; neither validator may still match
+            for headers in ({'HTTP_IF_NONE_MATCH': response['ETag']},
+                            {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}):
+                with self.subTest(headers=headers):
+                    self.assertEqual(self.client.get('/listings/', **headers).status_code, 200)
+
+    def test_detail_is_validator_plus_row(self):
+        response = self.assert_budget(f'/listings/{self.listing.id}/', 2)
+        listing = response.json()['listing']
+        self.assertEqual(len(listing['images']), 2)
+        self.assertEqual(listing['utilities'], ['Heat'])
+
+
+META_ENV = {
+    'META_ACCESS_TOKEN': 'token', 'META_INSTAGRAM_ACCOUNT_ID': 'ig-account',
+    'META_FACEBOOK_PAGE_ID': 'fb-page', 'META_GRAPH_URL': 'https://graph.test',
+}
+
+
+def posted_paths(session):
+    """Graph API paths the mocked session was asked to POST to"""
+    return [call.args[0].replace('https://graph.test/', '') for call in session.post.call_args_list]
+
+
+def graph_session(failing=()):
+    """
+    A stand-in requests.Session for the Graph API. Instagram containers are
+    FINISHED on the first poll; platforms in `failing` answer with an error.
+    """
+    def respond(payload):
+        return mock.Mock(json=mock.Mock(return_value=payload))
+
+    def post(url, data=None, timeout=None):
+        platform = 'facebook' if url.endswith('/photos') else 'instagram'
+        if platform in failing:
+            return respond({'error': {'message': 'Rate limited'}})
+        if url.endswith('/media'):
+            return respond({'id': 'container-1'})
+        return respond({'id': 'fb-1' if platform == 'facebook' else 'ig-1'})
+
+    session = mock.create_autospec(requests.Session, instance=True)
+    session.post.side_effect = post
+    session.get.return_value = respond({'status_code': 'FINISHED'})
+    return session
+
+
+@mock.patch.dict(os.environ, META_ENV)
+@mock.patch('listings.social_utils.CONTAINER_POLL_INTERVAL', 0)
+class SocialPostJobTests(TestCase):
+    """listings.social_jobs against a mocked Graph API session"""
+
+    def setUp(self):
+        self.listing = make_listing(make_user())
+
+    def run_due_jobs(self, session):
+        # NOW() is frozen at the start of the test transaction
+        SocialPostJob.objects.filter(status=SocialPostJob.Status.PENDING, run_after__lte=timezone.now()).update(
+            run_after=timezone.now() - timedelta(days=1),
+        )
+        with mock.patch('listings.social_utils.get_graph_session', return_value=session):
+            return [run_job(job) for job in claim_due_jobs(5)]
+
+    def test_enqueue_reuses_the_active_job(self):
+        job = enqueue_social_post(self.listing.id)
+        self.assertEqual(enqueue_social_post(self.listing.id), job)
+        self.assertEqual(SocialPostJob.objects.filter(listing=self.listing).count(), 1)
+
+    def test_job_posts_to_both_platforms(self):
+        enqueue_social_post(self.listing.id)
+        session = graph_session()
+
+        self.assertEqual(self.run_due_jobs(session), [SocialPostJob.Status.SUCCEEDED])
+        self.assertCountEqual(
+            posted_paths(session),
+            ['ig-account/media', 'ig-account/media_publish', 'fb-page/photos'],
+        )
+        self.listing.refresh_from_db()
+        self.assertTrue(self.listing.social_media_posted)
+        self.assertEqual(self.listing.social_media_post_id, 'ig:ig-1, fb:fb-1')
+        self.assertIsNone(self.listing.social_media_error)
+
+    def test_retry_posts_only_to_the_missing_platform(self):
+        job = enqueue_social_post(self.listing.id)
+        before = timezone.now()
+
+        self.assertEqual(self.run_due_jobs(graph_session(failing=('facebook',))), [SocialPostJob.Status.PENDING])
+        job.refresh_from_db()
+        self.assertEqual(job.instagram_post_id, 'ig-1')
+        self.assertIsNone(job.facebook_post_id)
+        self.assertIn('Facebook: FB posting failed: Rate limited', job.last_error)
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=backoff_delay(1)))
+        # Not due again until the backoff has passed
+        self.assertEqual(self.run_due_jobs(graph_session()), [])
+
+        SocialPostJob.objects.filter(id=job.id).update(run_after=timezone.now())
+        session = graph_session()
+        self.assertEqual(self.run_due_jobs(session), [SocialPostJob.Status.SUCCEEDED])
+        self.assertEqual(posted_paths(session), ['fb-page/photos'])
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.social_media_post_id, 'ig:ig-1, fb:fb-1')
+
+    def test_job_fails_after_max_attempts(self):
+        job = enqueue_social_post(self.listing.id)
+        SocialPostJob.objects.filter(id=job.id).update(max_attempts=1)
+
+        self.assertEqual(
+            self.run_due_jobs(graph_session(failing=('instagram', 'facebook'))),
+            [SocialPostJob.Status.FAILED],
+        )
+        self.listing.refresh_from_db()
+        self.assertFalse(self.listing.social_media_posted)
+        self.assertIn('Instagram: Container creation failed: Rate limited', self.listing.social_media_error)
+        # A failed job no longer blocks queueing a fresh one
+        self.assertNotEqual(enqueue_social_post(self.listing.id).id, job.id)
+
+    def test_backoff_doubles_up_to_an_hour(self):
+        self.assertEqual([backoff_delay(attempts) for attempts in (1, 2, 3)], [60, 120, 240])
+        self.assertEqual(backoff_delay(20), 3600)
+
+
+class ListingCardTests(TestCase):
+    """Feeds served from stored cards get absolute photo URLs, and nothing else changes"""
+
+    TITLE = 'Quote "/media/ and /media/ in the title'
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client(HTTP_HOST='localhost')
+        self.listing = make_listing(make_user(), listing_title=self.TITLE, details='See "/media/ too')
+        PhotoVariant.objects.create(
+            photo=self.listing.photos.get(), width=320, format='webp', name='variants/cover_320w.webp',
+        )
+
+    def test_only_photo_urls_get_the_host(self):
+        for _ in range(2):
+            # Built on the first read, served from listing_cards on the second
+            card = self.client.get('/listings/').json()['listings'][0]
+            self.assertEqual(card['title'], self.TITLE)
+            self.assertEqual(card['details'], 'See "/media/ too')
+            self.assertEqual(card['images'], [f'http://localhost/media/{self.listing.id}-0.jpg'])
+            self.assertEqual(card['thumbnail'], 'http://localhost/media/variants/cover_320w.webp')
+            self.assertEqual(card['srcset'], ['http://localhost/media/variants/cover_320w.webp 320w'])
+            cache.clear()
+
+    def test_stored_card_marks_the_media_url(self):
+        self.client.get('/listings/')
+        stored = ListingCard.objects.get(listing_id=self.listing.id).card
+        # Serving only replaces the marker; the listing text keeps its "/media/
+        self.assertEqual(stored.count(MEDIA_MARKER), 3)
+        self.assertIn(f'"{MEDIA_MARKER}{self.listing.id}-0.jpg"', stored)
+        self.assertEqual(card_data(stored)['images'], [f'/media/{self.listing.id}-0.jpg'])
+        self.assertEqual(card_data(stored)['title'], self.TITLE)
+
+
+class SweptListingCacheTests(TestCase):
+    """Cached clusters and facets drop a listing once the expiry sweep hides it"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client(HTTP_HOST='localhost')
+        user = make_user()
+        self.staying = make_listing(user, latitude=43.04, longitude=-76.13)
+        self.expiring = make_listing(user, latitude=43.05, longitude=-76.14)
+
+    def pass_midnight_and_sweep(self):
+        # The listing expires without a write, then the sweep hides it
+        Listing.objects.filter(id=self.expiring.id).update(date_expires=date.today() - timedelta(days=1))
+        call_command('sweep_expired_listings', '--skip-stripe', stdout=io.StringIO())
+
+    def test_clusters(self):
+        def total():
+            return self.client.get('/listings/clusters/', {'zoom': 10}).json()['total_listings']
+
+        self.assertEqual(total(), 2)
+        self.pass_midnight_and_sweep()
+        self.assertEqual(total(), 1)
+
+    def test_facets(self):
+        def total():
+            return self.client.get('/listings/facets/').json()['total']
+
+        self.assertEqual(total(), 2)
+        self.pass_midnight_and_sweep()
+        self.assertEqual(total(), 1)
+
+
+class LocationFilterTests(TestCase):
+    """?location= matches the location, address or physicalAddress text"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = make_user()
+        cls.by_location = make_listing(user, location='Westcott')
+        cls.by_physical_address = make_listing(user, physicalAddress='400 Westcott St, Syracuse')
+        make_listing(user, location='Downtown', address='1 Salina St')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client(HTTP_HOST='localhost')
+
+    def test_feed_filters_by_location(self):
+        response = self.client.get('/listings/', {'location': 'Westcott'})
+        self.assertEqual(response.status_code, 200)
+        self.assertCountEqual(
+            [listing['id'] for listing in response.json()['listings']],
+            [self.by_location.id, self.by_physical_address.id],
+        )
+
+    def test_facets_filter_by_location(self):
+        response = self.client.get('/listings/facets/', {'location': 'Westcott'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total'], 2)
+
+
+class QueryPlanTests(TestCase):
+    """
+    The listing endpoints' queries use indexes, checked by check_query_plans
+    on the 100,000 listings the request sized the indexes for (smaller seeds
+    already pick different photo indexes, so they would not test the same
+    plans). Takes a couple of minutes.
+    """
+
+    def test_endpoints_do_not_scan_sequentially(self):
+        out = io.StringIO()
+        # Raises CommandError naming the endpoints whose plans scan listings or photos
+        call_command('check_query_plans', '--rows', '100000', stdout=out)
+        self.assertIn('Endpoints with sequential scans: 0', out.getvalue())
+
+
+class ListingsByIdTests(TestCase):
+    """Fetching by id finds listings far past the first feed page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = make_user()
+        # Created first, so it sorts last in a feed of more than DEFAULT_PAGE_SIZE listings
+        cls.oldest = make_listing(user, social_media_posting=True)
+        cls.hidden = make_listing(user, visible=False)
+        for _ in range(DEFAULT_PAGE_SIZE):
+            make_listing(user, photos=0)
+
+    def test_oldest_listing_is_past_the_first_page(self):
+        feed_ids = [row['id'] for row in _get_raw_listings(visible='all')]
+        self.assertEqual(len(feed_ids), DEFAULT_PAGE_SIZE)
+        self.assertNotIn(self.oldest.id, feed_ids)
+        self.assertEqual(_get_listing_by_id(self.oldest.id)['id'], self.oldest.id)
+
+    def test_ids_keep_their_order_and_skip_missing(self):
+        listings = _get_listings_by_ids([self.hidden.id, -1, self.oldest.id])
+        self.assertEqual([listing['id'] for listing in listings], [self.hidden.id, self.oldest.id])
+        self.assertIsNone(_get_listing_by_id(-1))
+        self.assertEqual(_get_listings_by_ids([]), [])
+
+    @mock.patch.dict(os.environ, META_ENV)
+    @mock.patch('listings.social_utils.CONTAINER_POLL_INTERVAL', 0)
+    def test_post_social_finds_the_oldest_listing(self):
+        session = graph_session()
+        with mock.patch('listings.social_utils.get_graph_session', return_value=session):
+            response = Client(HTTP_HOST='localhost').post(f'/listings/{self.oldest.id}/post-social/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.json()['posted'])
+        self.assertCountEqual(
+            posted_paths(session),
+            ['ig-account/media', 'ig-account/media_publish', 'fb-page/photos'],
+        )
+        self.oldest.refresh_from_db()
+        self.assertEqual(self.oldest.social_media_post_id, 'ig:ig-1, fb:fb-1')
+
+
+class PostSocialBacklogTests(TestCase):
+    """post_social_backlog saves every finished post, even when another one raises"""
+
+    def setUp(self):
+        user = make_user()
+        self.broken = make_listing(user, listing_title='Broken', social_media_posting=True)
+        self.listing = make_listing(user, listing_title='Fine', social_media_posting=True)
+
+    def post_listing(self, listing_data, platforms):
+        if listing_data['id'] == self.broken.id:
+            raise RuntimeError('caption failed')
+        return {platform: {'id': f'{platform}-{listing_data["id"]}'} for platform in platforms}
+
+    def run_backlog(self, *args):
+        with mock.patch(
+            'listings.management.commands.post_social_backlog.MetaSocialManager.post_listing',
+            autospec=True, side_effect=lambda manager, *args, **kwargs: self.post_listing(*args, **kwargs),
+        ) as post_listing:
+            call_command('post_social_backlog', '--interval', '0', *args, stdout=io.StringIO())
+        return sorted({call.args[1]['id'] for call in post_listing.call_args_list})
+
+    def test_results_are_saved_when_a_post_raises(self):
+        self.assertEqual(self.run_backlog(), [self.broken.id, self.listing.id])
+
+        self.listing.refresh_from_db()
+        self.assertTrue(self.listing.social_media_posted)
+        self.assertEqual(
+            self.listing.social_media_post_id, f'ig:instagram-{self.listing.id}, fb:facebook-{self.listing.id}',
+        )
+        self.broken.refresh_from_db()
+        self.assertFalse(self.broken.social_media_posted)
+        self.assertIn('RuntimeError: caption failed', self.broken.social_media_error)
+
+        # A resumed run posts neither the saved listing nor the failed one
+        self.assertEqual(self.run_backlog(), [])
+        self.assertEqual(self.run_backlog('--retry-failed'), [self.broken.id])
@@ -14,11 +14,15 @@ urlpatterns = [
     path('rooms/', views.rooms_list, name='rooms_list'),
     path('featured/', views.featured_list, name='featured_list'),
     path('landlord/', views.landlord_listings, name='landlord_listings'),
+    path('clusters/', views.listing_clusters, name='listing_clusters'),
+    path('facets/', views.listing_facets, name='listing_facets'),
     # Admin approval endpoints
     path('admin/pending/', views.admin_pending_listings, name='admin_pending_listings'),
+    path('admin/archived/', views.admin_archived_listings, name='admin_archived_listings'),
     path('admin/approve/<int:listing_id>/', views.admin_approve_listing, name='admin_approve_listing'),
     path('admin/reject/<int:listing_id>/', views.admin_reject_listing, name='admin_reject_listing'),
     path('admin/request-changes/<int:listing_id>/', views.admin_request_changes, name='admin_request_changes'),
+    path('admin/cache-stats/', views.admin_cache_stats, name='admin_cache_stats'),
     path('<int:listing_id>/post-social/', social_views.post_listing_to_socials, name='post_social'),
 
 ]
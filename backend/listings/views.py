@@ -1,13 +1,38 @@
 from django.shortcuts import render
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.db.models import Q
 from django.db import connection
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+import hashlib
 import json
+import logging
 from datetime import datetime, date
 import stripe
 import os
+from alerts.match_utils import match_listings
+from backend.responses import FastJsonResponse
+from .pagination_utils import (
+    DEFAULT_PAGE_SIZE, PAGINATION_PARAMS, InvalidPageRequest,
+    decode_cursor, get_page_params, keyset_clause, paginate_rows,
+)
+from .amenity_utils import AMENITY_COLUMNS, amenity_clause, update_amenity_columns
+from .archive_utils import ARCHIVE_AGGREGATES_SQL
+from .cache_utils import (
+    cache_feed_response, get_feed_cache_stats, get_feed_generation, invalidate_listing_feeds,
+)
+from .card_utils import (
+    CARD_COLUMNS_SQL, CARD_JOIN_SQL, cards_response, listing_cards_json, rebuild_listing_cards,
+)
+from .conditional_utils import listing_conditions
+from .geo_utils import (
+    InvalidGeoFilter, cluster_cell_size, geo_clause, parse_bbox, parse_zoom, update_geo_columns,
+)
+from .search_utils import search_clause, update_search_document
+from .social_jobs import enqueue_social_post
+
+logger = logging.getLogger(__name__)
 
 # Initialize Stripe
 stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
@@ -85,13 +110,9 @@ def _update_listing_utilities(listing_id, utilities_data):
             cursor.execute(f"INSERT INTO listings_listing_utilities (listing_id, utility_id) VALUES {values_str}")
 
 
-def _get_raw_listings(visible=True, type_code=None, filters=None, user_id=None):
-    """Get listings directly from database to avoid Django ORM date parsing issues"""
-    with connection.cursor() as cursor:
-        # Build the query
-        # Note: camelCase columns are quoted for PostgreSQL case-sensitivity
-        query = """
-            SELECT 
+# Listing columns read by the raw listing queries
+# Note: camelCase columns are quoted for PostgreSQL case-sensitivity
+LISTING_COLUMNS_SQL = """
                 l.id, l.listing_title, l.address, l.zip, l.unit, l.beds, l.baths, l.rent, 
                 l.pets, l.details, l.date_avail, l.date_created, 
                 l.date_expires, l.contact_name, l.contact_number, l.contact_email,
@@ -99,118 +120,226 @@ def _get_raw_listings(visible=True, type_code=None, filters=None, user_id=None):
                 l.furnished, l.lease_length, l.tenant_lease_end, l.fireplace,
                 l.dishwasher, l.laundry, l.porch, l.parking, l.smoking,
                 l.is_season, l.total_beds, l."typeCode", l."latLng", l."physicalAddress",
-                l."textOk", l.rent_type, l.cover_photo_id, l.user_id,
+                l.latitude, l.longitude,
+                l."textOk", l.rent_type, l.cover_photo_id, l.user_id, l.date_modified,
                 l.is_public, l.stripe_subscription_id, l.stripe_payment_link,
                 l.approval_status, l.admin_feedback, l.stripe_payment_method_id,
-                l.social_media_posting, l.social_media_posted, l.social_media_post_id, l.social_media_error
-            FROM listings l
-            WHERE 1=1
+                l.social_media_posting, l.social_media_posted, l.social_media_post_id, l.social_media_error"""
+
+
+# Photo file names, utility names and the cover photo's WebP variants
+# ("name width" pairs) per listing, aggregated in the same statement as the
+# listing row so a feed or detail page is one round trip.
+LISTING_AGGREGATES_SQL = """,
+                (SELECT array_agg(p.name ORDER BY p.is_main DESC, p.photo_id ASC)
+                   FROM photos p WHERE p.listing_id = l.id) AS photo_names,
+                (SELECT array_agg(u.name ORDER BY u.name)
+                   FROM listings_listing_utilities llu
+                   JOIN lookup_utilities u ON llu.utility_id = u.id
+                  WHERE llu.listing_id = l.id) AS utility_names,
+                (SELECT array_agg(v.name || ' ' || v.width ORDER BY v.width)
+                   FROM photo_variants v
+                  WHERE v.format = 'webp' AND v.photo_id = (
+                        SELECT p.photo_id FROM photos p WHERE p.listing_id = l.id
+                         ORDER BY p.is_main DESC, p.photo_id ASC LIMIT 1)) AS cover_variants"""
+
+
+# ?type= filter values and the typeCode each one selects
+LISTING_TYPE_FILTERS = {
+    'Rentals': 1,
+    'ShortTerm': 4,
+    'Sublets': 2,
+    'RoomForRent': 3,
+}
+
+
+def _build_listing_where(visible=True, type_code=None, filters=None, user_id=None):
+    """
+    Build the WHERE conditions shared by the listing feed queries.
+    Returns (where_sql, params, rank_sql, rank_params); rank_sql is the search
+    rank expression when a `q` filter is applied, otherwise None.
+    """
+    query = ""
+    params = []
+    rank_sql = None
+    rank_params = []
+
+    if visible is True:
+        # Visible feeds leave out listings past their expiry date even before
+        # sweep_expired_listings hides them
+        query += " AND l.visible = TRUE AND l.date_expires >= CURRENT_DATE"
+    elif visible == 'only_invisible':
+        query += " AND l.visible = FALSE"
+    # if visible is 'all' or False, we show everything (no filter)
+
+    if type_code is not None:
+        query += ' AND l."typeCode" = %s'
+        params.append(type_code)
+
+    if user_id is not None:
+        query += " AND l.user_id = %s"
+        params.append(user_id)
+
+    # Apply filters
+    if filters:
+        # Location filter
+        location = filters.get('location')
+        if location and location.lower() != 'all':
+            query += ' AND (l.location LIKE %s OR l.address LIKE %s OR l."physicalAddress" LIKE %s)'
+            params.extend([f'%{location}%', f'%{location}%', f'%{location}%'])
+
+        # Building type filter
+        building_type = filters.get('buildingType')
+        if building_type and 'all' not in building_type.lower():
+            query += " AND l.building_type LIKE %s"
+            params.append(f'%{building_type}%')
+
+        # Bedrooms filter
+        bedrooms = filters.get('bedrooms')
+        if bedrooms and bedrooms.lower() != 'all':
+            if bedrooms.lower() == 'studio':
+                query += " AND l.beds = 0"
+            elif bedrooms.isdigit():
+                query += " AND l.beds = %s"
+                params.append(int(bedrooms))
+            elif 'bedroom' in bedrooms.lower():
+                num = ''.join(filter(str.isdigit, bedrooms))
+                if num:
+                    if '+' in bedrooms:
+                        query += " AND l.beds >= %s"
+                        params.append(int(num))
+                    else:
+                        query += " AND l.beds = %s"
+                        params.append(int(num))
+
+        # Max rent filter
+        max_rent = filters.get('maxRent')
+        if max_rent and max_rent.isdigit():
+            query += " AND l.rent <= %s"
+            params.append(int(max_rent))
+
+        # Pets / furnished / laundry / parking / smoking filters (equality on
+        # the normalized amenity columns)
+        amenity_sql, amenity_params = amenity_clause(filters)
+        query += amenity_sql
+        params.extend(amenity_params)
+
+        # Map viewport (?bbox=) or radius (?near=&radius=) filter
+        geo_sql, geo_params = geo_clause(filters)
+        query += geo_sql
+        params.extend(geo_params)
+
+        # Search query (answered from the GIN-indexed search document)
+        search = search_clause(filters.get('q'))
+        if search:
+            search_sql, search_params, rank_sql, rank_params = search
+            query += search_sql
+            params.extend(search_params)
+
+        # Listing type filter
+        listing_type = filters.get('type')
+        if listing_type:
+            mapped_type = LISTING_TYPE_FILTERS.get(listing_type)
+            if mapped_type:
+                query += ' AND l."typeCode" = %s'
+                params.append(mapped_type)
+    
+    return query, params, rank_sql, rank_params
 
 
-        """
-        params = []
-        
-        if visible is True:
-            query += " AND l.visible = TRUE"
-        elif visible == 'only_invisible':
-            query += " AND l.visible = FALSE"
-        # if visible is 'all' or False, we show everything (no filter)
-        
-        if type_code is not None:
-            query += ' AND l."typeCode" = %s'
-            params.append(type_code)
+def _get_raw_listings(visible=True, type_code=None, filters=None, user_id=None,
+                      limit=DEFAULT_PAGE_SIZE, cursor=None, cards=False):
+    """
+    Get listings directly from database to avoid Django ORM date parsing issues.
 
-        if user_id is not None:
-            query += " AND l.user_id = %s"
-            params.append(user_id)
-        
-        # Apply filters
-        if filters:
-            # Location filter
-            location = filters.get('location')
-            if location and location.lower() != 'all':
-                query += " AND (l.location LIKE %s OR l.address LIKE %s OR l.physicalAddress LIKE %s)"
-                params.extend([f'%{location}%', f'%{location}%', f'%{location}%'])
-            
-            # Building type filter
-            building_type = filters.get('buildingType')
-            if building_type and 'all' not in building_type.lower():
-                query += " AND l.building_type LIKE %s"
-                params.append(f'%{building_type}%')
-            
-            # Bedrooms filter
-            bedrooms = filters.get('bedrooms')
-            if bedrooms and bedrooms.lower() != 'all':
-                if bedrooms.lower() == 'studio':
-                    query += " AND l.beds = 0"
-                elif bedrooms.isdigit():
-                    query += " AND l.beds = %s"
-                    params.append(int(bedrooms))
-                elif 'bedroom' in bedrooms.lower():
-                    num = ''.join(filter(str.isdigit, bedrooms))
-                    if num:
-                        if '+' in bedrooms:
-                            query += " AND l.beds >= %s"
-                            params.append(int(num))
-                        else:
-                            query += " AND l.beds = %s"
-                            params.append(int(num))
-            
-            # Max rent filter
-            max_rent = filters.get('maxRent')
-            if max_rent and max_rent.isdigit():
-                query += " AND l.rent <= %s"
-                params.append(int(max_rent))
-            
-            # Pets filter
-            pets = filters.get('pets')
-            if pets and pets.lower() != 'all':
-                if 'yes' in pets.lower() or 'allowed' in pets.lower():
-                    query += " AND (l.pets LIKE '%yes%' OR l.pets LIKE '%allowed%' OR l.pets = '1')"
-                elif 'no' in pets.lower():
-                    query += " AND (l.pets LIKE '%no%' OR l.pets IS NULL OR l.pets = '' OR l.pets = '2')"
-            
-            # Furnished filter
-            furnished = filters.get('furnished')
-            if furnished and furnished.lower() != 'all':
-                if furnished.lower() == 'furnished':
-                    query += " AND (l.furnished LIKE '%yes%' OR l.furnished LIKE '%full%' OR l.furnished = 'Yes')"
-                elif furnished.lower() == 'unfurnished':
-                    query += " AND (l.furnished LIKE '%no%' OR l.furnished LIKE '%unfurnished%' OR l.furnished IS NULL)"
-            
-            # Search query
-            search_query = filters.get('q')
-            if search_query:
-                query += """ AND (
-                    l.address LIKE %s OR 
-                    l.physicalAddress LIKE %s OR 
-                    l.location LIKE %s OR 
-                    l.details LIKE %s OR 
-                    l.building_type LIKE %s OR
-                    CAST(l.zip AS TEXT) LIKE %s
-                )"""
-                search_term = f'%{search_query}%'
-                params.extend([search_term] * 6)
-            
-            # Listing type filter
-            listing_type = filters.get('type')
-            if listing_type:
-                type_mapping = {
-                    'Rentals': 1,
-                    'ShortTerm': 4,
-                    'Sublets': 2,
-                    'RoomForRent': 3,
-                }
-                mapped_type = type_mapping.get(listing_type)
-                if mapped_type:
-                    query += ' AND l."typeCode" = %s'
-                    params.append(mapped_type)
+    Rows come back in feed order (featured, date_created, id - all DESC, with
+    search rank after featured when a `q` filter is applied). Pass the
+    `cursor` token from a previous page to continue after its last row.
+    With cards=True the rows only hold the sort key and the listing's stored
+    card (see card_utils.listing_cards_json).
+    """
+    with connection.cursor() as cursor_db:
+        # Build the query
+        if cards:
+            columns_sql, join_sql = CARD_COLUMNS_SQL, CARD_JOIN_SQL
+        else:
+            columns_sql, join_sql = LISTING_COLUMNS_SQL + LISTING_AGGREGATES_SQL, ""
+        query, params, rank_sql, rank_params = _build_listing_where(visible, type_code, filters, user_id)
         
-        query += " ORDER BY l.featured DESC, l.date_created DESC LIMIT 100"
+        # Feed order; best search matches come right after featured listings
+        sort_keys = [('l.featured', 'integer'), ('l.date_created', 'date'), ('l.id', 'integer')]
+        select_params = []
+        if rank_sql:
+            sort_keys.insert(1, (rank_sql, 'real'))
+            columns_sql += f", {rank_sql} AS search_rank"
+            select_params = list(rank_params)
+
+        if cursor:
+            keyset_sql, keyset_params = keyset_clause(sort_keys, decode_cursor(cursor, len(sort_keys)))
+            query += keyset_sql
+            if rank_sql:
+                # The rank expression in the row comparison takes its own parameter
+                keyset_params = rank_params + keyset_params
+            params.extend(keyset_params)
+
+        order_params = list(rank_params) if rank_sql else []
+        query = (
+            f"SELECT {columns_sql}\n            FROM listings l{join_sql}\n            WHERE 1=1{query}"
+            f" ORDER BY {', '.join(f'{expr} DESC' for expr, _ in sort_keys)} LIMIT %s"
+        )
+        params = select_params + params + order_params + [limit]
         
-        cursor.execute(query, params)
+        cursor_db.execute(query, params)
+        columns = [col[0] for col in cursor_db.description]
+        return [dict(zip(columns, row)) for row in cursor_db.fetchall()]
+
+
+def _get_raw_listings_by_ids(listing_ids):
+    """
+    Get raw listing rows by id, whatever their visibility, in the order the
+    ids are given. Ids that do not exist are skipped.
+    """
+    listing_ids = [int(listing_id) for listing_id in listing_ids]
+    if not listing_ids:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT {LISTING_COLUMNS_SQL}{LISTING_AGGREGATES_SQL}
+            FROM listings l
+            WHERE l.id = ANY(%s)
+        """, [listing_ids])
         columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        rows_by_id = {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+    return [rows_by_id[listing_id] for listing_id in listing_ids if listing_id in rows_by_id]
+
+
+def _get_listings_by_ids(listing_ids, request=None):
+    """Formatted listings for the given ids (see _get_raw_listings_by_ids)"""
+    return _format_listings_data(_get_raw_listings_by_ids(listing_ids), request)
+
+
+def _get_listing_by_id(listing_id, request=None):
+    """Formatted listing for a single id, or None if it does not exist"""
+    listings = _get_listings_by_ids([listing_id], request)
+    return listings[0] if listings else None
+
+
+def _listing_sort_values(listing):
+    """Feed sort key of a row returned by _get_raw_listings"""
+    if 'search_rank' in listing:
+        return [listing['featured'], listing['search_rank'], listing['date_created'], listing['id']]
+    return [listing['featured'], listing['date_created'], listing['id']]
+
+
+def _get_listings_page(limit, cursor=None, **kwargs):
+    """
+    Fetch one page of listings from _get_raw_listings.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    rows = _get_raw_listings(limit=limit + 1, cursor=cursor, **kwargs)
+    return paginate_rows(rows, limit, _listing_sort_values)
 
 
 def _get_photos_for_listings(listing_ids):
@@ -253,10 +382,15 @@ def _format_listings_data(listings, request=None):
     if not listings:
         return []
     
-    # Get photos for all listings
-    listing_ids = [l['id'] for l in listings]
-    photos_by_listing = _get_photos_for_listings(listing_ids)
-    utilities_by_listing = _get_utilities_for_listings(listing_ids)
+    # Photos and utilities normally arrive aggregated into each row
+    # (LISTING_AGGREGATES_SQL); only rows without them cost extra queries
+    if 'photo_names' in listings[0]:
+        photos_by_listing = {l['id']: l['photo_names'] or [] for l in listings}
+        utilities_by_listing = {l['id']: l['utility_names'] or [] for l in listings}
+    else:
+        listing_ids = [l['id'] for l in listings]
+        photos_by_listing = _get_photos_for_listings(listing_ids)
+        utilities_by_listing = _get_utilities_for_listings(listing_ids)
     
     placeholder_image = "https://images.unsplash.com/photo-1570129477492-45c003edd2be?q=80&w=1000&auto=format&fit=crop"
     
@@ -268,25 +402,31 @@ def _format_listings_data(listings, request=None):
     if request and media_url.startswith('/'):
         base_url = f"{request.scheme}://{request.get_host()}"
     
+    # R2 or external storage - use MEDIA_URL directly; local storage gets
+    # the request host when there is one
+    photo_url_prefix = media_url if media_url.startswith('http') else f"{base_url}{media_url}"
+    
     listings_data = []
     for listing in listings:
         # Get photo paths and convert to full URLs
         photo_paths = photos_by_listing.get(listing['id'], [])
         
         if photo_paths:
-            # Convert paths to full URLs
-            if media_url.startswith('http'):
-                # R2 or external storage - use MEDIA_URL directly
-                photo_urls = [f"{media_url}{path}" for path in photo_paths]
-            elif base_url:
-                # Local storage with request context
-                photo_urls = [f"{base_url}{media_url}{path}" for path in photo_paths]
-            else:
-                # Local storage without request context
-                photo_urls = [f"{media_url}{path}" for path in photo_paths]
+            photo_urls = [f"{photo_url_prefix}{path}" for path in photo_paths]
         else:
             photo_urls = [placeholder_image]
 
+        # Resized WebP copies of the cover photo (see image_utils), smallest
+        # first; each width is the one actually encoded, listed once
+        srcset = []
+        widths = set()
+        for variant in listing.get('cover_variants') or []:
+            name, width = variant.rsplit(' ', 1)
+            if width not in widths:
+                widths.add(width)
+                srcset.append(f"{photo_url_prefix}{name} {width}w")
+        thumbnail = srcset[0].rsplit(' ', 1)[0] if srcset else photo_urls[0]
+
         
         # Build title - use custom title if available, otherwise generate one
         beds = listing.get('beds') or 0
@@ -305,6 +445,8 @@ def _format_listings_data(listings, request=None):
             'city': f"Syracuse, NY {listing.get('zip') or '13210'}",
             'zip': listing.get('zip'),
             'images': photo_urls,
+            'thumbnail': thumbnail,
+            'srcset': srcset,
             'availableDate': _safe_date_str(listing.get('date_avail')) or 'Available Now',
             'details': listing.get('details'),
             'pets': listing.get('pets'),
@@ -318,6 +460,8 @@ def _format_listings_data(listings, request=None):
             'contact_number': listing.get('contact_number'),
             'featured': listing.get('featured') or 0,
             'latLng': listing.get('latLng'),
+            'latitude': listing.get('latitude'),
+            'longitude': listing.get('longitude'),
             'typeCode': listing.get('typeCode') or 1,
             'location': listing.get('location'),
             'is_public': bool(listing.get('is_public')),
@@ -339,106 +483,157 @@ def _format_listings_data(listings, request=None):
     return listings_data
 
 
+def _visible_from_request(request):
+    """Map the ?visible= parameter of listing_list to _get_raw_listings' visible argument"""
+    visible_param = request.GET.get('visible')
+    if visible_param == 'all':
+        return False
+    if visible_param == 'false' or visible_param == 'invisible':
+        return 'only_invisible'
+    return True
+
+
+def _featured_where(request=None):
+    """WHERE conditions of the spotlight feed (spotlight date within the last 30 days)"""
+    from datetime import timedelta
+    thirty_days_ago = (date.today() - timedelta(days=30)).isoformat()
+    return (
+        ' AND l.visible = TRUE'
+        ' AND l.date_expires >= CURRENT_DATE'
+        ' AND l."spotlightListing" IS NOT NULL'
+        ' AND l."spotlightListing" >= %s'
+    ), [thirty_days_ago]
+
+
+def _detail_where(request, listing_id):
+    """WHERE conditions of the single-listing views"""
+    return " AND l.id = %s", [listing_id]
+
+
+@listing_conditions()
+@cache_feed_response
 def listing_list(request):
     """Get all visible listings with their photos, with optional filtering"""
     if request.method == 'GET':
         try:
-            filters = {k: v for k, v in request.GET.items()}
-            visible_param = request.GET.get('visible')
-            visible = True
-            if visible_param == 'all':
-                visible = False
-            elif visible_param == 'false' or visible_param == 'invisible':
-                visible = 'only_invisible'
-            
-            listings = _get_raw_listings(visible=visible, filters=filters)
-            listings_data = _format_listings_data(listings, request)
-            
-            return JsonResponse({
-                'listings': listings_data,
-                'count': len(listings_data),
-                'filters_applied': filters
-            })
+            filters = {k: v for k, v in request.GET.items() if k not in PAGINATION_PARAMS}
+            limit, cursor = get_page_params(request)
+            visible = _visible_from_request(request)
+            
+            listings, next_cursor = _get_listings_page(
+                limit, cursor, visible=visible, filters=filters, cards=True
+            )
+            cards_json, count = listing_cards_json(listings, request)
+            
+            return cards_response(cards_json, count, next=next_cursor, filters_applied=filters)
+        except (InvalidPageRequest, InvalidGeoFilter) as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
+@listing_conditions()
+@cache_feed_response
 def rentals_list(request):
     """Get all visible rental listings (typeCode=1) with optional filtering"""
     if request.method == 'GET':
         try:
-            filters = {k: v for k, v in request.GET.items()}
-            listings = _get_raw_listings(visible=True, type_code=1, filters=filters)
-            listings_data = _format_listings_data(listings, request)
-            
-            return JsonResponse({
-                'listings': listings_data,
-                'count': len(listings_data),
-                'type': 'rentals',
-                'filters_applied': filters
-            })
+            filters = {k: v for k, v in request.GET.items() if k not in PAGINATION_PARAMS}
+            limit, cursor = get_page_params(request)
+            listings, next_cursor = _get_listings_page(
+                limit, cursor, visible=True, type_code=1, filters=filters, cards=True
+            )
+            cards_json, count = listing_cards_json(listings, request)
+            
+            return cards_response(
+                cards_json, count, next=next_cursor, type='rentals', filters_applied=filters
+            )
+        except (InvalidPageRequest, InvalidGeoFilter) as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
+@listing_conditions()
+@cache_feed_response
 def sublets_list(request):
     """Get all visible sublet listings (typeCode=2) with optional filtering"""
     if request.method == 'GET':
         try:
-            filters = {k: v for k, v in request.GET.items()}
-            listings = _get_raw_listings(visible=True, type_code=2, filters=filters)
-            listings_data = _format_listings_data(listings, request)
-            
-            return JsonResponse({
-                'listings': listings_data,
-                'count': len(listings_data),
-                'type': 'sublets',
-                'filters_applied': filters
-            })
+            filters = {k: v for k, v in request.GET.items() if k not in PAGINATION_PARAMS}
+            limit, cursor = get_page_params(request)
+            listings, next_cursor = _get_listings_page(
+                limit, cursor, visible=True, type_code=2, filters=filters, cards=True
+            )
+            cards_json, count = listing_cards_json(listings, request)
+            
+            return cards_response(
+                cards_json, count, next=next_cursor, type='sublets', filters_applied=filters
+            )
+        except (InvalidPageRequest, InvalidGeoFilter) as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
+@listing_conditions()
+@cache_feed_response
 def rooms_list(request):
     """Get all visible room for rent listings (typeCode=3) with optional filtering"""
     if request.method == 'GET':
         try:
-            filters = {k: v for k, v in request.GET.items()}
-            listings = _get_raw_listings(visible=True, type_code=3, filters=filters)
-            listings_data = _format_listings_data(listings, request)
-            
-            return JsonResponse({
-                'listings': listings_data,
-                'count': len(listings_data),
-                'type': 'rooms',
-                'filters_applied': filters
-            })
+            filters = {k: v for k, v in request.GET.items() if k not in PAGINATION_PARAMS}
+            limit, cursor = get_page_params(request)
+            listings, next_cursor = _get_listings_page(
+                limit, cursor, visible=True, type_code=3, filters=filters, cards=True
+            )
+            cards_json, count = listing_cards_json(listings, request)
+            
+            return cards_response(
+                cards_json, count, next=next_cursor, type='rooms', filters_applied=filters
+            )
+        except (InvalidPageRequest, InvalidGeoFilter) as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
+
 
+# Spotlight feed order, matched by the listings_spotlight_feed_idx index
+FEATURED_SORT_KEYS = [('l."spotlightListing"', 'date'), ('l.date_created', 'date'), ('l.id', 'integer')]
+FEATURED_PAGE_SIZE = 50
 
+
+@listing_conditions()
+@cache_feed_response
 def featured_list(request):
     """Get all visible spotlight listings (spotlightListing date is within 30 days or in the future)"""
     if request.method == 'GET':
         try:
-            # Calculate date 30 days ago
-            from datetime import timedelta
-            thirty_days_ago = (date.today() - timedelta(days=30)).isoformat()
+            limit, cursor = get_page_params(request, default=FEATURED_PAGE_SIZE)
             
-            with connection.cursor() as cursor:
-                cursor.execute("""
+            where_sql, params = _featured_where(request)
+            keyset_sql = ""
+            if cursor:
+                keyset_sql, keyset_params = keyset_clause(
+                    FEATURED_SORT_KEYS, decode_cursor(cursor, len(FEATURED_SORT_KEYS))
+                )
+                params.extend(keyset_params)
+            params.append(limit + 1)
+            
+            with connection.cursor() as cursor_db:
+                cursor_db.execute(f"""
                     SELECT 
                         l.id, l.listing_title, l.address, l.zip, l.unit, l.beds, l.baths, l.rent, 
                         l.utilities, l.pets, l.details, l.date_avail, l.date_created, 
@@ -448,36 +643,272 @@ def featured_list(request):
                         l.dishwasher, l.laundry, l.porch, l.parking, l.smoking,
                         l.is_season, l.total_beds, l."typeCode", l."latLng", l."physicalAddress",
                         l."textOk", l.rent_type, l.cover_photo_id, l.user_id, l."spotlightListing"
+                        {LISTING_AGGREGATES_SQL}
                     FROM listings l
-                    WHERE l.visible = TRUE 
-                      AND l."spotlightListing" IS NOT NULL 
-                      AND l."spotlightListing" >= %s
-                    ORDER BY l."spotlightListing" DESC, l.date_created DESC
-                    LIMIT 50
-                """, [thirty_days_ago])
-                columns = [col[0] for col in cursor.description]
-                listings = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            
+                    WHERE 1=1{where_sql}{keyset_sql}
+                    ORDER BY l."spotlightListing" DESC, l.date_created DESC, l.id DESC
+                    LIMIT %s
+                """, params)
+                columns = [col[0] for col in cursor_db.description]
+                listings = [dict(zip(columns, row)) for row in cursor_db.fetchall()]
+            
+            listings, next_cursor = paginate_rows(
+                listings, limit, lambda l: [l['spotlightListing'], l['date_created'], l['id']]
+            )
             listings_data = _format_listings_data(listings, request)
             
-            return JsonResponse({
+            return FastJsonResponse({
                 'listings': listings_data,
                 'count': len(listings_data),
+                'next': next_cursor,
                 'type': 'featured'
             })
+        except InvalidPageRequest as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
+
+
+# Query parameters of the clusters endpoint that are not listing filters
+CLUSTER_PARAMS = ('bbox', 'zoom')
+
+
+def _get_cluster_grid(zoom, filters):
+    """
+    Every cluster of visible listings at a zoom level, for the whole market.
+    The grid is cached per zoom level and filter set until the next listing
+    write bumps the feed generation (or midnight expires listings), so
+    panning the map only filters it.
+    """
+    normalized = '&'.join(f'{key}={value}' for key, value in sorted(filters.items()))
+    key = (
+        f'listings:clusters:{get_feed_generation()}:{timezone.localdate()}:{zoom}:'
+        f'{hashlib.md5(normalized.encode("utf-8")).hexdigest()}'
+    )
+    grid = cache.get(key)
+    if grid is not None:
+        return grid
+
+    where_sql, params, _, _ = _build_listing_where(True, None, filters)
+    cell_size = cluster_cell_size(zoom)
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT FLOOR(l.latitude / %s) AS cell_row, FLOOR(l.longitude / %s) AS cell_col,
+                   COUNT(*), AVG(l.latitude), AVG(l.longitude), MIN(l.rent), MAX(l.rent), MIN(l.id)
+            FROM listings l
+            WHERE l.latitude IS NOT NULL AND l.longitude IS NOT NULL{where_sql}
+            GROUP BY cell_row, cell_col
+        """, [cell_size, cell_size] + params)
+        grid = []
+        for cell_row, cell_col, count, lat, lng, min_rent, max_rent, first_id in cursor.fetchall():
+            south, west = float(cell_row) * cell_size, float(cell_col) * cell_size
+            grid.append({
+                'lat': round(float(lat), 6),
+                'lng': round(float(lng), 6),
+                'count': count,
+                'min_rent': min_rent,
+                'max_rent': max_rent,
+                'bounds': [round(west, 6), round(south, 6), round(west + cell_size, 6), round(south + cell_size, 6)],
+                # A single listing is shown as its own marker
+                'listing_id': first_id if count == 1 else None,
+            })
+
+    cache.set(key, grid, getattr(settings, 'LISTINGS_CACHE_TIMEOUT', 300))
+    return grid
 
 
+def listing_clusters(request):
+    """
+    Map markers aggregated on the server: ?zoom= (0-20) and an optional
+    ?bbox=west,south,east,north, plus any of the feed filters.
+    """
+    if request.method == 'GET':
+        try:
+            zoom = parse_zoom(request.GET.get('zoom'))
+            bbox = parse_bbox(request.GET['bbox']) if request.GET.get('bbox') else None
+            filters = {k: v for k, v in request.GET.items() if k not in CLUSTER_PARAMS + PAGINATION_PARAMS}
+
+            clusters = _get_cluster_grid(zoom, filters)
+            if bbox:
+                south, west, north, east = bbox
+                clusters = [
+                    cluster for cluster in clusters
+                    if south <= cluster['lat'] <= north and west <= cluster['lng'] <= east
+                ]
+
+            return FastJsonResponse({
+                'clusters': clusters,
+                'count': len(clusters),
+                'total_listings': sum(cluster['count'] for cluster in clusters),
+                'zoom': zoom,
+                'cell_size': cluster_cell_size(zoom),
+            })
+        except InvalidGeoFilter as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
+        except Exception as e:
+            import traceback
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+    
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
+
+
+# maxRent options shown in the sidebar; counts are cumulative (rent <= value)
+RENT_BUCKETS = (500, 750, 1000, 1250, 1500, 2000, 2500, 3000)
+
+# Sidebar facets: (filter parameter, grouping expression). Each facet is
+# counted with every current filter applied except its own, so picking
+# "2 bedrooms" still shows how many studios there are.
+FACETS = [
+    ('location', "COALESCE(loc.name, NULLIF(l.location, ''))"),
+    ('buildingType', "COALESCE(bt.name, NULLIF(l.building_type, ''))"),
+    ('type', 'l."typeCode"'),
+    ('bedrooms', "LEAST(l.beds, 4)"),
+    ('maxRent', "CASE " + " ".join(f"WHEN l.rent <= {b} THEN {b}" for b in RENT_BUCKETS) + " END"),
+    ('pets', "l.pets_allowed"),
+    ('furnished', "l.is_furnished"),
+]
+
+BEDROOM_OPTIONS = {0: ('studio', 'Studio'), 1: ('1', '1 Bedroom'), 2: ('2', '2 Bedrooms'),
+                   3: ('3', '3 Bedrooms'), 4: ('4+ bedrooms', '4+ Bedrooms')}
+FLAG_OPTIONS = {
+    'pets': {True: ('yes', 'Pets allowed'), False: ('no', 'No pets')},
+    'furnished': {True: ('furnished', 'Furnished'), False: ('unfurnished', 'Unfurnished')},
+}
+
+
+def _facet_options(facet, groups, type_names):
+    """Turn the grouped counts of one facet into sidebar options"""
+    if facet == 'bedrooms':
+        return [
+            {'value': BEDROOM_OPTIONS[beds][0], 'label': BEDROOM_OPTIONS[beds][1], 'count': count}
+            for beds, count in sorted(groups.items()) if beds in BEDROOM_OPTIONS
+        ]
+    if facet == 'maxRent':
+        options = []
+        running = 0
+        for bucket in RENT_BUCKETS:
+            running += groups.get(bucket, 0)
+            options.append({'value': str(bucket), 'label': f'Up to ${bucket:,}', 'count': running})
+        return options
+    if facet == 'type':
+        filter_values = {code: value for value, code in LISTING_TYPE_FILTERS.items()}
+        return [
+            {'value': filter_values[code], 'label': type_names.get(code, filter_values[code]), 'count': count}
+            for code, count in sorted(groups.items()) if code in filter_values
+        ]
+    if facet in FLAG_OPTIONS:
+        return [
+            {'value': value, 'label': label, 'count': groups.get(flag, 0)}
+            for flag, (value, label) in FLAG_OPTIONS[facet].items()
+        ]
+    return [
+        {'value': value, 'label': value, 'count': count}
+        for value, count in sorted(groups.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+def _get_facet_counts(filters):
+    """
+    Counts for every sidebar facet under the given filters, computed in one
+    GROUPING SETS query and cached per filter set until the next listing
+    write bumps the feed generation (or midnight expires listings).
+    """
+    normalized = '&'.join(f'{key}={value}' for key, value in sorted(filters.items()))
+    key = (
+        f'listings:facets:{get_feed_generation()}:{timezone.localdate()}:'
+        f'{hashlib.md5(normalized.encode("utf-8")).hexdigest()}'
+    )
+    facets = cache.get(key)
+    if facets is not None:
+        return facets
+
+    names = [name for name, _ in FACETS]
+    # Filters that are not facets (q, bbox, near...) narrow every count;
+    # each facet's own filter becomes a per-row match flag
+    where_sql, params, _, _ = _build_listing_where(
+        True, None, {k: v for k, v in filters.items() if k not in names}
+    )
+    columns = []
+    flag_params = []
+    for index, (name, expression) in enumerate(FACETS):
+        condition, condition_params, _, _ = _build_listing_where('all', None, {name: filters.get(name)})
+        columns.append(f"{expression} AS facet_{index}, (TRUE{condition}) AS match_{index}")
+        flag_params.extend(condition_params)
+
+    def matches(excluded=None):
+        return ' AND '.join(f'match_{index}' for index in range(len(FACETS)) if index != excluded)
+
+    facet_columns = [f'facet_{index}' for index in range(len(FACETS))]
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            WITH faceted AS (
+                SELECT {', '.join(columns)}
+                FROM listings l
+                LEFT JOIN lookup_locations loc ON loc.id = l.location_ref_id
+                LEFT JOIN lookup_building_types bt ON bt.id = l.building_type_ref_id
+                WHERE 1=1{where_sql}
+            )
+            SELECT {', '.join(f'GROUPING({column})' for column in facet_columns)},
+                   {', '.join(facet_columns)},
+                   COUNT(*) FILTER (WHERE {matches()}),
+                   {', '.join(f'COUNT(*) FILTER (WHERE {matches(index)})' for index in range(len(FACETS)))}
+            FROM faceted
+            GROUP BY GROUPING SETS ({', '.join(f'({column})' for column in facet_columns)}, ())
+        """, flag_params + params)
+        rows = cursor.fetchall()
+        cursor.execute("SELECT code, name FROM lookup_listing_types")
+        type_names = dict(cursor.fetchall())
+
+    size = len(FACETS)
+    total = 0
+    groups = {name: {} for name in names}
+    for row in rows:
+        grouping, values = row[:size], row[size:2 * size]
+        if all(grouping):
+            # The () grouping set: every filter applied
+            total = row[2 * size]
+            continue
+        index = grouping.index(0)
+        count = row[2 * size + 1 + index]
+        if values[index] is not None and count:
+            groups[names[index]][values[index]] = count
+
+    facets = {
+        'total': total,
+        'facets': {name: _facet_options(name, groups[name], type_names) for name in names},
+    }
+    cache.set(key, facets, getattr(settings, 'LISTINGS_CACHE_TIMEOUT', 300))
+    return facets
+
+
+def listing_facets(request):
+    """
+    Option counts for the filter sidebar (location, buildingType, type,
+    bedrooms, maxRent, pets, furnished) under the current feed filters.
+    """
+    if request.method == 'GET':
+        try:
+            filters = {k: v for k, v in request.GET.items() if k not in PAGINATION_PARAMS}
+            return FastJsonResponse(_get_facet_counts(filters))
+        except InvalidGeoFilter as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
+        except Exception as e:
+            import traceback
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+    
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
+
+
+@listing_conditions(_detail_where)
 def listing_detail(request, listing_id):
     """Get a single listing by ID"""
     if request.method == 'GET':
         try:
             with connection.cursor() as cursor:
-                cursor.execute("""
+                cursor.execute(f"""
                     SELECT 
                         l.id, l.listing_title, l.address, l.zip, l.unit, l.beds, l.baths, l.rent, 
                         l.utilities, l.pets, l.details, l.date_avail, l.date_created, 
@@ -487,6 +918,7 @@ def listing_detail(request, listing_id):
                         l.dishwasher, l.laundry, l.porch, l.parking, l.smoking,
                         l.is_season, l.total_beds, l."typeCode", l."latLng", l."physicalAddress",
                         l."textOk", l.rent_type, l.cover_photo_id, l.user_id
+                        {LISTING_AGGREGATES_SQL}
                     FROM listings l
                     WHERE l.id = %s
                 """, [listing_id])
@@ -495,13 +927,12 @@ def listing_detail(request, listing_id):
                 row = cursor.fetchone()
                 
                 if not row:
-                    return JsonResponse({'error': 'Listing not found'}, status=404)
+                    return FastJsonResponse({'error': 'Listing not found'}, status=404)
                 
                 listing = dict(zip(columns, row))
             
-            # Get photos
-            photos = _get_photos_for_listings([listing_id])
-            photo_paths = photos.get(listing_id, [])
+            # Photos were aggregated into the listing row
+            photo_paths = listing.get('photo_names') or []
             
             placeholder_image = "https://images.unsplash.com/photo-1570129477492-45c003edd2be?q=80&w=1000&auto=format&fit=crop"
             
@@ -520,9 +951,8 @@ def listing_detail(request, listing_id):
             else:
                 photo_urls = [placeholder_image]
             
-            # Get utilities
-            utilities_map = _get_utilities_for_listings([listing_id])
-            utilities = utilities_map.get(listing_id, [])
+            # Utilities were aggregated into the listing row
+            utilities = listing.get('utility_names') or []
 
             
             beds = listing.get('beds') or 0
@@ -567,12 +997,12 @@ def listing_detail(request, listing_id):
                 'typeCode': listing.get('typeCode') or 1,
             }
             
-            return JsonResponse({'listing': listing_data})
+            return FastJsonResponse({'listing': listing_data})
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
 @csrf_exempt
@@ -585,13 +1015,13 @@ def listing_create(request):
             # Get user from authentication or request
             user_id = data.get('user_id')
             if not user_id:
-                return JsonResponse({'error': 'user_id is required'}, status=400)
+                return FastJsonResponse({'error': 'user_id is required'}, status=400)
             
             # Verify user exists
             with connection.cursor() as cursor:
                 cursor.execute("SELECT user_id FROM users WHERE user_id = %s", [user_id])
                 if not cursor.fetchone():
-                    return JsonResponse({'error': 'User not found'}, status=404)
+                    return FastJsonResponse({'error': 'User not found'}, status=404)
             
             # Prepare dates
             date_avail = data.get('date_avail') or None
@@ -631,8 +1061,9 @@ def listing_create(request):
                         typeCode, rent_type, total_beds, perfect_for, lease_length,
                         tenant_lease_end, dishwasher, fireplace, porch, is_season, smoking,
                         house_kitchen, house_chores, house_sleep, house_drink,
-                        we_are, we_prefer, my_gender, prefer_gender, textOk, is_public, approval_status, social_media_posting, social_media_posted
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        we_are, we_prefer, my_gender, prefer_gender, textOk, is_public, approval_status, social_media_posting, social_media_posted,
+                        date_modified
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
 
 
                 """, [
@@ -696,12 +1127,17 @@ def listing_create(request):
             
             # Create utility relationships
             _update_listing_utilities(listing_id, data.get('utilities'))
+            update_search_document(listing_id)
+            update_geo_columns(listing_id)
+            update_amenity_columns(listing_id)
+            rebuild_listing_cards([listing_id])
+            invalidate_listing_feeds()
             
             # Map typeCode to type name for response
             type_names = {1: 'Rentals', 2: 'Sublets', 3: 'Room for Rent', 4: 'Short Term'}
             type_name = type_names.get(data.get('typeCode', 1), 'Rental')
             
-            return JsonResponse({
+            return FastJsonResponse({
                 'message': 'Listing created successfully',
                 'listing': {
                     'id': listing_id,
@@ -712,9 +1148,9 @@ def listing_create(request):
             }, status=201)
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=400)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=400)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
 @csrf_exempt
@@ -727,16 +1163,16 @@ def listing_update(request, listing_id):
             # Get user from request
             user_id = data.get('user_id')
             if not user_id:
-                return JsonResponse({'error': 'user_id is required'}, status=400)
+                return FastJsonResponse({'error': 'user_id is required'}, status=400)
             
             # Verify the listing exists and belongs to the user
             with connection.cursor() as cursor:
                 cursor.execute("SELECT user_id FROM listings WHERE id = %s", [listing_id])
                 row = cursor.fetchone()
                 if not row:
-                    return JsonResponse({'error': 'Listing not found'}, status=404)
+                    return FastJsonResponse({'error': 'Listing not found'}, status=404)
                 if row[0] != int(user_id):
-                    return JsonResponse({'error': 'You do not have permission to edit this listing'}, status=403)
+                    return FastJsonResponse({'error': 'You do not have permission to edit this listing'}, status=403)
             
             
             # Update utilities separately
@@ -805,30 +1241,41 @@ def listing_update(request, listing_id):
             if not update_fields:
                 if utility_updated:
                     # If only utilities updated, return success
-                     return JsonResponse({
+                    with connection.cursor() as cursor:
+                        cursor.execute("UPDATE listings SET date_modified = NOW() WHERE id = %s", [listing_id])
+                    invalidate_listing_feeds()
+                    return FastJsonResponse({
                         'message': 'Listing updated successfully',
                         'listing_id': listing_id
                     })
-                return JsonResponse({'error': 'No fields to update'}, status=400)
+                return FastJsonResponse({'error': 'No fields to update'}, status=400)
             
             # When a listing is updated, set to invisible for re-review
             update_fields.append("visible = FALSE")
+            update_fields.append("date_modified = NOW()")
             
             params.append(listing_id)
             
             with connection.cursor() as cursor:
                 query = f"UPDATE listings SET {', '.join(update_fields)} WHERE id = %s"
                 cursor.execute(query, params)
-            
-            return JsonResponse({
+            update_search_document(listing_id)
+            if 'latLng' in data:
+                update_geo_columns(listing_id)
+            if AMENITY_COLUMNS.keys() & data.keys():
+                update_amenity_columns(listing_id)
+            rebuild_listing_cards([listing_id])
+            invalidate_listing_feeds()
+            
+            return FastJsonResponse({
                 'message': 'Listing updated successfully',
                 'listing_id': listing_id
             })
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=400)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=400)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
 def listing_detail_for_edit(request, listing_id):
@@ -837,10 +1284,10 @@ def listing_detail_for_edit(request, listing_id):
         try:
             user_id = request.GET.get('user_id')
             if not user_id:
-                return JsonResponse({'error': 'user_id is required'}, status=400)
+                return FastJsonResponse({'error': 'user_id is required'}, status=400)
             
             with connection.cursor() as cursor:
-                cursor.execute("""
+                cursor.execute(f"""
                     SELECT 
                         l.id, l.listing_title, l.address, l.zip, l.unit, l.beds, l.baths, l.rent, 
                         l.utilities, l.pets, l.details, l.date_avail, l.date_created, 
@@ -852,6 +1299,7 @@ def listing_detail_for_edit(request, listing_id):
                         l."textOk", l.rent_type, l.cover_photo_id, l.user_id,
                         l.house_kitchen, l.house_chores, l.house_sleep, l.house_drink,
                         l.we_are, l.we_prefer, l.my_gender, l.prefer_gender
+                        {LISTING_AGGREGATES_SQL}
                     FROM listings l
                     WHERE l.id = %s
                 """, [listing_id])
@@ -860,17 +1308,16 @@ def listing_detail_for_edit(request, listing_id):
                 row = cursor.fetchone()
                 
                 if not row:
-                    return JsonResponse({'error': 'Listing not found'}, status=404)
+                    return FastJsonResponse({'error': 'Listing not found'}, status=404)
                 
                 listing = dict(zip(columns, row))
             
             # Verify ownership
             if listing['user_id'] != int(user_id):
-                return JsonResponse({'error': 'You do not have permission to view this listing for editing'}, status=403)
+                return FastJsonResponse({'error': 'You do not have permission to view this listing for editing'}, status=403)
             
-            # Get photos
-            photos = _get_photos_for_listings([listing_id])
-            photo_paths = photos.get(listing_id, [])
+            # Photos were aggregated into the listing row
+            photo_paths = listing.get('photo_names') or []
             
             # Get media URL from settings (supports both local and R2 storage)
             media_url = getattr(settings, 'MEDIA_URL', '/media/')
@@ -933,12 +1380,12 @@ def listing_detail_for_edit(request, listing_id):
                 'images': photo_urls,
             }
             
-            return JsonResponse({'listing': listing_data})
+            return FastJsonResponse({'listing': listing_data})
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
 def landlord_listings(request):
@@ -947,22 +1394,25 @@ def landlord_listings(request):
         try:
             user_id = request.GET.get('user_id')
             if not user_id:
-                return JsonResponse({'error': 'user_id is required'}, status=400)
+                return FastJsonResponse({'error': 'user_id is required'}, status=400)
+            
+            limit, cursor = get_page_params(request)
             
             # Get all listings for the user, including invisible ones
             # Pass visible=False to disable the default "visible=1" filter
-            listings = _get_raw_listings(visible=False, user_id=user_id)
-            listings_data = _format_listings_data(listings, request)
-            
-            return JsonResponse({
-                'listings': listings_data,
-                'count': len(listings_data)
-            })
+            listings, next_cursor = _get_listings_page(
+                limit, cursor, visible=False, user_id=user_id, cards=True
+            )
+            cards_json, count = listing_cards_json(listings, request)
+            
+            return cards_response(cards_json, count, next=next_cursor)
+        except InvalidPageRequest as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
 # ==================== ADMIN LISTING APPROVAL ENDPOINTS ====================
@@ -999,11 +1449,11 @@ def admin_pending_listings(request):
             # Verify admin
             is_admin, error = _verify_admin(request)
             if not is_admin:
-                return JsonResponse({'error': error}, status=403)
+                return FastJsonResponse({'error': error}, status=403)
             
             # Get all pending listings
             with connection.cursor() as cursor:
-                cursor.execute("""
+                cursor.execute(f"""
                     SELECT 
                         l.id, l.listing_title, l.address, l.zip, l.unit, l.beds, l.baths, l.rent, 
                         l.utilities, l.pets, l.details, l.date_avail, l.date_created, 
@@ -1014,6 +1464,7 @@ def admin_pending_listings(request):
                         l.is_season, l.total_beds, l."typeCode", l."latLng", l."physicalAddress",
                         l."textOk", l.rent_type, l.cover_photo_id, l.user_id,
                         l.stripe_payment_method_id, l.approval_status, l.admin_feedback
+                        {LISTING_AGGREGATES_SQL}
                     FROM listings l
                     WHERE l.visible = FALSE AND l.approval_status = 'pending'
 
@@ -1025,16 +1476,74 @@ def admin_pending_listings(request):
             
             listings_data = _format_listings_data(listings, request)
             
-            return JsonResponse({
+            return FastJsonResponse({
                 'listings': listings_data,
                 'count': len(listings_data),
                 'type': 'pending'
             })
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
+
+
+def admin_archived_listings(request):
+    """Get archived listings (see archive_listings), newest archive first; ?user_id= narrows to one owner"""
+    if request.method == 'GET':
+        try:
+            is_admin, error = _verify_admin(request)
+            if not is_admin:
+                return FastJsonResponse({'error': error}, status=403)
+            
+            limit, cursor = get_page_params(request)
+            where_sql = ""
+            params = []
+            user_id = request.GET.get('user_id')
+            if user_id:
+                if not user_id.isdigit():
+                    return FastJsonResponse({'error': 'user_id must be an integer'}, status=400)
+                where_sql += " AND a.user_id = %s"
+                params.append(int(user_id))
+            if cursor:
+                keyset_sql, keyset_params = keyset_clause([('a.id', 'integer')], decode_cursor(cursor, 1))
+                where_sql += keyset_sql
+                params.extend(keyset_params)
+            params.append(limit + 1)
+            
+            # The archived row is read back as a listings record, so it
+            # formats like a live listing
+            with connection.cursor() as cursor_db:
+                cursor_db.execute(f"""
+                    SELECT {LISTING_COLUMNS_SQL}{ARCHIVE_AGGREGATES_SQL},
+                           a.archived_at
+                    FROM listings_archive a,
+                         LATERAL jsonb_populate_record(NULL::listings, a.data) l
+                    WHERE 1=1{where_sql}
+                    ORDER BY a.id DESC
+                    LIMIT %s
+                """, params)
+                columns = [col[0] for col in cursor_db.description]
+                listings = [dict(zip(columns, row)) for row in cursor_db.fetchall()]
+            
+            listings, next_cursor = paginate_rows(listings, limit, lambda l: [l['id']])
+            listings_data = _format_listings_data(listings, request)
+            for listing_data, listing in zip(listings_data, listings):
+                listing_data['archived_at'] = listing['archived_at']
+            
+            return FastJsonResponse({
+                'listings': listings_data,
+                'count': len(listings_data),
+                'next': next_cursor,
+                'type': 'archived'
+            })
+        except InvalidPageRequest as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
+        except Exception as e:
+            import traceback
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+    
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
 @csrf_exempt
@@ -1045,7 +1554,7 @@ def admin_approve_listing(request, listing_id):
             # Verify admin
             is_admin, error = _verify_admin(request)
             if not is_admin:
-                return JsonResponse({'error': error}, status=403)
+                return FastJsonResponse({'error': error}, status=403)
             
             # Check listing exists and get payment details
             with connection.cursor() as cursor:
@@ -1055,16 +1564,16 @@ def admin_approve_listing(request, listing_id):
                 """, [listing_id])
                 row = cursor.fetchone()
                 if not row:
-                    return JsonResponse({'error': 'Listing not found'}, status=404)
+                    return FastJsonResponse({'error': 'Listing not found'}, status=404)
                 
                 current_visible, payment_method_id, user_id, type_code, social_media_posting = row
                 
                 if current_visible:
-                    return JsonResponse({'message': 'Listing is already visible', 'listing_id': listing_id})
+                    return FastJsonResponse({'message': 'Listing is already visible', 'listing_id': listing_id})
 
             # Check if payment method exists (Setup Intent flow)
             if not payment_method_id:
-                return JsonResponse({
+                return FastJsonResponse({
                     'error': 'No payment method found on file. Landlord must submit payment info first.',
                     'code': 'missing_payment_method'
                 }, status=400)
@@ -1077,13 +1586,13 @@ def admin_approve_listing(request, listing_id):
                 stripe_customer_id, user_email = user_row if user_row else (None, None)
 
             if not stripe_customer_id:
-                 return JsonResponse({'error': 'User has no Stripe Customer ID'}, status=400)
+                 return FastJsonResponse({'error': 'User has no Stripe Customer ID'}, status=400)
 
             # Determine Price ID
             # Assuming standard price for now, or feature logic
             price_id = os.getenv('STRIPE_PRICE_STANDARD') or os.getenv('STRIPE_SUBSCRIPTION_PRICE_ID')
             if not price_id:
-                 return JsonResponse({'error': 'Subscription Price not configured'}, status=500)
+                 return FastJsonResponse({'error': 'Subscription Price not configured'}, status=500)
 
             # Social Media Price ID
             social_price_id = os.getenv('STRIPE_PRICE_SOCIAL_MEDIA')
@@ -1111,17 +1620,17 @@ def admin_approve_listing(request, listing_id):
                 if payment_intent and payment_intent.status == 'succeeded':
                      pass # Good
                 elif subscription.status != 'active':
-                     return JsonResponse({'error': f'Payment failed. Subscription status: {subscription.status}'}, status=400)
+                     return FastJsonResponse({'error': f'Payment failed. Subscription status: {subscription.status}'}, status=400)
 
             except stripe.error.CardError as e:
-                return JsonResponse({'error': f'Card declined: {e.user_message}'}, status=400)
+                return FastJsonResponse({'error': f'Card declined: {e.user_message}'}, status=400)
             except stripe.error.InvalidRequestError as e:
-                return JsonResponse({'error': f'Stripe request error: {str(e)}'}, status=400)
+                return FastJsonResponse({'error': f'Stripe request error: {str(e)}'}, status=400)
             except stripe.error.StripeError as e:
-                return JsonResponse({'error': f'Stripe service error: {str(e)}'}, status=502)
+                return FastJsonResponse({'error': f'Stripe service error: {str(e)}'}, status=502)
             except Exception as e:
                 import traceback
-                return JsonResponse({'error': f'Internal error: {str(e)}', 'traceback': traceback.format_exc()}, status=500)
+                return FastJsonResponse({'error': f'Internal error: {str(e)}', 'traceback': traceback.format_exc()}, status=500)
             
             # Approve the listing (make visible & public)
             with connection.cursor() as cursor:
@@ -1130,36 +1639,38 @@ def admin_approve_listing(request, listing_id):
                     SET visible = TRUE, 
                         is_public = TRUE,
                         approval_status = 'approved',
-                        stripe_subscription_id = %s
+                        stripe_subscription_id = %s,
+                        date_modified = NOW()
                     WHERE id = %s
                 """, [subscription.id, listing_id])
+            invalidate_listing_feeds()
+            
+            # Queue alert emails for the saved searches this listing matches
+            try:
+                match_listings([listing_id])
+            except Exception:
+                logger.exception(f"Alert matching failed for listing {listing_id}")
             
-            # TRIGGER SOCIAL MEDIA POSTING IF SELECTED
+            # QUEUE SOCIAL MEDIA POSTING IF SELECTED
+            # (posted by the process_social_jobs worker, not in this request)
+            social_post_job_id = None
             if social_media_posting:
                 try:
-                    print(f"DEBUG: Triggering social media post for listing {listing_id}")
-                    # Ideally we'd call the manager directly here
-                    from .social_utils import MetaSocialManager
-                    # Re-fetch formatted data
-                    from .views import _get_raw_listings, _format_listings_data
-                    raw_listing_data = _get_raw_listings(visible='all', filters={'id': listing_id})
-                    if raw_listing_data:
-                        formatted = _format_listings_data(raw_listing_data)[0]
-                        manager = MetaSocialManager()
-                        manager.post_listing(formatted)
+                    social_post_job_id = enqueue_social_post(listing_id).id
                 except Exception as e:
-                    print(f"SOCIAL MEDIA POSTING ERROR: {e}")
+                    print(f"SOCIAL MEDIA QUEUE ERROR: {e}")
 
-            return JsonResponse({
+            return FastJsonResponse({
                 'message': 'Listing approved and charged successfully',
                 'listing_id': listing_id,
-                'subscription_id': subscription.id
+                'subscription_id': subscription.id,
+                'social_post_job_id': social_post_job_id
             })
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
 @csrf_exempt
@@ -1170,13 +1681,13 @@ def admin_request_changes(request, listing_id):
             # Verify admin
             is_admin, error = _verify_admin(request)
             if not is_admin:
-                return JsonResponse({'error': error}, status=403)
+                return FastJsonResponse({'error': error}, status=403)
             
             data = json.loads(request.body)
             feedback = data.get('feedback', '')
             
             if not feedback:
-                 return JsonResponse({'error': 'Feedback is required'}, status=400)
+                 return FastJsonResponse({'error': 'Feedback is required'}, status=400)
             
             # Update listing status
             with connection.cursor() as cursor:
@@ -1184,19 +1695,21 @@ def admin_request_changes(request, listing_id):
                     UPDATE listings 
                     SET approval_status = 'changes_requested',
                         admin_feedback = %s,
-                        visible = FALSE
+                        visible = FALSE,
+                        date_modified = NOW()
                     WHERE id = %s
                 """, [feedback, listing_id])
+            invalidate_listing_feeds()
             
-            return JsonResponse({
+            return FastJsonResponse({
                 'message': 'Changes requested successfully',
                 'listing_id': listing_id
             })
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
 
 
 
@@ -1208,33 +1721,52 @@ def admin_reject_listing(request, listing_id):
             # Verify admin
             is_admin, error = _verify_admin(request)
             if not is_admin:
-                return JsonResponse({'error': error}, status=403)
+                return FastJsonResponse({'error': error}, status=403)
             
             # Check listing exists
             with connection.cursor() as cursor:
                 cursor.execute("SELECT visible FROM listings WHERE id = %s", [listing_id])
                 row = cursor.fetchone()
                 if not row:
-                    return JsonResponse({'error': 'Listing not found'}, status=404)
+                    return FastJsonResponse({'error': 'Listing not found'}, status=404)
                 
                 current_visible = row[0]
                 if not current_visible:
-                    return JsonResponse({'message': 'Listing is already hidden', 'listing_id': listing_id})
+                    return FastJsonResponse({'message': 'Listing is already hidden', 'listing_id': listing_id})
             
             # Reject the listing (make invisible)
             with connection.cursor() as cursor:
                 cursor.execute("""
                     UPDATE listings 
-                    SET visible = FALSE 
+                    SET visible = FALSE, 
+                        date_modified = NOW()
                     WHERE id = %s
                 """, [listing_id])
+            invalidate_listing_feeds()
             
-            return JsonResponse({
+            return FastJsonResponse({
                 'message': 'Listing rejected successfully',
                 'listing_id': listing_id
             })
         except Exception as e:
             import traceback
-            return JsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
+    
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
+
+
+def admin_cache_stats(request):
+    """Get hit/miss counters for the listing feed cache"""
+    if request.method == 'GET':
+        try:
+            # Verify admin
+            is_admin, error = _verify_admin(request)
+            if not is_admin:
+                return FastJsonResponse({'error': error}, status=403)
+            
+            return FastJsonResponse({'cache': get_feed_cache_stats()})
+        except Exception as e:
+            import traceback
+            return FastJsonResponse({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
     
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return FastJsonResponse({'error': 'Method not allowed'}, status=405)
@@ -1,3 +1,4 @@
+import logging
 import os
 import stripe
 from django.conf import settings
@@ -6,9 +7,13 @@ from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from alerts.match_utils import match_listings
+from listings.cache_utils import invalidate_listing_feeds
 from listings.models import Listing
 from users.models import User
 
+logger = logging.getLogger(__name__)
+
 # Initialize Stripe with your secret key
 stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
@@ -39,6 +44,7 @@ def _handle_setup_intent(session):
                     listing.stripe_payment_method_id = payment_method_id
                     listing.approval_status = 'pending' # Ready for admin review
                     listing.save()
+                    invalidate_listing_feeds()
                     print(f"Listing {l_id} payment method saved.")
                 except Listing.DoesNotExist:
                     continue
@@ -107,6 +113,7 @@ def create_checkout_session(request):
         # Update listing preference
         listing.social_media_posting = bool(item.get('social_media', False))
         listing.save()
+        invalidate_listing_feeds()
              
         price_id = PRICES.get(p_type)
         if not price_id:
@@ -245,6 +252,12 @@ def _activate_listing(listing_id, subscription_id):
         listing.is_public = True
         listing.stripe_subscription_id = subscription_id
         listing.save()
+        invalidate_listing_feeds()
+        # Queue alert emails if the listing is visible now
+        try:
+            match_listings([listing.id])
+        except Exception:
+            logger.exception(f"Alert matching failed for listing {listing.id}")
         print(f"Listing {listing_id} activated.")
     except Listing.DoesNotExist:
         print(f"Error: Listing {listing_id} not found during activation.")
@@ -255,6 +268,7 @@ def _deactivate_listing(listing_id):
         listing.is_public = False
         listing.stripe_subscription_id = None # Or keep it for history
         listing.save()
+        invalidate_listing_feeds()
         print(f"Listing {listing_id} deactivated.")
     except Listing.DoesNotExist:
         print(f"Error: Listing {listing_id} not found during deactivation.")
@@ -363,6 +377,9 @@ def sync_subscriptions(request):
                                 updated_count += 1
                         except Listing.DoesNotExist:
                             continue
+        
+        if updated_count:
+            invalidate_listing_feeds()
                             
         return JsonResponse({'message': 'Sync complete', 'updated': updated_count})
         